@@ -3,30 +3,42 @@
 Main workflow for grading assignments using the flexible Grade Lens system
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import argparse
+import asyncio
+import atexit
+import functools
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+import logging.handlers
+import queue
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
-
-from config import (
-    OPENAI_API_KEY,
-    OPENAI_MODEL,
-    SUBMISSIONS_BASE_DIR,
-    OUTPUT_BASE_DIR,
-    ASSIGNMENTS_BASE_DIR,
-)
-from src.processors.document_processor import DocumentProcessor
-from src.processors.input_processor import InputProcessor
-from src.agents.qa_grading_agent import QAGradingAgent
-from src.agents.config_generator_agent import ConfigGeneratorAgent
-from src.utils.output_manager import OutputManager
-from src.models.assignment_config import AssignmentConfig
-from src.models.grading_result import AssignmentGrade
+# Agents and processors pull in LangChain, PDF and image libraries, so they
+# are imported where they are used to keep `--help` and `--list` fast. The
+# settings in config (which loads .env) are likewise read where needed, so
+# `--help` and `--version` never touch them.
+if TYPE_CHECKING:
+    from src.processors.document_processor import SubmissionFile
+    from src.models.assignment_config import AssignmentConfig
+    from src.models.grading_result import AssignmentGrade, ReportData
+    from src.utils.output_manager import StreamingResultWriter
+    from src.agents.qa_grading_agent import QAGradingAgent
+    from src.agents.answer_extraction_agent import AnswerExtractionAgent
+    from src.agents.report_generator import ReportGenerator
+    from src.agents.code_extraction_agent import CodeExtractionAgent
+    from src.agents.code_evaluation_agent import CodeEvaluationAgent
+    from src.processors.submission_grouper import SubmissionGrouper
 
 # Configure logging
 logging.basicConfig(
@@ -38,6 +50,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+__version__ = "1.0.0"
+
+# Default number of students graded concurrently
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Percentages outside this band get a template report comment (no LLM call)
+QUICK_REPORT_ABOVE = 95.0
+QUICK_REPORT_BELOW = 10.0
+
 
 class GradingWorkflow:
     """Main workflow for processing and grading submissions"""
@@ -45,14 +66,41 @@ class GradingWorkflow:
     def __init__(
         self,
         assignment_id: str,
-        submissions_base_dir: str = SUBMISSIONS_BASE_DIR,
-        output_base_dir: str = OUTPUT_BASE_DIR,
-        assignments_base_dir: str = ASSIGNMENTS_BASE_DIR,
+        submissions_base_dir: Optional[str] = None,
+        output_base_dir: Optional[str] = None,
+        assignments_base_dir: Optional[str] = None,
         answer_key_pdf: Optional[str] = None,
         grading_mode: str = "full",
         enable_image_processing: bool = True,
         enable_code_execution: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        use_async: bool = True,
+        use_cache: Optional[bool] = None,
+        question_batch_size: int = 5,
+        always_report: bool = False,
+        use_batch_api: bool = False,
     ):
+        from config import (
+            OPENAI_API_KEY,
+            OPENAI_MODEL,
+            SUBMISSIONS_BASE_DIR,
+            OUTPUT_BASE_DIR,
+            ASSIGNMENTS_BASE_DIR,
+            ENABLE_LLM_CACHE,
+            LLM_CACHE_PATH,
+            TEXT_CACHE_PATH,
+            GRADE_CACHE_PATH,
+        )
+
+        # Unset directories and cache switch fall back to the configuration
+        submissions_base_dir = submissions_base_dir or SUBMISSIONS_BASE_DIR
+        output_base_dir = output_base_dir or OUTPUT_BASE_DIR
+        assignments_base_dir = assignments_base_dir or ASSIGNMENTS_BASE_DIR
+        if use_cache is None:
+            use_cache = ENABLE_LLM_CACHE
+
+        self.api_key = OPENAI_API_KEY
+        self.model = OPENAI_MODEL
         self.assignment_id = assignment_id
         self.submissions_base_dir = submissions_base_dir
         self.output_base_dir = output_base_dir
@@ -60,66 +108,147 @@ class GradingWorkflow:
         self.grading_mode = grading_mode
         self.enable_image_processing = enable_image_processing
         self.enable_code_execution = enable_code_execution
+        self.workers = max(1, workers)
+        self.use_async = use_async
+        self.question_batch_size = question_batch_size
+        self.always_report = always_report
+        self.use_batch_api = use_batch_api
+
+        # Resolve per-assignment paths once (output includes the grading
+        # mode when it is not "full")
+        self.output_id = (
+            f"{assignment_id}_{grading_mode}"
+            if grading_mode != "full"
+            else assignment_id
+        )
+        self.submissions_dir = Path(submissions_base_dir) / assignment_id
+        self.output_dir = Path(output_base_dir) / self.output_id
+
+        from src.processors.document_processor import DocumentProcessor
+        from src.processors.input_processor import InputProcessor
+        from src.utils.output_manager import OutputManager
+        from src.utils.llm_cache import enable_llm_cache, disable_llm_cache
+        from src.utils.text_cache import enable_text_cache, disable_text_cache
+        from src.utils.grade_cache import GradeCache
+        from src.utils.http import create_async_http_client
+
+        # Serve repeated prompts and document parses (reruns, unchanged
+        # submissions, shared answer keys) from disk
+        if use_cache:
+            enable_llm_cache(LLM_CACHE_PATH)
+            enable_text_cache(TEXT_CACHE_PATH)
+        else:
+            disable_llm_cache()
+            disable_text_cache()
+
+        # Finished grades of unchanged submissions are reused on reruns
+        self.grade_cache = GradeCache(GRADE_CACHE_PATH) if use_cache else None
+        self._grade_settings = ""
+
+        # One async connection pool for every agent used by this run's
+        # event loop (sync calls share the process-wide client); it is
+        # closed when _run_all_async finishes
+        self.http_async_client = create_async_http_client() if use_async else None
 
         # Initialize components
         self.input_processor = InputProcessor(assignments_base_dir)
         self.doc_processor = DocumentProcessor()
-        self.grading_agent = QAGradingAgent(
-            OPENAI_API_KEY, model=OPENAI_MODEL, grading_mode=grading_mode
-        )
         self.output_manager = OutputManager(output_base_dir)
 
-        # Initialize multi-stage components
+        # LLM agents and the submission grouper are cached properties built
+        # on first use, so a run only constructs what its submissions need
+
+        # Load assignment configuration
+        self.assignment_config: Optional[AssignmentConfig] = None
+
+        # Files found by the submissions directory scan, keyed by path
+        self._scanned_files: Dict[str, SubmissionFile] = {}
+        # Answers extracted up front through the Batch API, keyed by path
+        self._batch_answers: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.log_handler: Optional[logging.handlers.QueueHandler] = None
+        self.log_listener: Optional[logging.handlers.QueueListener] = None
+        self._stream_writer: Optional["StreamingResultWriter"] = None
+
+    @functools.cached_property
+    def grading_agent(self) -> QAGradingAgent:
+        """Question grading agent"""
+        from src.agents.qa_grading_agent import QAGradingAgent
+
+        return QAGradingAgent(
+            self.api_key,
+            model=self.model,
+            grading_mode=self.grading_mode,
+            batch_size=self.question_batch_size,
+            http_async_client=self.http_async_client,
+        )
+
+    @functools.cached_property
+    def answer_extractor(self) -> AnswerExtractionAgent:
+        """Answer extraction agent for document submissions"""
         from src.agents.answer_extraction_agent import AnswerExtractionAgent
+
+        return AnswerExtractionAgent(
+            self.api_key,
+            model=self.model,
+            enable_image_processing=self.enable_image_processing,
+            http_async_client=self.http_async_client,
+        )
+
+    @functools.cached_property
+    def report_generator(self) -> ReportGenerator:
+        """Report generator for overall feedback"""
         from src.agents.report_generator import ReportGenerator
+
+        return ReportGenerator(
+            self.api_key,
+            model=self.model,
+            http_async_client=self.http_async_client,
+        )
+
+    @functools.cached_property
+    def code_extractor(self) -> CodeExtractionAgent:
+        """Code extraction agent (only built for code submissions)"""
         from src.agents.code_extraction_agent import CodeExtractionAgent
+
+        return CodeExtractionAgent(self.api_key, model=self.model)
+
+    @functools.cached_property
+    def code_evaluator(self) -> CodeEvaluationAgent:
+        """Code evaluation agent (only built for code submissions)"""
         from src.agents.code_evaluation_agent import CodeEvaluationAgent
-        from src.processors.submission_grouper import SubmissionGrouper
 
-        self.answer_extractor = AnswerExtractionAgent(
-            OPENAI_API_KEY,
-            model=OPENAI_MODEL,
-            enable_image_processing=enable_image_processing,
-        )
-        self.report_generator = ReportGenerator(
-            OPENAI_API_KEY,
-            model=OPENAI_MODEL,
+        return CodeEvaluationAgent(
+            self.api_key,
+            model=self.model,
+            enable_execution=self.enable_code_execution,
         )
 
-        # Initialize code processing components
-        self.code_extractor = CodeExtractionAgent(
-            OPENAI_API_KEY,
-            model=OPENAI_MODEL,
-        )
-        self.code_evaluator = CodeEvaluationAgent(
-            OPENAI_API_KEY,
-            model=OPENAI_MODEL,
-            enable_execution=enable_code_execution,
-        )
-        self.submission_grouper = SubmissionGrouper()
+    @functools.cached_property
+    def submission_grouper(self) -> SubmissionGrouper:
+        """Groups submission files by student"""
+        from src.processors.submission_grouper import SubmissionGrouper
 
-        # Load assignment configuration
-        self.assignment_config: Optional[AssignmentConfig] = None
+        return SubmissionGrouper()
 
     def load_assignment_config(self) -> bool:
         """Load and validate assignment configuration"""
-        logger.info(f"Loading assignment configuration: {self.assignment_id}")
+        logger.info("Loading assignment configuration: %s", self.assignment_id)
 
         self.assignment_config = self.input_processor.load_assignment(
             self.assignment_id
         )
 
         if not self.assignment_config:
-            logger.error(f"Failed to load assignment: {self.assignment_id}")
+            logger.error("Failed to load assignment: %s", self.assignment_id)
             return False
 
         # Load answer key PDF if provided via command line
         if self.answer_key_pdf:
-            if not os.path.exists(self.answer_key_pdf):
-                logger.error(f"Answer key PDF not found: {self.answer_key_pdf}")
+            if not Path(self.answer_key_pdf).is_file():
+                logger.error("Answer key PDF not found: %s", self.answer_key_pdf)
                 return False
 
-            logger.info(f"Loading answer key from: {self.answer_key_pdf}")
+            logger.info("Loading answer key from: %s", self.answer_key_pdf)
             answer_key_text = self.doc_processor.extract_text_from_file(
                 self.answer_key_pdf
             )
@@ -127,7 +256,7 @@ class GradingWorkflow:
             if answer_key_text:
                 # Override/set the answer key text in config
                 self.assignment_config.answer_key_text = answer_key_text
-                logger.info(f"✓ Answer key loaded ({len(answer_key_text)} characters)")
+                logger.info("✓ Answer key loaded (%s characters)", len(answer_key_text))
             else:
                 logger.warning("Could not extract text from answer key PDF")
 
@@ -137,38 +266,71 @@ class GradingWorkflow:
         else:
             logger.info("ℹ No answer key provided (grading without reference)")
 
-        logger.info(f"Assignment loaded: {self.assignment_config.assignment_name}")
-        logger.info(f"Total questions: {len(self.assignment_config.questions)}")
-        logger.info(f"Total points: {self.assignment_config.total_points}")
-        logger.info(f"Grading mode: {self.grading_mode}")
+        logger.info("Assignment loaded: %s", self.assignment_config.assignment_name)
+        logger.info("Total questions: %s", len(self.assignment_config.questions))
+        logger.info("Total points: %s", self.assignment_config.total_points)
+        logger.info("Grading mode: %s", self.grading_mode)
+
+        # Everything besides the files that shapes a grade, for the grade
+        # cache key (the config includes any answer key loaded above)
+        config_hash = hashlib.sha256(
+            self.assignment_config.model_dump_json().encode("utf-8")
+        ).hexdigest()
+        self._grade_settings = "|".join(
+            str(setting)
+            for setting in (
+                self.model,
+                self.grading_mode,
+                self.question_batch_size,
+                self.enable_image_processing,
+                self.enable_code_execution,
+                self.always_report,
+                config_hash,
+            )
+        )
 
         return True
 
     def get_submissions_directory(self) -> str:
         """Get the submissions directory for this assignment"""
-        return os.path.join(self.submissions_base_dir, self.assignment_id)
+        return str(self.submissions_dir)
 
     def setup_logging(self):
         """Setup assignment-specific logging"""
-        # Create output directory (include grading mode if not full)
-        if self.grading_mode != "full":
-            output_dir = os.path.join(
-                self.output_base_dir, f"{self.assignment_id}_{self.grading_mode}"
-            )
-        else:
-            output_dir = os.path.join(self.output_base_dir, self.assignment_id)
-        os.makedirs(output_dir, exist_ok=True)
+        # Create output directory
+        self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Add file handler for this assignment
-        log_file = os.path.join(output_dir, "grading.log")
+        # Add file handler for this assignment. Workers only enqueue records;
+        # a listener thread does the file writes, so no worker waits on disk
+        log_file = self.output_dir / "grading.log"
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(
             logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
         )
-        logging.getLogger().addHandler(file_handler)
-
-        logger.info(f"Logging to: {log_file}")
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.log_handler = logging.handlers.QueueHandler(log_queue)
+        self.log_handler.setLevel(logging.INFO)
+        self.log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        self.log_listener.start()
+        logging.getLogger().addHandler(self.log_handler)
+        atexit.register(self.stop_logging)
+
+        logger.info("Logging to: %s", log_file)
+
+    def stop_logging(self):
+        """Detach the assignment log and write out any queued records"""
+        # The exit hook would otherwise keep this workflow alive until exit
+        atexit.unregister(self.stop_logging)
+        if self.log_handler:
+            logging.getLogger().removeHandler(self.log_handler)
+            self.log_handler = None
+        if self.log_listener:
+            self.log_listener.stop()
+            self.log_listener.handlers[0].close()
+            self.log_listener = None
 
     def process_all_submissions(self) -> List[AssignmentGrade]:
         """Process all submissions for the assignment (with multi-file support)"""
@@ -181,23 +343,26 @@ class GradingWorkflow:
 
         logger.info("=" * 80)
         logger.info(
-            f"Starting grading workflow for: {self.assignment_config.assignment_name}"
+            "Starting grading workflow for: %s", self.assignment_config.assignment_name
         )
         logger.info("=" * 80)
 
         # Get submissions directory
         submissions_dir = self.get_submissions_directory()
 
-        if not os.path.exists(submissions_dir):
-            logger.error(f"Submissions directory not found: {submissions_dir}")
-            logger.error(f"Please create the directory and add submissions")
+        if not self.submissions_dir.is_dir():
+            logger.error("Submissions directory not found: %s", submissions_dir)
+            logger.error("Please create the directory and add submissions")
             return []
 
-        # Get all submission files (including code files)
-        submission_files = self.doc_processor.get_all_submissions(
-            submissions_dir, extensions=[".pdf", ".docx", ".txt", ".py", ".java"]
-        )
-        logger.info(f"Found {len(submission_files)} file(s) to process")
+        # Get all submission files (including code files) in one directory
+        # pass, keeping each entry's name and size for later checks
+        self._scanned_files = {
+            submission.path: submission
+            for submission in self.doc_processor.iter_submissions(submissions_dir)
+        }
+        submission_files = sorted(self._scanned_files)
+        logger.info("Found %s file(s) to process", len(submission_files))
 
         if not submission_files:
             logger.warning("No submission files found!")
@@ -207,83 +372,418 @@ class GradingWorkflow:
         student_groups = self.submission_grouper.group_files_by_student(
             submission_files
         )
-        logger.info(f"Grouped into {len(student_groups)} student submission(s)")
+        logger.info("Grouped into %s student submission(s)", len(student_groups))
 
-        # Process each student's group
-        grades = []
-        for i, (student_key, file_paths) in enumerate(student_groups.items(), 1):
-            try:
-                logger.info(f"\n[{i}/{len(student_groups)}] Processing: {student_key}")
-                logger.info(
-                    f"  Files ({len(file_paths)}): {[os.path.basename(f) for f in file_paths]}"
-                )
+        # Write each grade out as soon as it is ready, so an interrupted run
+        # keeps every finished student
+        self._stream_writer = self.output_manager.open_streaming_writers(self.output_id)
+        try:
+            graded = self._grade_student_groups(student_groups)
+        finally:
+            self._stream_writer.close()
+            self._stream_writer = None
+
+        # Keep output in submission order regardless of completion order
+        grades = [
+            graded[student_key]
+            for student_key in student_groups
+            if graded[student_key] is not None
+        ]
 
-                # Get student info from group
-                student_info = self.submission_grouper.get_student_info(file_paths)
-                student_name = student_info["student_name"]
-                student_id = student_info["student_id"]
-                is_late = student_info["is_late"]
+        logger.info("\n" + "=" * 80)
+        logger.info("Completed grading %s submission(s)", len(grades))
+        logger.info("=" * 80)
 
-                if is_late:
-                    logger.info(f"  ⚠️  Marked as LATE submission")
+        return grades
 
-                # Categorize files by type
-                categorized = self.submission_grouper.categorize_files_by_type(
-                    file_paths
-                )
-                code_files = categorized["code"]
-                doc_files = categorized["document"]
+    def _grade_student_groups(
+        self, student_groups: Dict[str, List[str]]
+    ) -> Dict[str, Optional[AssignmentGrade]]:
+        """Grade every student group, returning grades keyed by student"""
+        # A lone empty document needs no LLM calls, so grade those directly
+        # from the scanned sizes and only send the rest to the workers
+        graded: Dict[str, Optional[AssignmentGrade]] = {}
+        to_grade: Dict[str, List[str]] = {}
+        for student_key, file_paths in student_groups.items():
+            if self._is_empty_submission(file_paths):
+                graded[student_key] = self._grade_empty_student(student_key, file_paths)
+                self._record_grade(graded[student_key])
+            else:
+                to_grade[student_key] = file_paths
+
+        if graded:
+            logger.info("Graded %s empty submission(s) without LLM calls", len(graded))
+
+        if self.use_batch_api and to_grade:
+            self._batch_extract_answers(to_grade)
+
+        # Process student groups concurrently; each one is dominated by
+        # blocking LLM calls, so overlapping them hides the network waits
+        if to_grade:
+            total = len(to_grade)
+            logger.info(
+                "Grading with up to %s concurrent student(s) (%s)",
+                min(self.workers, total),
+                "async" if self.use_async else "threaded",
+            )
 
-                logger.info(
-                    f"  Code files: {len(code_files)}, Document files: {len(doc_files)}"
+            if self.use_async:
+                results = asyncio.run(self._run_all_async(to_grade))
+            else:
+                results = self._run_all_threaded(to_grade)
+            graded.update(zip(to_grade, results))
+
+        return graded
+
+    def _batch_extract_answers(self, student_groups: Dict[str, List[str]]):
+        """Extract answers of all document submissions in Batch API jobs"""
+        from src.agents.batch_answer_extractor import BatchAnswerExtractor
+
+        # Only pure document submissions use the answer extractor, and
+        # students with a cached grade are not graded again
+        doc_files = []
+        for file_paths in student_groups.values():
+            cache_key = self._grade_cache_key(file_paths)
+            if cache_key and self.grade_cache.get_grade(cache_key) is not None:
+                continue
+            categorized = self.submission_grouper.categorize_files_by_type(file_paths)
+            if categorized["document"] and not categorized["code"]:
+                doc_files.extend(self._non_empty_files(categorized["document"]))
+
+        if not doc_files:
+            return
+
+        batch_extractor = BatchAnswerExtractor(
+            self.answer_extractor, self.api_key, workers=self.workers
+        )
+        self._batch_answers = batch_extractor.extract_answers(
+            doc_files, self.assignment_config
+        )
+        logger.info(
+            "Batch API extracted %s/%s document(s); the rest use direct calls",
+            len(self._batch_answers),
+            len(doc_files),
+        )
+
+    def _extract_answers(self, doc_file: str) -> Dict[str, Dict[str, Any]]:
+        """Answers for one document, from the batch run if it covered it"""
+        answers = self._batch_answers.get(doc_file)
+        if answers is not None:
+            return answers
+        return self.answer_extractor.extract_answers(doc_file, self.assignment_config)
+
+    async def _aextract_answers(self, doc_file: str) -> Dict[str, Dict[str, Any]]:
+        """Async version of _extract_answers"""
+        answers = self._batch_answers.get(doc_file)
+        if answers is not None:
+            return answers
+        return await self.answer_extractor.aextract_answers(
+            doc_file, self.assignment_config
+        )
+
+    def _record_grade(self, grade: Optional[AssignmentGrade]):
+        """Stream a finished grade to the partial result files"""
+        if grade is not None and self._stream_writer is not None:
+            self._stream_writer.write_row(grade)
+
+    def _run_all_threaded(
+        self, student_groups: Dict[str, List[str]]
+    ) -> List[Optional[AssignmentGrade]]:
+        """Grade student groups on a thread pool (synchronous fallback)"""
+        total = len(student_groups)
+        results: List[Optional[AssignmentGrade]] = [None] * total
+        completed = 0
+
+        def collect(futures):
+            nonlocal completed
+            for future in futures:
+                results[pending.pop(future)] = grade = future.result()
+                self._record_grade(grade)
+                completed += 1
+                logger.info("Progress: %s/%s student(s) processed", completed, total)
+
+        # Keep at most 2x workers students queued so a large class is not
+        # materialized as thousands of pending futures at once
+        pending = {}
+        max_pending = 2 * self.workers
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for i, (student_key, file_paths) in enumerate(student_groups.items(), 1):
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(
+                    self._grade_student, i, total, student_key, file_paths
+                )
+                pending[future] = i - 1
+
+            collect(list(as_completed(pending)))
+
+        return results
+
+    async def _run_all_async(
+        self, student_groups: Dict[str, List[str]]
+    ) -> List[Optional[AssignmentGrade]]:
+        """Grade student groups on one event loop, bounded by a semaphore"""
+        total = len(student_groups)
+        semaphore = asyncio.Semaphore(self.workers)
+        completed = 0
+
+        async def grade_bounded(
+            index: int, student_key: str, file_paths: List[str]
+        ) -> Optional[AssignmentGrade]:
+            nonlocal completed
+            async with semaphore:
+                grade = await self._agrade_student(
+                    index, total, student_key, file_paths
                 )
+            self._record_grade(grade)
+            completed += 1
+            logger.info("Progress: %s/%s student(s) processed", completed, total)
+            return grade
 
-                # Process based on file types
-                if code_files and not doc_files:
-                    # Pure code submission
-                    grade = self._grade_code_submission(
-                        code_files, student_name, student_id, is_late
-                    )
-                elif doc_files and not code_files:
-                    # Pure document submission (existing logic)
-                    grade = self._grade_document_submission(
-                        doc_files, student_name, student_id, is_late
-                    )
-                else:
-                    # Mixed submission
-                    grade = self._grade_mixed_submission(
-                        code_files, doc_files, student_name, student_id, is_late
+        try:
+            results = await asyncio.gather(
+                *(
+                    grade_bounded(i, student_key, file_paths)
+                    for i, (student_key, file_paths) in enumerate(
+                        student_groups.items(), 1
                     )
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            # The pool's connections belong to this event loop, which
+            # asyncio.run closes on return
+            if self.http_async_client is not None:
+                await self.http_async_client.aclose()
+
+        # _agrade_student handles its own errors; anything left here is
+        # unexpected, so record it against the student and carry on
+        grades = []
+        for (student_key, file_paths), result in zip(student_groups.items(), results):
+            if isinstance(result, BaseException):
+                logger.error("Error processing %s: %s", student_key, result)
+                result = self._student_error_grade({}, file_paths)
+                self._record_grade(result)
+            grades.append(result)
+        return grades
 
-                if grade:
-                    # Add file list
-                    grade.file_list = [os.path.basename(f) for f in file_paths]
-                    grades.append(grade)
-                    logger.info(
-                        f"Grade: {grade.total_score}/{grade.max_score} "
-                        f"({grade.get_percentage():.1f}%)"
-                    )
-                    if grade.requires_human_review:
-                        logger.warning(f"⚠️  Flagged for review: {grade.review_reason}")
-                else:
-                    logger.error(f"Failed to grade submission: {student_key}")
-
-            except Exception as e:
-                logger.error(f"Error processing {student_key}: {str(e)}", exc_info=True)
-                # Create error grade
-                error_grade = self.grading_agent._create_error_grade(
-                    self.assignment_config,
-                    student_info.get("student_name", "unknown"),
-                    student_info.get("student_id", "unknown"),
-                    f"{len(file_paths)} files",
+    def _grade_student(
+        self, index: int, total: int, student_key: str, file_paths: List[str]
+    ) -> Optional[AssignmentGrade]:
+        """Grade one student's group of files (errors yield an error grade)"""
+        student_info: Dict[str, Any] = {}
+        try:
+            cache_key = self._grade_cache_key(file_paths)
+            cached = self._cached_grade(cache_key, index, total, student_key)
+            if cached:
+                return cached
+
+            student_info, code_files, doc_files = self._prepare_student(
+                index, total, student_key, file_paths
+            )
+            grade = self._grade_student_files(code_files, doc_files, student_info)
+
+            grade = self._finalize_student_grade(
+                grade, student_key, student_info["file_names"]
+            )
+            self._cache_grade(cache_key, grade)
+            return grade
+
+        except Exception as e:
+            logger.error("Error processing %s: %s", student_key, e, exc_info=True)
+            return self._student_error_grade(student_info, file_paths)
+
+    async def _agrade_student(
+        self, index: int, total: int, student_key: str, file_paths: List[str]
+    ) -> Optional[AssignmentGrade]:
+        """Async version of _grade_student"""
+        student_info: Dict[str, Any] = {}
+        try:
+            # Hashing the files and the SQLite read block, so keep them off
+            # the event loop
+            cache_key = await asyncio.to_thread(self._grade_cache_key, file_paths)
+            cached = await asyncio.to_thread(
+                self._cached_grade, cache_key, index, total, student_key
+            )
+            if cached:
+                return cached
+
+            student_info, code_files, doc_files = self._prepare_student(
+                index, total, student_key, file_paths
+            )
+            if doc_files and not code_files:
+                grade = await self._agrade_document_submission(
+                    doc_files, *self._student_identity(student_info)
+                )
+            else:
+                # Code agents are synchronous; keep them off the event loop
+                grade = await asyncio.to_thread(
+                    self._grade_student_files, code_files, doc_files, student_info
                 )
-                grades.append(error_grade)
 
-        logger.info("\n" + "=" * 80)
-        logger.info(f"Completed grading {len(grades)} submission(s)")
-        logger.info("=" * 80)
+            grade = self._finalize_student_grade(
+                grade, student_key, student_info["file_names"]
+            )
+            # The insert commits under the cache's lock
+            await asyncio.to_thread(self._cache_grade, cache_key, grade)
+            return grade
 
-        return grades
+        except Exception as e:
+            logger.error("Error processing %s: %s", student_key, e, exc_info=True)
+            return self._student_error_grade(student_info, file_paths)
+
+    def _grade_student_files(
+        self,
+        code_files: List[str],
+        doc_files: List[str],
+        student_info: Dict[str, Any],
+    ) -> Optional[AssignmentGrade]:
+        """Grade a student's files with the pipeline for their file types"""
+        identity = self._student_identity(student_info)
+        if code_files and not doc_files:
+            # Pure code submission
+            return self._grade_code_submission(code_files, *identity)
+        if doc_files and not code_files:
+            # Pure document submission
+            return self._grade_document_submission(doc_files, *identity)
+        # Mixed submission
+        return self._grade_mixed_submission(code_files, doc_files, *identity)
+
+    @staticmethod
+    def _student_identity(student_info: Dict[str, Any]) -> tuple:
+        """(student_name, student_id, is_late) for the submission graders"""
+        return (
+            student_info["student_name"],
+            student_info["student_id"],
+            student_info["is_late"],
+        )
+
+    def _grade_cache_key(self, file_paths: List[str]) -> Optional[str]:
+        """Grade cache key for a student's files (None when caching is off)"""
+        if self.grade_cache is None:
+            return None
+        return self.grade_cache.make_key(file_paths, self._grade_settings)
+
+    def _cached_grade(
+        self, cache_key: Optional[str], index: int, total: int, student_key: str
+    ) -> Optional[AssignmentGrade]:
+        """Grade from a previous run of the same submission, if any"""
+        if cache_key is None:
+            return None
+        grade = self.grade_cache.get_grade(cache_key)
+        if grade:
+            logger.info(
+                "\n[%s/%s] %s: unchanged, reusing previous grade (%s/%s)",
+                index,
+                total,
+                student_key,
+                grade.total_score,
+                grade.max_score,
+            )
+        return grade
+
+    def _cache_grade(self, cache_key: Optional[str], grade: Optional[AssignmentGrade]):
+        """Remember a finished grade; flagged and failed grades are redone"""
+        if (
+            cache_key is None
+            or grade is None
+            or grade.requires_human_review
+            or any(q.grading_error for q in grade.questions)
+        ):
+            return
+        self.grade_cache.set_grade(cache_key, grade)
+
+    def _prepare_student(
+        self, index: int, total: int, student_key: str, file_paths: List[str]
+    ) -> tuple:
+        """Resolve student info and split the student's files by type"""
+        # File names are resolved once and reused for the grade's file list
+        file_names = [self._file_name(f) for f in file_paths]
+        logger.info("\n[%s/%s] Processing: %s", index, total, student_key)
+        logger.info("  Files (%s): %s", len(file_paths), file_names)
+
+        # Get student info from group
+        student_info = self.submission_grouper.get_student_info(file_paths)
+        student_info["file_names"] = file_names
+
+        if student_info["is_late"]:
+            logger.info("  ⚠️  Marked as LATE submission")
+
+        # Categorize files by type
+        categorized = self.submission_grouper.categorize_files_by_type(file_paths)
+        code_files = categorized["code"]
+        doc_files = categorized["document"]
+
+        logger.info(
+            "  Code files: %s, Document files: %s", len(code_files), len(doc_files)
+        )
+
+        return student_info, code_files, doc_files
+
+    def _is_empty_submission(self, file_paths: List[str]) -> bool:
+        """Whether a student's submission is a single zero-byte document"""
+        return (
+            len(file_paths) == 1
+            and self._file_size(file_paths[0]) == 0
+            and bool(
+                self.submission_grouper.categorize_files_by_type(file_paths)["document"]
+            )
+        )
+
+    def _grade_empty_student(
+        self, student_key: str, file_paths: List[str]
+    ) -> Optional[AssignmentGrade]:
+        """Zero grade for a single empty document (no LLM calls)"""
+        student_info = self.submission_grouper.get_student_info(file_paths)
+        logger.info("\n[empty] Processing: %s", student_key)
+        try:
+            grade = self._empty_file_grade(
+                file_paths,
+                student_info["student_name"],
+                student_info["student_id"],
+                student_info["is_late"],
+            )
+            return self._finalize_student_grade(
+                grade, student_key, [self._file_name(f) for f in file_paths]
+            )
+        except Exception as e:
+            logger.error("Error processing %s: %s", student_key, e, exc_info=True)
+            return self._student_error_grade(student_info, file_paths)
+
+    def _finalize_student_grade(
+        self,
+        grade: Optional[AssignmentGrade],
+        student_key: str,
+        file_names: List[str],
+    ) -> Optional[AssignmentGrade]:
+        """Attach the file list to a finished grade and log the outcome"""
+        if not grade:
+            logger.error("Failed to grade submission: %s", student_key)
+            return None
+
+        # Add file list
+        grade.file_list = file_names
+        logger.info(
+            "Grade: %s/%s (%.1f%%)",
+            grade.total_score,
+            grade.max_score,
+            grade.get_percentage(),
+        )
+        if grade.requires_human_review:
+            logger.warning("⚠️  Flagged for review: %s", grade.review_reason)
+        return grade
+
+    def _student_error_grade(
+        self, student_info: Dict[str, Any], file_paths: List[str]
+    ) -> AssignmentGrade:
+        """Error grade for a student whose processing raised"""
+        return self.grading_agent._create_error_grade(
+            self.assignment_config,
+            student_info.get("student_name", "unknown"),
+            student_info.get("student_id", "unknown"),
+            f"{len(file_paths)} files",
+        )
 
     def _grade_code_submission(
         self, code_files: List[str], student_name: str, student_id: str, is_late: bool
@@ -319,6 +819,7 @@ class GradingWorkflow:
                 extracted_answers,
                 student_id,
                 f"{len(code_files)} code file(s)",
+                include_overall_comment=True,
             )
 
             if not grade:
@@ -326,16 +827,10 @@ class GradingWorkflow:
 
             # Generate report
             logger.info("  Stage 4: Generating report...")
-            report_data = self.report_generator.generate_report(
-                grade.questions, self.assignment_config, student_name
-            )
+            report_data = self._generate_report(grade, student_name)
 
             # Update grade with report and code-specific data
-            grade.overall_comment = report_data["overall_comment"]
-            grade.strengths = report_data["strengths"]
-            grade.areas_for_improvement = report_data["areas_for_improvement"]
-            grade.requires_human_review = report_data["requires_human_review"]
-            grade.review_reason = report_data["review_reason"]
+            self._apply_report(grade, report_data)
 
             grade.is_late = is_late
             grade.file_count = len(code_files)
@@ -345,7 +840,7 @@ class GradingWorkflow:
             return grade
 
         except Exception as e:
-            logger.error(f"Error grading code submission: {str(e)}", exc_info=True)
+            logger.error("Error grading code submission: %s", e, exc_info=True)
             return None
 
     def _grade_document_submission(
@@ -355,112 +850,97 @@ class GradingWorkflow:
         logger.info("  Type: Document submission")
 
         try:
-            # Process all document files and combine their content
-            if len(doc_files) == 1:
-                # Single file - use existing pipeline
-                primary_file = doc_files[0]
-
-                # Check if file is empty
-                file_size = os.path.getsize(primary_file)
-                if file_size == 0:
-                    logger.warning(f"  Empty file: {os.path.basename(primary_file)}")
-                    grade = self.grading_agent.grade_empty_submission(
-                        self.assignment_config,
-                        student_name,
-                        student_id,
-                        os.path.basename(primary_file),
-                    )
-                    grade.is_late = is_late
-                    grade.file_count = len(doc_files)
-                    return grade
-
-                # STAGE 1: Extract answers from single file
-                logger.info("  Stage 1: Extracting answers...")
-                extracted_answers = self.answer_extractor.extract_answers(
-                    primary_file, self.assignment_config
-                )
+            # Single empty file - nothing to extract
+            empty_grade = self._empty_file_grade(
+                doc_files, student_name, student_id, is_late
+            )
+            if empty_grade:
+                return empty_grade
+
+            # STAGE 1: Extract answers from every file (in parallel when a
+            # student submitted several)
+            logger.info("  Stage 1: Extracting answers...")
+            non_empty_files = self._non_empty_files(doc_files)
+            if len(non_empty_files) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(len(non_empty_files), 8)
+                ) as executor:
+                    results = list(executor.map(self._extract_answers, non_empty_files))
             else:
-                # Multiple files - extract from each and combine
-                logger.info(f"  Processing {len(doc_files)} document files...")
+                results = [
+                    self._extract_answers(doc_file) for doc_file in non_empty_files
+                ]
+            extracted_answers = self._combine_extracted_answers(
+                doc_files, list(zip(non_empty_files, results))
+            )
+
+            if not self._has_content(extracted_answers):
+                return self._no_content_grade(
+                    doc_files, student_name, student_id, is_late, extracted_answers
+                )
+
+            # STAGE 2: Grade each question individually
+            logger.info("  Stage 2: Grading individual questions...")
+            grade = self.grading_agent.grade_submission_with_extraction(
+                self.assignment_config,
+                student_name,
+                extracted_answers,
+                student_id,
+                self._document_description(doc_files),
+                include_overall_comment=True,
+            )
 
-                all_extracted_answers = {}
+            if not grade:
+                return None
 
-                # Extract from each file
-                for idx, doc_file in enumerate(doc_files, 1):
-                    filename = os.path.basename(doc_file)
-                    logger.info(f"    File {idx}/{len(doc_files)}: {filename}")
+            # STAGE 3: Generate comprehensive report
+            logger.info("  Stage 3: Generating report...")
+            report_data = self._generate_report(grade, student_name)
+            return self._complete_document_grade(
+                grade, report_data, doc_files, is_late, extracted_answers
+            )
 
-                    # Check if file is empty
-                    file_size = os.path.getsize(doc_file)
-                    if file_size == 0:
-                        logger.warning(f"      Empty file, skipping")
-                        continue
+        except Exception as e:
+            logger.error("Error grading document submission: %s", e, exc_info=True)
+            return None
 
-                    # Extract answers from this file
-                    file_answers = self.answer_extractor.extract_answers(
-                        doc_file, self.assignment_config
-                    )
+    async def _agrade_document_submission(
+        self, doc_files: List[str], student_name: str, student_id: str, is_late: bool
+    ) -> Optional[AssignmentGrade]:
+        """Async version of _grade_document_submission"""
+        logger.info("  Type: Document submission")
 
-                    # Store with file context
-                    for question_id, answer_data in file_answers.items():
-                        if question_id not in all_extracted_answers:
-                            all_extracted_answers[question_id] = {
-                                "text": "",
-                                "extracted_from_image": False,
-                                "extraction_notes": f"Multi-file submission ({len(doc_files)} files)",
-                            }
-
-                        # Append answer from this file
-                        if answer_data.get("text", "").strip():
-                            all_extracted_answers[question_id][
-                                "text"
-                            ] += f"\n\n--- From {filename} ---\n{answer_data['text']}"
-
-                        # Track if any came from images
-                        if answer_data.get("extracted_from_image"):
-                            all_extracted_answers[question_id][
-                                "extracted_from_image"
-                            ] = True
-
-                extracted_answers = all_extracted_answers
-                logger.info("  Combined answers from all files")
-
-            # Check if any answers were extracted
-            has_content = any(
-                answer_data.get("text", "").strip()
-                for answer_data in extracted_answers.values()
+        try:
+            empty_grade = self._empty_file_grade(
+                doc_files, student_name, student_id, is_late
+            )
+            if empty_grade:
+                return empty_grade
+
+            # STAGE 1: Extract answers from all files concurrently
+            logger.info("  Stage 1: Extracting answers...")
+            non_empty_files = self._non_empty_files(doc_files)
+            results = await asyncio.gather(
+                *(self._aextract_answers(doc_file) for doc_file in non_empty_files)
+            )
+            extracted_answers = self._combine_extracted_answers(
+                doc_files, list(zip(non_empty_files, results))
             )
 
-            if not has_content:
-                logger.warning(f"  No content extracted")
-                submission_desc = (
-                    f"{len(doc_files)} file(s)"
-                    if len(doc_files) > 1
-                    else os.path.basename(doc_files[0])
-                )
-                grade = self.grading_agent.grade_empty_submission(
-                    self.assignment_config,
-                    student_name,
-                    student_id,
-                    submission_desc,
+            if not self._has_content(extracted_answers):
+                return self._no_content_grade(
+                    doc_files, student_name, student_id, is_late, extracted_answers
                 )
-                grade.is_late = is_late
-                grade.file_count = len(doc_files)
-                return grade
 
-            # STAGE 2: Grade each question individually
+            # STAGE 2: Grade all questions concurrently
             logger.info("  Stage 2: Grading individual questions...")
-            submission_desc = (
-                f"{len(doc_files)} file(s)"
-                if len(doc_files) > 1
-                else os.path.basename(doc_files[0])
-            )
-            grade = self.grading_agent.grade_submission_with_extraction(
+            grade = await self.grading_agent.agrade_submission_with_extraction(
                 self.assignment_config,
                 student_name,
                 extracted_answers,
                 student_id,
-                submission_desc,
+                self._document_description(doc_files),
+                include_overall_comment=True,
             )
 
             if not grade:
@@ -468,27 +948,231 @@ class GradingWorkflow:
 
             # STAGE 3: Generate comprehensive report
             logger.info("  Stage 3: Generating report...")
-            report_data = self.report_generator.generate_report(
-                grade.questions, self.assignment_config, student_name
+            report_data = await self._agenerate_report(grade, student_name)
+            return self._complete_document_grade(
+                grade, report_data, doc_files, is_late, extracted_answers
             )
 
-            # Update grade with report data
-            grade.overall_comment = report_data["overall_comment"]
-            grade.strengths = report_data["strengths"]
-            grade.areas_for_improvement = report_data["areas_for_improvement"]
-            grade.requires_human_review = report_data["requires_human_review"]
-            grade.review_reason = report_data["review_reason"]
+        except Exception as e:
+            logger.error("Error grading document submission: %s", e, exc_info=True)
+            return None
 
-            grade.is_late = is_late
-            grade.file_count = len(doc_files)
-            grade.submission_type = "document"
+    def _complete_document_grade(
+        self,
+        grade: AssignmentGrade,
+        report_data: Optional[ReportData],
+        doc_files: List[str],
+        is_late: bool,
+        extracted_answers: Dict[str, Dict[str, Any]],
+    ) -> AssignmentGrade:
+        """Attach the report and submission details to a graded document"""
+        self._apply_report(grade, report_data)
+        self._flag_failed_extraction(grade, extracted_answers)
+        grade.is_late = is_late
+        grade.file_count = len(doc_files)
+        grade.submission_type = "document"
+        return grade
+
+    @staticmethod
+    def _flag_failed_extraction(
+        grade: AssignmentGrade, extracted_answers: Dict[str, Dict[str, Any]]
+    ):
+        """Flag a grade whose answers came from a failed extraction step"""
+        if not any(a.get("extraction_failed") for a in extracted_answers.values()):
+            return
+        reason = "Answer extraction failed; graded on partial content"
+        grade.requires_human_review = True
+        grade.review_reason = (
+            f"{grade.review_reason}; {reason}" if grade.review_reason else reason
+        )
 
-            return grade
+    def _empty_file_grade(
+        self, doc_files: List[str], student_name: str, student_id: str, is_late: bool
+    ) -> Optional[AssignmentGrade]:
+        """Return a zero grade if the submission is a single empty file"""
+        if len(doc_files) != 1:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error grading document submission: {str(e)}", exc_info=True)
+        primary_file = doc_files[0]
+        if self._file_size(primary_file) != 0:
             return None
 
+        logger.warning("  Empty file: %s", self._file_name(primary_file))
+        grade = self.grading_agent.grade_empty_submission(
+            self.assignment_config,
+            student_name,
+            student_id,
+            self._file_name(primary_file),
+        )
+        grade.is_late = is_late
+        grade.file_count = len(doc_files)
+        return grade
+
+    def _file_size(self, file_path: str) -> int:
+        """Size of a submission file, from the directory scan when available"""
+        scanned = self._scanned_files.get(file_path)
+        return scanned.size if scanned else os.path.getsize(file_path)
+
+    def _file_name(self, file_path: str) -> str:
+        """Base name of a submission file, from the directory scan when available"""
+        scanned = self._scanned_files.get(file_path)
+        return scanned.name if scanned else os.path.basename(file_path)
+
+    def _non_empty_files(self, doc_files: List[str]) -> List[str]:
+        """Filter out empty files from a multi-file submission"""
+        if len(doc_files) == 1:
+            return doc_files
+
+        logger.info("  Processing %s document files...", len(doc_files))
+        non_empty = []
+        for idx, doc_file in enumerate(doc_files, 1):
+            logger.info(
+                "    File %s/%s: %s", idx, len(doc_files), self._file_name(doc_file)
+            )
+            if self._file_size(doc_file) == 0:
+                logger.warning("      Empty file, skipping")
+                continue
+            non_empty.append(doc_file)
+        return non_empty
+
+    def _combine_extracted_answers(
+        self,
+        doc_files: List[str],
+        file_answers: List[tuple],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Combine per-file extracted answers into one answer per question"""
+        if len(doc_files) == 1:
+            return file_answers[0][1]
+
+        # Collect each question's per-file sections and join them once at the
+        # end, rather than re-copying the growing text on every append
+        all_extracted_answers = {}
+        text_parts: Dict[str, List[str]] = {}
+        for doc_file, answers in file_answers:
+            filename = self._file_name(doc_file)
+
+            # Store with file context
+            for question_id, answer_data in answers.items():
+                if question_id not in all_extracted_answers:
+                    all_extracted_answers[question_id] = {
+                        "text": "",
+                        "extracted_from_image": False,
+                        "extraction_notes": f"Multi-file submission ({len(doc_files)} files)",
+                    }
+                    text_parts[question_id] = []
+
+                # Append answer from this file
+                if self._is_text(answer_data.get("text", "")):
+                    text_parts[question_id].append(
+                        f"\n\n--- From {filename} ---\n{answer_data['text']}"
+                    )
+
+                # Track if any came from images
+                if answer_data.get("extracted_from_image"):
+                    all_extracted_answers[question_id]["extracted_from_image"] = True
+
+                # A failed extraction of any file taints the combined answer
+                if answer_data.get("extraction_failed"):
+                    all_extracted_answers[question_id]["extraction_failed"] = True
+
+        for question_id, parts in text_parts.items():
+            all_extracted_answers[question_id]["text"] = "".join(parts)
+
+        logger.info("  Combined answers from all files")
+        return all_extracted_answers
+
+    @staticmethod
+    def _is_text(text: str) -> bool:
+        """Whether text has any non-whitespace (without copying it like strip)"""
+        return bool(text) and not text.isspace()
+
+    @staticmethod
+    def _has_content(extracted_answers: Dict[str, Dict[str, Any]]) -> bool:
+        """Check if any answers were extracted"""
+        return any(
+            GradingWorkflow._is_text(answer_data.get("text", ""))
+            for answer_data in extracted_answers.values()
+        )
+
+    def _document_description(self, doc_files: List[str]) -> str:
+        """Describe the submitted document files for the grade record"""
+        return (
+            f"{len(doc_files)} file(s)"
+            if len(doc_files) > 1
+            else self._file_name(doc_files[0])
+        )
+
+    def _no_content_grade(
+        self,
+        doc_files: List[str],
+        student_name: str,
+        student_id: str,
+        is_late: bool,
+        extracted_answers: Dict[str, Dict[str, Any]],
+    ) -> AssignmentGrade:
+        """Zero grade for a submission where nothing could be extracted"""
+        logger.warning("  No content extracted")
+        grade = self.grading_agent.grade_empty_submission(
+            self.assignment_config,
+            student_name,
+            student_id,
+            self._document_description(doc_files),
+        )
+        self._flag_failed_extraction(grade, extracted_answers)
+        grade.is_late = is_late
+        grade.file_count = len(doc_files)
+        return grade
+
+    def _needs_llm_report(self, grade: AssignmentGrade) -> bool:
+        """
+        Whether a grade's report needs an LLM-written comment
+
+        Clear passes and clear fails get the template comment for their band
+        instead (unless always_report is set). A comment written during
+        grading is always used since it is already paid for.
+        """
+        if self.always_report or grade.overall_comment is not None:
+            return True
+        percentage = grade.get_percentage()
+        return QUICK_REPORT_BELOW < percentage < QUICK_REPORT_ABOVE
+
+    def _generate_report(self, grade: AssignmentGrade, student_name: str) -> ReportData:
+        """Report for a graded submission (LLM only for the middle band)"""
+        if not self._needs_llm_report(grade):
+            return self.report_generator.quick_report(
+                grade.questions, self.assignment_config
+            )
+        return self.report_generator.generate_report(
+            grade.questions,
+            self.assignment_config,
+            student_name,
+            overall_comment=grade.overall_comment,
+        )
+
+    async def _agenerate_report(
+        self, grade: AssignmentGrade, student_name: str
+    ) -> ReportData:
+        """Async version of _generate_report"""
+        if not self._needs_llm_report(grade):
+            return self.report_generator.quick_report(
+                grade.questions, self.assignment_config
+            )
+        return await self.report_generator.agenerate_report(
+            grade.questions,
+            self.assignment_config,
+            student_name,
+            overall_comment=grade.overall_comment,
+        )
+
+    @staticmethod
+    def _apply_report(grade: AssignmentGrade, report_data: ReportData):
+        """Copy report fields onto the grade"""
+        grade.overall_comment = report_data.overall_comment
+        grade.strengths = report_data.strengths
+        grade.areas_for_improvement = report_data.areas_for_improvement
+        grade.requires_human_review = report_data.requires_human_review
+        grade.review_reason = report_data.review_reason
+
     def _grade_mixed_submission(
         self,
         code_files: List[str],
@@ -510,25 +1194,34 @@ class GradingWorkflow:
             )
 
             # Extract from document files
-            doc_text = ""
+            doc_sections = []
             for doc_file in doc_files:
-                text = self.doc_processor.extract_text_from_file(doc_file)
-                doc_text += (
-                    f"\n\n--- Document: {os.path.basename(doc_file)} ---\n{text}"
+                # Empty files (size known from the scan) are not opened
+                text = (
+                    self.doc_processor.extract_text_from_file(doc_file)
+                    if self._file_size(doc_file)
+                    else ""
+                )
+                doc_sections.append(
+                    f"\n\n--- Document: {self._file_name(doc_file)} ---\n{text}"
                 )
 
             # Combine content
-            combined_content = code_submission["combined_code"] + "\n\n" + doc_text
+            combined_content = "".join(
+                [code_submission["combined_code"], "\n\n", *doc_sections]
+            )
 
             # Create temporary extracted answers with combined content
             # Let AI map content to questions
-            extracted_answers = {}
-            for question in self.assignment_config.questions:
-                extracted_answers[question.id] = {
-                    "text": combined_content,
-                    "extracted_from_image": False,
-                    "extraction_notes": f"Mixed submission: {len(code_files)} code + {len(doc_files)} document file(s)",
-                }
+            answer = {
+                "text": combined_content,
+                "extracted_from_image": False,
+                "extraction_notes": f"Mixed submission: {len(code_files)} code + {len(doc_files)} document file(s)",
+            }
+            extracted_answers = {
+                question.id: dict(answer)
+                for question in self.assignment_config.questions
+            }
 
             # Grade
             logger.info("  Stage 2: Grading questions...")
@@ -538,6 +1231,7 @@ class GradingWorkflow:
                 extracted_answers,
                 student_id,
                 f"{len(code_files) + len(doc_files)} files",
+                include_overall_comment=True,
             )
 
             if not grade:
@@ -545,16 +1239,10 @@ class GradingWorkflow:
 
             # Generate report
             logger.info("  Stage 3: Generating report...")
-            report_data = self.report_generator.generate_report(
-                grade.questions, self.assignment_config, student_name
-            )
+            report_data = self._generate_report(grade, student_name)
 
             # Update grade
-            grade.overall_comment = report_data["overall_comment"]
-            grade.strengths = report_data["strengths"]
-            grade.areas_for_improvement = report_data["areas_for_improvement"]
-            grade.requires_human_review = report_data["requires_human_review"]
-            grade.review_reason = report_data["review_reason"]
+            self._apply_report(grade, report_data)
 
             grade.is_late = is_late
             grade.file_count = len(code_files) + len(doc_files)
@@ -563,17 +1251,13 @@ class GradingWorkflow:
             return grade
 
         except Exception as e:
-            logger.error(f"Error grading mixed submission: {str(e)}", exc_info=True)
+            logger.error("Error grading mixed submission: %s", e, exc_info=True)
             return None
 
     def _convert_code_to_answers(
         self, code_submission: dict, code_evaluation: dict
     ) -> Dict[str, Dict[str, Any]]:
         """Convert code submission to extracted answers format"""
-        # Create answer entries for each question
-        # For code assignments, typically all code answers all questions
-        extracted_answers = {}
-
         combined_code = code_submission.get("combined_code", "")
         analysis = code_submission.get("analysis", "")
         ai_eval = code_evaluation.get("ai_evaluation", {})
@@ -584,14 +1268,17 @@ class GradingWorkflow:
         if ai_eval:
             full_content += f"\n\nAI Evaluation:\n{str(ai_eval)}"
 
-        for question in self.assignment_config.questions:
-            extracted_answers[question.id] = {
-                "text": full_content,
-                "extracted_from_image": False,
-                "extraction_notes": f"Code submission with {code_submission.get('file_count', 0)} file(s)",
-            }
-
-        return extracted_answers
+        # Create answer entries for each question
+        # For code assignments, typically all code answers all questions, so
+        # the entry is built once and each question gets a copy
+        answer = {
+            "text": full_content,
+            "extracted_from_image": False,
+            "extraction_notes": f"Code submission with {code_submission.get('file_count', 0)} file(s)",
+        }
+        return {
+            question.id: dict(answer) for question in self.assignment_config.questions
+        }
 
     def save_results(self, grades: List[AssignmentGrade]):
         """Save grading results"""
@@ -603,14 +1290,8 @@ class GradingWorkflow:
 
         try:
             # Use modified assignment_id with grading mode suffix if not full
-            output_id = (
-                f"{self.assignment_id}_{self.grading_mode}"
-                if self.grading_mode != "full"
-                else self.assignment_id
-            )
-
             saved_files = self.output_manager.save_results(
-                output_id,
+                self.output_id,
                 grades,
                 include_csv=True,
                 include_json=True,
@@ -619,10 +1300,10 @@ class GradingWorkflow:
 
             logger.info("\nOutput files created:")
             for format_name, file_path in saved_files.items():
-                logger.info(f"  - {format_name}: {file_path}")
+                logger.info("  - %s: %s", format_name, file_path)
 
         except Exception as e:
-            logger.error(f"Error saving results: {str(e)}")
+            logger.error("Error saving results: %s", e)
             raise
 
     def print_summary(self, grades: List[AssignmentGrade]):
@@ -653,12 +1334,22 @@ class GradingWorkflow:
             return True
 
         except Exception as e:
-            logger.error(f"Fatal error in grading workflow: {str(e)}", exc_info=True)
+            logger.error("Fatal error in grading workflow: %s", e, exc_info=True)
             return False
 
+        finally:
+            self.stop_logging()
+
 
-def list_assignments(assignments_base_dir: str = ASSIGNMENTS_BASE_DIR):
+def list_assignments(assignments_base_dir: Optional[str] = None):
     """List all available assignments"""
+    from src.processors.input_processor import InputProcessor
+
+    if assignments_base_dir is None:
+        from config import ASSIGNMENTS_BASE_DIR
+
+        assignments_base_dir = ASSIGNMENTS_BASE_DIR
+
     processor = InputProcessor(assignments_base_dir)
     assignments = processor.list_available_assignments()
 
@@ -671,26 +1362,29 @@ def list_assignments(assignments_base_dir: str = ASSIGNMENTS_BASE_DIR):
     print("-" * 60)
 
     for assignment_id in assignments:
-        config = processor.load_assignment(assignment_id)
-        if config:
+        summary = processor.load_assignment_summary(assignment_id)
+        if summary:
             print(f"  {assignment_id}")
-            print(f"    Name: {config.assignment_name}")
-            print(f"    Questions: {len(config.questions)}")
-            print(f"    Total Points: {config.total_points}")
+            print(f"    Name: {summary['assignment_name']}")
+            print(f"    Questions: {summary['num_questions']}")
+            print(f"    Total Points: {summary['total_points']}")
             print()
 
 
 def create_assignment_template(assignment_id: str, num_questions: int = 2):
     """Create a new assignment template"""
+    from config import ASSIGNMENTS_BASE_DIR, SUBMISSIONS_BASE_DIR
+    from src.processors.input_processor import InputProcessor
+
     processor = InputProcessor(ASSIGNMENTS_BASE_DIR)
 
     if processor.create_assignment_template(assignment_id, num_questions):
         print(f"\n✓ Created assignment template: {assignment_id}")
-        print(f"  Location: {os.path.join(ASSIGNMENTS_BASE_DIR, assignment_id)}")
+        print(f"  Location: {Path(ASSIGNMENTS_BASE_DIR) / assignment_id}")
         print(f"\nNext steps:")
         print(f"  1. Edit config.json to customize the assignment")
         print(
-            f"  2. Add student submissions to: {os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)}/"
+            f"  2. Add student submissions to: {Path(SUBMISSIONS_BASE_DIR) / assignment_id}/"
         )
         print(f"  3. Run: python main.py --assignment {assignment_id}")
     else:
@@ -705,19 +1399,34 @@ def generate_config_from_pdf(
     course_code: Optional[str] = None,
     term: Optional[str] = None,
     auto_approve: bool = False,
+    pdf_backend: str = "pymupdf",
 ):
     """Generate assignment configuration from PDF files"""
+    from config import (
+        OPENAI_API_KEY,
+        OPENAI_MODEL,
+        ASSIGNMENTS_BASE_DIR,
+        SUBMISSIONS_BASE_DIR,
+    )
 
-    print("\n" + "=" * 80)
-    print("ASSIGNMENT CONFIG GENERATOR")
-    print("=" * 80)
-    print(f"Assignment ID: {assignment_id}")
-    print(f"Assignment Name: {assignment_name}")
-    print(f"Questions PDF: {questions_pdf}")
-    print(f"Answer Key PDF: {answer_key_pdf or 'Not provided'}")
-    print(f"Course: {course_code or 'Not specified'}")
-    print(f"Term: {term or 'Not specified'}")
-    print("=" * 80)
+    # Each block is printed with one call (one write/flush on a terminal)
+    header = [
+        "\n" + "=" * 80,
+        "ASSIGNMENT CONFIG GENERATOR",
+        "=" * 80,
+        f"Assignment ID: {assignment_id}",
+        f"Assignment Name: {assignment_name}",
+        f"Questions PDF: {questions_pdf}",
+        f"Answer Key PDF: {answer_key_pdf or 'Not provided'}",
+        f"Course: {course_code or 'Not specified'}",
+        f"Term: {term or 'Not specified'}",
+        "=" * 80,
+    ]
+    print("\n".join(header))
+
+    assignment_dir = Path(ASSIGNMENTS_BASE_DIR) / assignment_id
+    submissions_dir = Path(SUBMISSIONS_BASE_DIR) / assignment_id
+    config_path = assignment_dir / "config.json"
 
     # Check if files exist
     if not os.path.exists(questions_pdf):
@@ -729,8 +1438,7 @@ def generate_config_from_pdf(
         return 1
 
     # Check if assignment already exists
-    assignment_dir = os.path.join(ASSIGNMENTS_BASE_DIR, assignment_id)
-    if os.path.exists(assignment_dir):
+    if assignment_dir.exists():
         print(f"\n⚠ Warning: Assignment '{assignment_id}' already exists")
         response = input("Overwrite existing configuration? (yes/no): ").strip().lower()
         if response not in ["yes", "y"]:
@@ -740,7 +1448,11 @@ def generate_config_from_pdf(
     try:
         # Initialize config generator
         print("\nInitializing config generator agent...")
-        generator = ConfigGeneratorAgent(OPENAI_API_KEY, model=OPENAI_MODEL)
+        from src.agents.config_generator_agent import ConfigGeneratorAgent
+
+        generator = ConfigGeneratorAgent(
+            OPENAI_API_KEY, model=OPENAI_MODEL, pdf_backend=pdf_backend
+        )
 
         # Generate configuration
         print("Analyzing PDFs and generating configuration...")
@@ -753,6 +1465,7 @@ def generate_config_from_pdf(
             answer_key_pdf_path=answer_key_pdf,
             course_code=course_code,
             term=term,
+            use_processes=True,
         )
 
         # Validate configuration
@@ -785,58 +1498,59 @@ def generate_config_from_pdf(
                     "\n✓ Configuration will be saved. You can edit it manually after."
                 )
 
-        # Create assignment directory
-        os.makedirs(assignment_dir, exist_ok=True)
-
-        # Create submissions directory
-        submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
-        os.makedirs(submissions_dir, exist_ok=True)
+        # Create assignment and submissions directories
+        assignment_dir.mkdir(parents=True, exist_ok=True)
+        submissions_dir.mkdir(parents=True, exist_ok=True)
 
         # Save configuration
-        config_path = os.path.join(assignment_dir, "config.json")
-        generator.save_config(config, config_path, pretty=True)
+        generator.save_config(config, str(config_path), pretty=True)
 
         # Create README
-        readme_path = os.path.join(assignment_dir, "README.md")
-        with open(readme_path, "w") as f:
-            f.write(f"# {assignment_name}\n\n")
-            f.write(f"**Course:** {course_code or 'N/A'}  \n")
-            f.write(f"**Term:** {term or 'N/A'}  \n")
-            f.write(f"**Total Points:** {config.get('total_points', 0)}  \n\n")
-            f.write(f"## Questions\n\n")
-            f.write(
-                f"This assignment has {len(config.get('questions', []))} questions.\n\n"
-            )
-            f.write(f"## Usage\n\n")
-            f.write(
-                f"1. Place student submissions in: `submissions/{assignment_id}/`\n"
-            )
-            f.write(f"2. Run grading: `python main.py --assignment {assignment_id}`\n")
-            f.write(f"3. View results in: `output/{assignment_id}/`\n\n")
-            f.write(f"## Configuration\n\n")
-            f.write(
-                f"Generated automatically from PDFs. Review and edit `config.json` if needed.\n"
-            )
+        questions_count = len(config.get("questions", []))
+        readme = (
+            f"# {assignment_name}\n\n"
+            f"**Course:** {course_code or 'N/A'}  \n"
+            f"**Term:** {term or 'N/A'}  \n"
+            f"**Total Points:** {config.get('total_points', 0)}  \n\n"
+            f"## Questions\n\n"
+            f"This assignment has {questions_count} questions.\n\n"
+            f"## Usage\n\n"
+            f"1. Place student submissions in: `submissions/{assignment_id}/`\n"
+            f"2. Run grading: `python main.py --assignment {assignment_id}`\n"
+            f"3. View results in: `output/{assignment_id}/`\n\n"
+            f"## Configuration\n\n"
+            f"Generated automatically from PDFs. Review and edit `config.json` if needed.\n"
+        )
+        (assignment_dir / "README.md").write_text(readme, encoding="utf-8")
 
-        print("\n" + "=" * 80)
-        print("✓ SUCCESS")
-        print("=" * 80)
-        print(f"Configuration saved to: {config_path}")
-        print(f"Assignment directory: {assignment_dir}")
-        print(f"Submissions directory: {submissions_dir}")
+        summary = [
+            "\n" + "=" * 80,
+            "✓ SUCCESS",
+            "=" * 80,
+            f"Configuration saved to: {config_path}",
+            f"Assignment directory: {assignment_dir}",
+            f"Submissions directory: {submissions_dir}",
+        ]
 
         if not is_valid:
-            print("\n⚠ Note: Please review and fix validation issues in config.json")
+            summary.append(
+                "\n⚠ Note: Please review and fix validation issues in config.json"
+            )
 
-        print("\n" + "Next steps:")
-        print(f"  1. Review/edit: {config_path}")
-        print(f"  2. Add student submissions to: {submissions_dir}/")
-        print(f"  3. Run: python main.py --assignment {assignment_id}")
+        summary.extend(
+            [
+                "\n" + "Next steps:",
+                f"  1. Review/edit: {config_path}",
+                f"  2. Add student submissions to: {submissions_dir}/",
+                f"  3. Run: python main.py --assignment {assignment_id}",
+            ]
+        )
+        print("\n".join(summary))
 
         return 0
 
     except Exception as e:
-        logger.error(f"Error generating configuration: {str(e)}", exc_info=True)
+        logger.error("Error generating configuration: %s", e, exc_info=True)
         print(f"\n✗ Error: {str(e)}")
         return 1
 
@@ -960,6 +1674,14 @@ Examples:
         help="Skip configuration review prompt (used with --generate-config)",
     )
 
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["pymupdf", "pypdf2"],
+        default="pymupdf",
+        help="PDF text extraction backend (used with --generate-config, "
+        "default: pymupdf)",
+    )
+
     parser.add_argument(
         "--questions",
         "-q",
@@ -981,8 +1703,71 @@ Examples:
         help="Enable code execution for test cases (disabled by default for security)",
     )
 
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=DEFAULT_WORKERS,
+        metavar="N",
+        help=f"Number of students to grade concurrently (default: {DEFAULT_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5,
+        metavar="N",
+        help="Questions graded per LLM call (1 = one call per question, default: 5)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing cached responses",
+    )
+
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Grade with a thread pool instead of the asyncio pipeline",
+    )
+
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Extract answers through the OpenAI Batch API (half the cost, "
+        "results within 24h; for unattended runs)",
+    )
+
+    parser.add_argument(
+        "--always-report",
+        action="store_true",
+        help="Write an LLM overall comment even for clear passes and fails",
+    )
+
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}",
+    )
+
+    # --help and --version exit here, before any settings are loaded
     args = parser.parse_args()
 
+    # Reject an incomplete --generate-config before loading settings
+    if args.generate_config:
+        if not args.name:
+            logger.error("--name is required when using --generate-config")
+            print("Error: --name is required when using --generate-config")
+            return 1
+
+        if not args.questions_pdf:
+            logger.error("--questions-pdf is required when using --generate-config")
+            print("Error: --questions-pdf is required when using --generate-config")
+            return 1
+
+    from config import OPENAI_API_KEY
+
     # Set logging level
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -1004,17 +1789,6 @@ Examples:
 
     # Handle generate-config command
     if args.generate_config:
-        # Validate required arguments
-        if not args.name:
-            logger.error("--name is required when using --generate-config")
-            print("Error: --name is required when using --generate-config")
-            return 1
-
-        if not args.questions_pdf:
-            logger.error("--questions-pdf is required when using --generate-config")
-            print("Error: --questions-pdf is required when using --generate-config")
-            return 1
-
         return generate_config_from_pdf(
             assignment_id=args.generate_config,
             assignment_name=args.name,
@@ -1023,6 +1797,7 @@ Examples:
             course_code=args.course,
             term=args.term,
             auto_approve=args.auto_approve,
+            pdf_backend=args.pdf_backend,
         )
 
     # Handle grading
@@ -1032,6 +1807,12 @@ Examples:
             answer_key_pdf=args.with_answer_key,
             grading_mode=args.grading_mode,
             enable_code_execution=args.enable_code_execution,
+            workers=args.workers,
+            use_async=not args.sync,
+            use_cache=False if args.no_cache else None,
+            question_batch_size=args.batch_size,
+            always_report=args.always_report,
+            use_batch_api=args.batch_api,
         )
         success = workflow.run()
         return 0 if success else 1
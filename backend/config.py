@@ -1,51 +1,136 @@
 """
 Global configuration for Grade Lens grading system
+
+Settings read from the environment are resolved lazily (PEP 562 module
+``__getattr__``): the .env file is loaded and a value parsed only when a
+setting is first accessed, so importing this module is free for commands
+such as ``--help`` that never read one.
 """
 
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Get the project root directory (parent of backend)
 PROJECT_ROOT = Path(__file__).parent.parent
 
-# Load environment variables from backend directory (where .env now lives)
-load_dotenv(dotenv_path=Path(__file__).parent / ".env")
+# .env lives in the backend directory
+DOTENV_PATH = Path(__file__).parent / ".env"
 
-# ============================================================================
-# OpenAI Configuration
-# ============================================================================
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+_dotenv_loaded = False
+_dotenv_lock = threading.Lock()
 
-if not OPENAI_API_KEY:
-    import warnings
-    warnings.warn(
-        "OPENAI_API_KEY not found in environment variables. "
-        "Please set it in your .env file or environment."
-    )
 
-# ============================================================================
-# Directory Paths
-# ============================================================================
-# Base directories (relative to project root)
-ASSIGNMENTS_BASE_DIR = os.path.join(PROJECT_ROOT, os.getenv("ASSIGNMENTS_BASE_DIR", "assignments"))
-SUBMISSIONS_BASE_DIR = os.path.join(PROJECT_ROOT, os.getenv("SUBMISSIONS_BASE_DIR", "submissions"))
-OUTPUT_BASE_DIR = os.path.join(PROJECT_ROOT, os.getenv("OUTPUT_BASE_DIR", "output"))
+def _ensure_loaded():
+    """Load environment variables from the .env file (once)"""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
 
-# ============================================================================
-# Logging Configuration
-# ============================================================================
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+            load_dotenv(dotenv_path=DOTENV_PATH)
+            _dotenv_loaded = True
 
-# ============================================================================
-# LLM Parameters
-# ============================================================================
-# Temperature for LLM (lower = more consistent grading)
-LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
 
-# Maximum retries for API calls
-MAX_API_RETRIES = int(os.getenv("MAX_API_RETRIES", "3"))
+def _env_flag(name: str, default: str = "true") -> bool:
+    return os.getenv(name, default).lower() == "true"
+
+
+def _project_path(name: str, default: str) -> str:
+    return os.path.join(PROJECT_ROOT, os.getenv(name, default))
+
+
+def _openai_api_key():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        import warnings
+        warnings.warn(
+            "OPENAI_API_KEY not found in environment variables. "
+            "Please set it in your .env file or environment."
+        )
+    return api_key
+
+
+# Environment-backed settings: name -> function computing the value
+_ENV_SETTINGS = {
+    # ========================================================================
+    # OpenAI Configuration
+    # ========================================================================
+    "OPENAI_API_KEY": _openai_api_key,
+    "OPENAI_MODEL": lambda: os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+
+    # ========================================================================
+    # Directory Paths
+    # ========================================================================
+    # Base directories (relative to project root)
+    "ASSIGNMENTS_BASE_DIR": lambda: _project_path("ASSIGNMENTS_BASE_DIR", "assignments"),
+    "SUBMISSIONS_BASE_DIR": lambda: _project_path("SUBMISSIONS_BASE_DIR", "submissions"),
+    "OUTPUT_BASE_DIR": lambda: _project_path("OUTPUT_BASE_DIR", "output"),
+
+    # ========================================================================
+    # Logging Configuration
+    # ========================================================================
+    "LOG_LEVEL": lambda: os.getenv("LOG_LEVEL", "INFO"),
+
+    # ========================================================================
+    # LLM Parameters
+    # ========================================================================
+    # Temperature for LLM (lower = more consistent grading)
+    "LLM_TEMPERATURE": lambda: float(os.getenv("LLM_TEMPERATURE", "0.1")),
+
+    # Maximum retries for API calls
+    "MAX_API_RETRIES": lambda: int(os.getenv("MAX_API_RETRIES", "3")),
+
+    # Persistent LLM response cache (reruns skip prompts already answered)
+    "ENABLE_LLM_CACHE": lambda: _env_flag("ENABLE_LLM_CACHE"),
+    "LLM_CACHE_PATH": lambda: _project_path("LLM_CACHE_PATH", ".cache/llm_cache.sqlite"),
+
+    # Persistent cache of text extracted from PDF/DOCX files (answer keys, submissions)
+    "TEXT_CACHE_PATH": lambda: _project_path("TEXT_CACHE_PATH", ".cache/text_cache.sqlite"),
+
+    # Persistent cache of finished grades (unchanged submissions skip regrading)
+    "GRADE_CACHE_PATH": lambda: _project_path("GRADE_CACHE_PATH", ".cache/grade_cache.sqlite"),
+
+    # ========================================================================
+    # Output Configuration
+    # ========================================================================
+    # Include timestamp in output filenames
+    "INCLUDE_TIMESTAMP": lambda: _env_flag("INCLUDE_TIMESTAMP"),
+
+    # Save detailed JSON by default
+    "SAVE_DETAILED_JSON": lambda: _env_flag("SAVE_DETAILED_JSON"),
+
+    # Save CSV by default
+    "SAVE_CSV": lambda: _env_flag("SAVE_CSV"),
+
+    # Save summary JSON by default
+    "SAVE_SUMMARY_JSON": lambda: _env_flag("SAVE_SUMMARY_JSON"),
+
+    # ========================================================================
+    # File Processing Configuration
+    # ========================================================================
+    # Maximum file size in MB (for safety)
+    "MAX_FILE_SIZE_MB": lambda: int(os.getenv("MAX_FILE_SIZE_MB", "50")),
+}
+
+
+def __getattr__(name: str):
+    """Resolve an environment-backed setting on first access"""
+    if name not in _ENV_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    _ensure_loaded()
+    value = _ENV_SETTINGS[name]()
+    # Later lookups find the module global and skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ENV_SETTINGS))
+
 
 # ============================================================================
 # Grading Configuration
@@ -59,26 +144,8 @@ DEFAULT_GRADE_SCALE = {
     "F": 0.0,
 }
 
-# ============================================================================
-# Output Configuration
-# ============================================================================
-# Include timestamp in output filenames
-INCLUDE_TIMESTAMP = os.getenv("INCLUDE_TIMESTAMP", "true").lower() == "true"
-
-# Save detailed JSON by default
-SAVE_DETAILED_JSON = os.getenv("SAVE_DETAILED_JSON", "true").lower() == "true"
-
-# Save CSV by default
-SAVE_CSV = os.getenv("SAVE_CSV", "true").lower() == "true"
-
-# Save summary JSON by default
-SAVE_SUMMARY_JSON = os.getenv("SAVE_SUMMARY_JSON", "true").lower() == "true"
-
 # ============================================================================
 # File Processing Configuration
 # ============================================================================
 # Supported file extensions for submissions
-SUPPORTED_EXTENSIONS = [".pdf", ".docx", ".txt"]
-
-# Maximum file size in MB (for safety)
-MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+SUPPORTED_EXTENSIONS = frozenset({".pdf", ".docx", ".txt"})
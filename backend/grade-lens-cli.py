@@ -4,8 +4,8 @@ Grade Lens CLI wrapper - Forwards commands to backend/cli.py
 This allows you to run CLI commands from the project root.
 
 Usage:
-    python grade-lens-cli.py --list
-    python grade-lens-cli.py --assignment cs361_hw5
+    python backend/grade-lens-cli.py --list
+    python backend/grade-lens-cli.py --assignment cs361_hw5
     
 Or directly:
     python backend/cli.py --list
@@ -14,8 +14,12 @@ Or directly:
 import sys
 import os
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+# This file lives in backend/. Running it as a script already puts backend/
+# first on sys.path; only add it when missing, so imports do not probe an
+# extra (or nonexistent) directory first
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
 # Import and run the CLI
 from cli import main
@@ -3,28 +3,38 @@ FastAPI backend for Grade Lens web interface
 """
 
 import os
+import re
 import sys
-import json
+import asyncio
 import shutil
+import time
+import threading
 import logging
+import functools
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-# Add backend directory to path
-sys.path.insert(0, os.path.dirname(__file__))
+# Add backend directory to path (unless already there, e.g. run from backend/)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
-from config import OPENAI_API_KEY, OPENAI_MODEL, SUBMISSIONS_BASE_DIR, OUTPUT_BASE_DIR, ASSIGNMENTS_BASE_DIR
+from config import OPENAI_API_KEY, OPENAI_MODEL, SUBMISSIONS_BASE_DIR, OUTPUT_BASE_DIR, ASSIGNMENTS_BASE_DIR, SUPPORTED_EXTENSIONS
 from src.processors.document_processor import DocumentProcessor
 from src.processors.input_processor import InputProcessor
 from src.agents.qa_grading_agent import QAGradingAgent
 from src.agents.config_generator_agent import ConfigGeneratorAgent
-from src.utils.output_manager import OutputManager
+from src.utils import fast_json
+from src.utils.output_manager import OutputManager, PRECOMPRESSED_SUFFIX, STREAM_CSV_NAME, STREAM_JSONL_NAME
 from src.models.assignment_config import AssignmentConfig
 from cli import GradingWorkflow
 
@@ -51,10 +61,180 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (results JSON) only; level 1 keeps the CPU cost
+# low, and small responses such as health checks are left alone
+app.add_middleware(GZipMiddleware, minimum_size=4096, compresslevel=1)
+
 # Initialize processors
 doc_processor = DocumentProcessor()
 input_processor = InputProcessor(ASSIGNMENTS_BASE_DIR)
 
+# Grading runs get their own pool rather than sharing the request thread pool;
+# a run mostly waits on the LLM API, so threads are enough
+MAX_CONCURRENT_GRADING_RUNS = 4
+grading_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_GRADING_RUNS, thread_name_prefix="grading"
+)
+
+# job_id -> grading run, and assignment_id -> job_id of its latest run (only
+# the latest run of each assignment is kept)
+grading_jobs: Dict[str, Future] = {}
+assignment_jobs: Dict[str, str] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def get_config_generator() -> ConfigGeneratorAgent:
+    """Config generator shared by all requests (created on first use)"""
+    return ConfigGeneratorAgent(OPENAI_API_KEY, model=OPENAI_MODEL)
+
+
+# Read size when copying uploaded files to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Uploaded files one request writes at a time (each holds a worker thread
+# and an open file)
+UPLOAD_CONCURRENCY = 8
+
+
+# os.sendfile accepts a regular file as the destination only on Linux
+SENDFILE_TO_FILE = sys.platform.startswith("linux")
+
+
+def sendfile_copy(source_fd: int, destination_fd: int) -> None:
+    """Copy a whole file between descriptors inside the kernel"""
+    size = os.fstat(source_fd).st_size
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(destination_fd, source_fd, offset, size - offset)
+        if not sent:
+            break
+        offset += sent
+
+
+async def save_upload(upload: UploadFile, destination) -> None:
+    """
+    Copy an uploaded file to disk, off the event loop
+
+    Uploads larger than Starlette's spool size are already in a temporary
+    file; those are copied with sendfile. Smaller ones are still in memory
+    and are written out in chunks.
+    """
+
+    def copy():
+        source = upload.file
+        with open(destination, "wb") as out:
+            # fileno() on an in-memory spool would force it to disk first
+            if SENDFILE_TO_FILE and getattr(source, "_rolled", False):
+                source.flush()
+                sendfile_copy(source.fileno(), out.fileno())
+            else:
+                source.seek(0)
+                shutil.copyfileobj(source, out, UPLOAD_CHUNK_SIZE)
+
+    await asyncio.to_thread(copy)
+
+
+# Seconds between progress lines of a streamed config generation
+CONFIG_PROGRESS_INTERVAL = 2.0
+
+
+def generate_config_result(**kwargs) -> dict:
+    """Generate and validate a config (blocking; see generate_assignment_config)"""
+    generator = get_config_generator()
+    config = generator.generate_config(**kwargs)
+    is_valid, issues = generator.validate_config(config)
+    return {
+        "config": config,
+        "is_valid": is_valid,
+        "validation_issues": issues,
+    }
+
+
+async def stream_config_generation(generation) -> AsyncIterator[bytes]:
+    """NDJSON events for a config generation: progress, then the outcome"""
+    task = asyncio.ensure_future(generation)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    yield fast_json.dumps({"status": "started"}) + b"\n"
+    
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=CONFIG_PROGRESS_INTERVAL)
+        if done:
+            break
+        elapsed = round(loop.time() - started, 1)
+        yield fast_json.dumps({"status": "working", "elapsed": elapsed}) + b"\n"
+    
+    try:
+        event = {"status": "completed", **task.result()}
+    except Exception as e:
+        logger.error(f"Error generating config: {str(e)}")
+        event = {"status": "failed", "detail": str(e)}
+    yield fast_json.dumps(event) + b"\n"
+
+
+# Upload names are used as file names: no path separators or control
+# characters, and no leading dot (rules out "..", "." and hidden files)
+SAFE_FILENAME = re.compile(r"\A(?!\.)[^/\\\x00-\x1f\x7f]{1,255}\Z")
+
+
+def safe_filename(upload: UploadFile) -> str:
+    """The upload's file name, or a 400 if it could escape its directory"""
+    if not upload.filename or not SAFE_FILENAME.match(upload.filename):
+        raise HTTPException(status_code=400, detail=f"Invalid file name: {upload.filename!r}")
+    return upload.filename
+
+
+def remove_tree(path: str) -> None:
+    """Delete a directory tree if it exists"""
+    try:
+        shutil.rmtree(path)
+    except FileNotFoundError:
+        pass
+
+
+def results_dir(assignment_id: str, grading_mode: str = "full") -> str:
+    """Output directory of an assignment's results for a grading mode"""
+    if grading_mode != "full":
+        return os.path.join(OUTPUT_BASE_DIR, f"{assignment_id}_{grading_mode}")
+    return os.path.join(OUTPUT_BASE_DIR, assignment_id)
+
+
+def list_output_files(output_dir: str) -> Optional[List[str]]:
+    """
+    Names of the finished result files in an output directory
+
+    One os.scandir pass; the in-progress stream files are left out. Returns
+    None if the directory does not exist, so callers need no separate
+    os.path.exists check.
+    """
+    try:
+        with os.scandir(output_dir) as entries:
+            return [
+                entry.name
+                for entry in entries
+                if entry.name not in (STREAM_CSV_NAME, STREAM_JSONL_NAME)
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return None
+
+
+def results_etag(*paths: str) -> str:
+    """ETag for a response built from files: their mtimes and sizes"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    return '"' + "-".join(parts) + '"'
+
+
+def latest_output_file(file_names: List[str], prefix: str, suffix: str) -> Optional[str]:
+    """Newest file name with the given prefix and suffix (names carry the timestamp)"""
+    return max(
+        (name for name in file_names if name.startswith(prefix) and name.endswith(suffix)),
+        default=None,
+    )
+
 # ============================================================================
 # Models
 # ============================================================================
@@ -94,38 +274,99 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+# Per-assignment file caching the listing's directory scans
+ASSIGNMENT_STATS_NAME = ".stats.json"
+
+# Directories changed more recently than this may still change within the
+# same mtime tick, so stats for them are computed but not stored
+STATS_SETTLE_NS = 2_000_000_000
+
+
+def dir_mtime_ns(path: str) -> Optional[int]:
+    """A directory's mtime, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def assignment_stats(assignment_id: str) -> dict:
+    """
+    num_submissions and has_results for an assignment
+
+    Served from the assignment's .stats.json while the mtimes of the
+    submissions and results directories match the ones recorded there
+    (adding, removing or renaming a file changes its directory's mtime), so
+    unchanged assignments cost two stat calls instead of two scans. This
+    also catches changes made outside the API, e.g. CLI grading runs.
+    """
+    submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
+    output_dir = results_dir(assignment_id)
+    stats_path = os.path.join(ASSIGNMENTS_BASE_DIR, assignment_id, ASSIGNMENT_STATS_NAME)
+    
+    # Taken before scanning, so a change during the scan invalidates the result
+    mtimes = [dir_mtime_ns(submissions_dir), dir_mtime_ns(output_dir)]
+    
+    try:
+        with open(stats_path, "rb") as f:
+            stats = fast_json.loads(f.read())
+        if stats.get("mtimes") == mtimes:
+            return stats
+    except (OSError, ValueError):
+        pass
+    
+    stats = {
+        "num_submissions": doc_processor.count_submissions(submissions_dir),
+        "has_results": any(
+            f.endswith('.csv') for f in list_output_files(output_dir) or ()
+        ),
+        "mtimes": mtimes,
+    }
+    
+    if time.time_ns() - max(filter(None, mtimes), default=0) > STATS_SETTLE_NS:
+        # Write then rename, so concurrent listings never read a partial file
+        temp_path = f"{stats_path}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            fast_json.dump_to_file(stats, temp_path, indent=False)
+            os.replace(temp_path, stats_path)
+        except OSError as e:
+            logger.warning(f"Could not save stats for {assignment_id}: {str(e)}")
+    
+    return stats
+
+
+def describe_assignment(assignment_id: str) -> Optional[dict]:
+    """Listing entry for one assignment, or None if its config is unreadable"""
+    summary = input_processor.load_assignment_summary(assignment_id)
+    if not summary:
+        return None
+    
+    stats = assignment_stats(assignment_id)
+    
+    return {
+        "id": assignment_id,
+        "name": summary["assignment_name"],
+        "course_code": summary["course_code"],
+        "term": summary["term"],
+        "num_questions": summary["num_questions"],
+        "total_points": summary["total_points"],
+        "num_submissions": stats["num_submissions"],
+        "has_results": stats["has_results"],
+    }
+
 @app.get("/api/assignments")
 async def list_assignments():
     """List all available assignments"""
     try:
         assignments = input_processor.list_available_assignments()
         
-        assignments_data = []
-        for assignment_id in assignments:
-            config = input_processor.load_assignment(assignment_id)
-            if config:
-                # Check for results
-                output_dir = os.path.join(OUTPUT_BASE_DIR, assignment_id)
-                has_results = os.path.exists(output_dir) and any(
-                    f.endswith('.csv') for f in os.listdir(output_dir)
-                )
-                
-                # Count submissions
-                submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
-                num_submissions = 0
-                if os.path.exists(submissions_dir):
-                    num_submissions = len(doc_processor.get_all_submissions(submissions_dir))
-                
-                assignments_data.append({
-                    "id": assignment_id,
-                    "name": config.assignment_name,
-                    "course_code": config.course_code,
-                    "term": config.term,
-                    "num_questions": len(config.questions),
-                    "total_points": config.total_points,
-                    "num_submissions": num_submissions,
-                    "has_results": has_results,
-                })
+        # Each assignment's config read and directory scans run in a worker
+        # thread, all at once, instead of one after another on the event loop
+        descriptions = await asyncio.gather(*(
+            asyncio.to_thread(describe_assignment, assignment_id)
+            for assignment_id in assignments
+        ))
+        assignments_data = [d for d in descriptions if d is not None]
         
         return {"assignments": assignments_data}
     
@@ -184,18 +425,16 @@ async def upload_assignment_files(
         temp_dir.mkdir(exist_ok=True)
         
         # Save questions PDF
-        questions_path = temp_dir / questions_pdf.filename
-        with open(questions_path, "wb") as f:
-            content = await questions_pdf.read()
-            f.write(content)
+        questions_path = temp_dir / safe_filename(questions_pdf)
         
         # Save answer key PDF if provided
         answer_key_path = None
         if answer_key_pdf:
-            answer_key_path = temp_dir / answer_key_pdf.filename
-            with open(answer_key_path, "wb") as f:
-                content = await answer_key_pdf.read()
-                f.write(content)
+            answer_key_path = temp_dir / safe_filename(answer_key_pdf)
+        
+        await save_upload(questions_pdf, questions_path)
+        if answer_key_path:
+            await save_upload(answer_key_pdf, answer_key_path)
         
         return {
             "message": "Files uploaded successfully",
@@ -203,6 +442,8 @@ async def upload_assignment_files(
             "answer_key_pdf": str(answer_key_path) if answer_key_path else None,
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading files: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -215,8 +456,14 @@ async def generate_assignment_config(
     term: Optional[str] = Form(None),
     questions_pdf_path: str = Form(...),
     answer_key_pdf_path: Optional[str] = Form(None),
+    stream: bool = Form(False),
 ):
-    """Generate assignment configuration from uploaded PDFs"""
+    """
+    Generate assignment configuration from uploaded PDFs
+
+    With stream=true the response is newline-delimited JSON: progress lines
+    while the LLM works, then one line with the result (or the error).
+    """
     try:
         logger.info(f"Generating config for: {assignment_name}")
         
@@ -227,11 +474,9 @@ async def generate_assignment_config(
         if answer_key_pdf_path and not os.path.exists(answer_key_pdf_path):
             raise HTTPException(status_code=404, detail="Answer key PDF not found")
         
-        # Initialize config generator
-        generator = ConfigGeneratorAgent(OPENAI_API_KEY, model=OPENAI_MODEL)
-        
-        # Generate configuration
-        config = generator.generate_config(
+        # PDF parsing and the LLM call block, so they run in a worker thread
+        generation = asyncio.to_thread(
+            generate_config_result,
             assignment_id=assignment_id,
             assignment_name=assignment_name,
             questions_pdf_path=questions_pdf_path,
@@ -240,14 +485,13 @@ async def generate_assignment_config(
             term=term,
         )
         
-        # Validate configuration
-        is_valid, issues = generator.validate_config(config)
+        if stream:
+            return StreamingResponse(
+                stream_config_generation(generation),
+                media_type="application/x-ndjson",
+            )
         
-        return {
-            "config": config,
-            "is_valid": is_valid,
-            "validation_issues": issues,
-        }
+        return await generation
     
     except Exception as e:
         logger.error(f"Error generating config: {str(e)}")
@@ -267,18 +511,18 @@ async def save_assignment_config(assignment_id: str, request: UpdateConfigReques
         
         # Save configuration
         config_path = os.path.join(assignment_dir, "config.json")
-        with open(config_path, "w") as f:
-            json.dump(request.config, f, indent=2)
+        fast_json.dump_to_file(request.config, config_path, indent=True)
         
         # Create README
-        readme_path = os.path.join(assignment_dir, "README.md")
-        with open(readme_path, "w") as f:
-            f.write(f"# {request.config.get('assignment_name', 'Assignment')}\n\n")
-            f.write(f"**Course:** {request.config.get('course_code', 'N/A')}  \n")
-            f.write(f"**Term:** {request.config.get('term', 'N/A')}  \n")
-            f.write(f"**Total Points:** {request.config.get('total_points', 0)}  \n\n")
-            f.write(f"## Questions\n\n")
-            f.write(f"This assignment has {len(request.config.get('questions', []))} questions.\n")
+        readme = (
+            f"# {request.config.get('assignment_name', 'Assignment')}\n\n"
+            f"**Course:** {request.config.get('course_code', 'N/A')}  \n"
+            f"**Term:** {request.config.get('term', 'N/A')}  \n"
+            f"**Total Points:** {request.config.get('total_points', 0)}  \n\n"
+            f"## Questions\n\n"
+            f"This assignment has {len(request.config.get('questions', []))} questions.\n"
+        )
+        Path(assignment_dir, "README.md").write_text(readme, encoding="utf-8")
         
         return {
             "message": "Configuration saved successfully",
@@ -301,27 +545,33 @@ async def upload_submissions(
         submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
         os.makedirs(submissions_dir, exist_ok=True)
         
-        uploaded_files = []
+        # Check file names before writing anything, then extensions (a
+        # repeated name keeps the last upload, as writing them in turn would)
+        names = [safe_filename(file) for file in files]
+        accepted = {
+            name: file for name, file in zip(names, files)
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+        }
+        
+        # Save files concurrently, a bounded number at a time so a large
+        # batch does not take every worker thread from other requests
+        limit = asyncio.Semaphore(UPLOAD_CONCURRENCY)
         
-        for file in files:
-            # Check file extension
-            ext = os.path.splitext(file.filename)[1].lower()
-            if ext not in ['.pdf', '.docx', '.txt']:
-                continue
-            
-            # Save file
-            file_path = os.path.join(submissions_dir, file.filename)
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            uploaded_files.append(file.filename)
+        async def save(file: UploadFile, name: str):
+            async with limit:
+                await save_upload(file, os.path.join(submissions_dir, name))
+        
+        await asyncio.gather(*(save(file, name) for name, file in accepted.items()))
+        
+        uploaded_files = list(accepted)
         
         return {
             "message": f"Uploaded {len(uploaded_files)} submissions",
             "files": uploaded_files,
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading submissions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -335,11 +585,16 @@ async def list_submissions(assignment_id: str):
         if not os.path.exists(submissions_dir):
             return {"submissions": []}
         
-        submission_files = doc_processor.get_all_submissions(submissions_dir)
+        # One scandir pass; entries carry their own names
+        submission_files = sorted(
+            doc_processor.iter_submissions(submissions_dir),
+            key=lambda submission: submission.path,
+        )
         
         submissions = []
-        for file_path in submission_files:
-            filename = os.path.basename(file_path)
+        for submission in submission_files:
+            filename = submission.name
+            file_path = submission.path
             student_name = QAGradingAgent.extract_student_name(filename)
             student_id = QAGradingAgent.extract_student_id(filename)
             
@@ -359,11 +614,16 @@ async def list_submissions(assignment_id: str):
 @app.post("/api/assignments/{assignment_id}/grade")
 async def grade_assignment(
     assignment_id: str,
-    background_tasks: BackgroundTasks,
     grading_mode: str = "full",
 ):
     """Start grading an assignment"""
     try:
+        # One run per assignment at a time (runs share submissions and outputs)
+        previous_job_id = assignment_jobs.get(assignment_id)
+        job = grading_jobs.get(previous_job_id)
+        if job and not job.done():
+            raise HTTPException(status_code=409, detail="Grading already in progress")
+        
         # Check if assignment exists
         config = input_processor.load_assignment(assignment_id)
         if not config:
@@ -371,24 +631,27 @@ async def grade_assignment(
         
         # Check if submissions exist
         submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
-        if not os.path.exists(submissions_dir):
-            raise HTTPException(status_code=404, detail="No submissions found")
-        
-        submission_files = doc_processor.get_all_submissions(submissions_dir)
-        if not submission_files:
+        # count_submissions returns 0 for a missing directory too
+        num_submissions = doc_processor.count_submissions(submissions_dir)
+        if not num_submissions:
             raise HTTPException(status_code=404, detail="No submissions found")
         
-        # Start grading in background
-        background_tasks.add_task(
+        # Start grading in background; each run gets its own job id so a
+        # client polling an earlier run never sees a later run's status
+        job_id = uuid.uuid4().hex
+        grading_jobs[job_id] = grading_executor.submit(
             run_grading_workflow,
             assignment_id,
             grading_mode
         )
+        assignment_jobs[assignment_id] = job_id
+        grading_jobs.pop(previous_job_id, None)
         
         return {
             "message": "Grading started",
             "assignment_id": assignment_id,
-            "num_submissions": len(submission_files),
+            "job_id": job_id,
+            "num_submissions": num_submissions,
             "grading_mode": grading_mode,
         }
     
@@ -398,45 +661,76 @@ async def grade_assignment(
         logger.error(f"Error starting grading: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/jobs/{job_id}")
+async def get_grading_job(job_id: str):
+    """Get the status of a grading run (the latest one of its assignment)"""
+    job = grading_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No grading run found")
+    
+    if not job.done():
+        status = "running" if job.running() else "queued"
+    else:
+        status = "completed" if job.result() else "failed"
+    
+    return {"job_id": job_id, "status": status}
+
 @app.get("/api/assignments/{assignment_id}/results")
-async def get_results(assignment_id: str, grading_mode: str = "full"):
-    """Get grading results for an assignment"""
+async def get_results(
+    assignment_id: str,
+    request: Request,
+    grading_mode: str = "full",
+    include_summary: bool = True,
+):
+    """
+    Get grading results for an assignment
+
+    include_summary=false leaves out the summary (sent as null). Responses
+    carry an ETag, and a matching If-None-Match gets a 304 without the
+    files being read.
+    """
     try:
-        # Determine output directory based on grading mode
-        if grading_mode != "full":
-            output_dir = os.path.join(OUTPUT_BASE_DIR, f"{assignment_id}_{grading_mode}")
-        else:
-            output_dir = os.path.join(OUTPUT_BASE_DIR, assignment_id)
+        output_dir = results_dir(assignment_id, grading_mode)
+        output_files = list_output_files(output_dir)
         
-        if not os.path.exists(output_dir):
+        if output_files is None:
             raise HTTPException(status_code=404, detail="No results found")
         
         # Find latest detailed JSON
-        json_files = [f for f in os.listdir(output_dir) if f.startswith("grading_results_detailed_") and f.endswith(".json")]
+        latest_json = latest_output_file(output_files, "grading_results_detailed_", ".json")
         
-        if not json_files:
+        if not latest_json:
             raise HTTPException(status_code=404, detail="No detailed results found")
         
-        # Get the latest file
-        latest_json = sorted(json_files)[-1]
         json_path = os.path.join(output_dir, latest_json)
         
-        with open(json_path, "r") as f:
-            results = json.load(f)
-        
-        # Load summary if exists
-        summary_files = [f for f in os.listdir(output_dir) if f.startswith("grading_summary_") and f.endswith(".json")]
-        summary = None
-        if summary_files:
-            latest_summary = sorted(summary_files)[-1]
-            summary_path = os.path.join(output_dir, latest_summary)
-            with open(summary_path, "r") as f:
-                summary = json.load(f)
-        
-        return {
-            "results": results,
-            "summary": summary,
-        }
+        # Find summary if requested and exists
+        summary_path = None
+        if include_summary:
+            latest_summary = latest_output_file(output_files, "grading_summary_", ".json")
+            if latest_summary:
+                summary_path = os.path.join(output_dir, latest_summary)
+        
+        etag = results_etag(*filter(None, (json_path, summary_path)))
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        # The files are already JSON (written by OutputManager), so their
+        # bytes are spliced into the response instead of being parsed and
+        # re-encoded
+        with open(json_path, "rb") as f:
+            results = f.read()
+        
+        summary = b"null"
+        if summary_path:
+            with open(summary_path, "rb") as f:
+                summary = f.read()
+        
+        return Response(
+            content=b'{"results":' + results + b',"summary":' + summary + b"}",
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
     
     except HTTPException:
         raise
@@ -445,25 +739,26 @@ async def get_results(assignment_id: str, grading_mode: str = "full"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/assignments/{assignment_id}/results/download")
-async def download_results(assignment_id: str, format: str = "csv", grading_mode: str = "full"):
+async def download_results(
+    assignment_id: str,
+    request: Request,
+    format: str = "csv",
+    grading_mode: str = "full",
+):
     """Download results in CSV or JSON format"""
     try:
-        # Determine output directory
-        if grading_mode != "full":
-            output_dir = os.path.join(OUTPUT_BASE_DIR, f"{assignment_id}_{grading_mode}")
-        else:
-            output_dir = os.path.join(OUTPUT_BASE_DIR, assignment_id)
+        output_dir = results_dir(assignment_id, grading_mode)
+        output_files = list_output_files(output_dir)
         
-        if not os.path.exists(output_dir):
+        if output_files is None:
             raise HTTPException(status_code=404, detail="No results found")
         
         if format == "csv":
             # Find latest CSV
-            csv_files = [f for f in os.listdir(output_dir) if f.endswith(".csv")]
-            if not csv_files:
+            latest_csv = latest_output_file(output_files, "", ".csv")
+            if not latest_csv:
                 raise HTTPException(status_code=404, detail="No CSV results found")
             
-            latest_csv = sorted(csv_files)[-1]
             file_path = os.path.join(output_dir, latest_csv)
             
             return FileResponse(
@@ -474,13 +769,28 @@ async def download_results(assignment_id: str, format: str = "csv", grading_mode
         
         elif format == "json":
             # Find latest detailed JSON
-            json_files = [f for f in os.listdir(output_dir) if f.startswith("grading_results_detailed_") and f.endswith(".json")]
-            if not json_files:
+            latest_json = latest_output_file(
+                output_files, "grading_results_detailed_", ".json"
+            )
+            if not latest_json:
                 raise HTTPException(status_code=404, detail="No JSON results found")
             
-            latest_json = sorted(json_files)[-1]
             file_path = os.path.join(output_dir, latest_json)
             
+            # Serve the copy compressed at grading time when the client
+            # accepts gzip (GZipMiddleware skips already-encoded responses)
+            compressed_name = latest_json + PRECOMPRESSED_SUFFIX
+            if (
+                "gzip" in request.headers.get("accept-encoding", "")
+                and compressed_name in output_files
+            ):
+                return FileResponse(
+                    file_path + PRECOMPRESSED_SUFFIX,
+                    media_type="application/json",
+                    filename=latest_json,
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+                )
+            
             return FileResponse(
                 file_path,
                 media_type="application/json",
@@ -500,20 +810,12 @@ async def download_results(assignment_id: str, format: str = "csv", grading_mode
 async def delete_assignment(assignment_id: str):
     """Delete an assignment and all associated data"""
     try:
-        # Delete assignment directory
-        assignment_dir = os.path.join(ASSIGNMENTS_BASE_DIR, assignment_id)
-        if os.path.exists(assignment_dir):
-            shutil.rmtree(assignment_dir)
-        
-        # Delete submissions directory
-        submissions_dir = os.path.join(SUBMISSIONS_BASE_DIR, assignment_id)
-        if os.path.exists(submissions_dir):
-            shutil.rmtree(submissions_dir)
-        
-        # Delete output directory
-        output_dir = os.path.join(OUTPUT_BASE_DIR, assignment_id)
-        if os.path.exists(output_dir):
-            shutil.rmtree(output_dir)
+        # Delete the assignment, submissions and output directories together,
+        # off the event loop
+        await asyncio.gather(*(
+            asyncio.to_thread(remove_tree, os.path.join(base_dir, assignment_id))
+            for base_dir in (ASSIGNMENTS_BASE_DIR, SUBMISSIONS_BASE_DIR, OUTPUT_BASE_DIR)
+        ))
         
         return {"message": "Assignment deleted successfully"}
     
@@ -525,8 +827,8 @@ async def delete_assignment(assignment_id: str):
 # Helper Functions
 # ============================================================================
 
-def run_grading_workflow(assignment_id: str, grading_mode: str = "full"):
-    """Run grading workflow in background"""
+def run_grading_workflow(assignment_id: str, grading_mode: str = "full") -> bool:
+    """Run grading workflow in background; returns whether it succeeded"""
     try:
         logger.info(f"Starting grading workflow for: {assignment_id}")
         
@@ -541,9 +843,11 @@ def run_grading_workflow(assignment_id: str, grading_mode: str = "full"):
             logger.info(f"Grading completed successfully for: {assignment_id}")
         else:
             logger.error(f"Grading failed for: {assignment_id}")
+        return success
     
     except Exception as e:
         logger.error(f"Error in grading workflow: {str(e)}", exc_info=True)
+        return False
 
 # ============================================================================
 # Main
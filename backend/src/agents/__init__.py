@@ -3,6 +3,7 @@
 from .qa_grading_agent import QAGradingAgent
 from .config_generator_agent import ConfigGeneratorAgent
 from .answer_extraction_agent import AnswerExtractionAgent
+from .batch_answer_extractor import BatchAnswerExtractor
 from .report_generator import ReportGenerator
 from .code_extraction_agent import CodeExtractionAgent
 from .code_evaluation_agent import CodeEvaluationAgent
@@ -11,6 +12,7 @@ __all__ = [
     "QAGradingAgent",
     "ConfigGeneratorAgent",
     "AnswerExtractionAgent",
+    "BatchAnswerExtractor",
     "ReportGenerator",
     "CodeExtractionAgent",
     "CodeEvaluationAgent",
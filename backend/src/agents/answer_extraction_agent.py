@@ -5,22 +5,158 @@ Answer Extraction Agent - Extracts student answers from text and images in PDFs
 import os
 import io
 import base64
+import asyncio
+import codecs
+import functools
+import json
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any, Union
 from pathlib import Path
 
 import fitz  # PyMuPDF
 from PIL import Image
-from pdf2image import convert_from_path
 
+import httpx
+import tiktoken
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..models.assignment_config import AssignmentConfig, QuestionConfig
-from ..processors.document_processor import DocumentProcessor
+from ..processors.document_processor import PYMUPDF_LOCK, DocumentProcessor
+from ..utils import fast_json
+from ..utils.http import get_http_client
+from ..utils.hashing import file_digest
+from ..utils.llm_cache import forget_llm_reply
+from ..utils.text_cache import get_text_cache
 
 logger = logging.getLogger(__name__)
 
+# Largest image side sent to the vision API (bigger images are downscaled).
+# High-detail images are scaled to fit 2048x768 and tiled at 512px, so larger
+# sides only add upload bytes.
+MAX_VISION_IMAGE_SIZE = 1536
+
+# Quality of images re-encoded as JPEG for the vision API
+VISION_JPEG_QUALITY = 85
+
+# Embedded image formats the vision API accepts as they are, by PyMuPDF
+# extension, with their MIME subtype
+PASSTHROUGH_IMAGE_FORMATS = {"png": "png", "jpeg": "jpeg", "jpg": "jpeg"}
+
+
+class EmbeddedImage(NamedTuple):
+    """An image embedded in a PDF, still in its original encoding"""
+
+    data: bytes
+    ext: str
+    width: int
+    height: int
+    colorspace: int
+
+    def to_pil(self) -> Image.Image:
+        """Decode the image"""
+        return Image.open(io.BytesIO(self.data))
+
+
+# Submission images: embedded images or rendered pages
+SubmissionImage = Union[EmbeddedImage, Image.Image]
+
+# Bump when image reading (selection, encoding, vision prompt) changes so
+# text read from images by earlier versions is not reused
+IMAGE_TEXT_VERSION = 2
+
+# Decodes the first JSON object of a reply that has text around it
+_JSON_DECODER = json.JSONDecoder()
+
+# Token budget for the submission content in the question-mapping prompt
+MAPPING_CONTENT_MAX_TOKENS = 3000
+
+# Pages with fewer characters of text than this are treated as scanned and
+# rendered for the vision API when a PDF has no embedded images
+SCANNED_PAGE_MAX_CHARS = 50
+
+# System prompts are static so every request starts with the same bytes
+# (OpenAI prompt caching reuses identical prefixes)
+VISION_SYSTEM_PROMPT = """You are an expert at extracting text from images of student homework submissions.
+Extract ALL visible text, including handwritten answers, diagrams with labels, and any annotations.
+Preserve the structure and organization of the content.
+If you see question numbers or labels, include them.
+Output the extracted text clearly and completely."""
+
+MAPPING_SYSTEM_PROMPT = """You are an expert at analyzing student submissions and mapping answers to questions.
+Given a submission's content and a list of questions, identify which parts of the content answer which questions.
+
+Return a JSON object mapping question IDs to their answers in this format:
+{
+  "question_1": {
+    "text": "The student's answer for question 1...",
+    "confidence": "high/medium/low"
+  },
+  "question_2": {
+    "text": "The student's answer for question 2...",
+    "confidence": "high/medium/low"
+  }
+}
+
+If you cannot find an answer for a question, include an empty text field with low confidence.
+Extract the complete answer including all reasoning, calculations, and explanations."""
+
+
+@functools.lru_cache(maxsize=8)
+def _token_encoding(model_name: str) -> Optional[tiktoken.Encoding]:
+    """Tokenizer for a model, or None when its BPE file cannot be loaded"""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            # Model unknown to this tiktoken version
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads BPE files on first use, which fails offline
+        logger.warning(
+            f"Tokenizer unavailable, truncating prompts by characters: {str(e)}"
+        )
+        return None
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str) -> str:
+    """
+    Cut text to at most max_tokens tokens of the model's tokenizer
+
+    The cut never splits a character: a multi-byte character whose tokens
+    do not all fit is dropped rather than decoded to U+FFFD. Falls back to
+    max_tokens * 4 characters (about the same length for English text) when
+    no tokenizer is available.
+    """
+    # A character is at most 4 UTF-8 bytes and every token covers at least
+    # one byte, so text this short fits as is
+    if len(text) <= max_tokens // 4:
+        return text
+    encoding = _token_encoding(model_name)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    data = b"".join(encoding.decode_tokens_bytes(tokens[:max_tokens]))
+    # A non-final decode holds back an incomplete trailing character
+    return codecs.getincrementaldecoder("utf-8")(errors="replace").decode(data)
+
+
+class SubmissionContent(NamedTuple):
+    """Text and images read from a submission file"""
+
+    text: str
+    images: List[SubmissionImage]
+    image_count: int
+    # Text the vision API read from the images, when the text cache had it
+    # (the images themselves are then not loaded)
+    image_text: Optional[str]
+    # Text cache key for the image text (None when not cached)
+    image_cache_key: Optional[str]
+    # Whether reading the images failed (the text alone is then used)
+    images_failed: bool = False
+
 
 class AnswerExtractionAgent:
     """Agent that extracts student answers from PDFs with text and image support"""
@@ -31,6 +167,8 @@ class AnswerExtractionAgent:
         model: str = "gpt-4o-mini",
         temperature: float = 0.1,
         enable_image_processing: bool = True,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize the answer extraction agent
@@ -40,16 +178,25 @@ class AnswerExtractionAgent:
             model: Model name (must support vision for image processing)
             temperature: Temperature for generation
             enable_image_processing: Whether to enable image processing
+            http_client: Shared HTTP client for sync calls (default: process-wide pool)
+            http_async_client: Shared HTTP client for async calls
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=temperature,
+            http_client=http_client or get_http_client(),
+            http_async_client=http_async_client,
         )
         self.doc_processor = DocumentProcessor()
         self.enable_image_processing = enable_image_processing
         self.model_name = model
 
+    @property
+    def json_llm(self):
+        """LLM bound to JSON mode, for the question mapping reply"""
+        return self.llm.bind(response_format={"type": "json_object"})
+
     def extract_answers(
         self,
         submission_path: str,
@@ -76,26 +223,11 @@ class AnswerExtractionAgent:
         logger.info(f"Extracting answers from: {os.path.basename(submission_path)}")
 
         try:
-            # Extract text content using existing processor
-            text_content = self.doc_processor.extract_text_from_file(submission_path)
-            logger.info(f"Extracted {len(text_content)} characters of text")
-
-            # Extract images if enabled and file is PDF
-            images = []
-            has_images = False
-
-            if self.enable_image_processing and submission_path.lower().endswith(
-                ".pdf"
-            ):
-                images, has_images = self._extract_images_hybrid(submission_path)
-                if has_images:
-                    logger.info(f"Extracted {len(images)} images from PDF")
+            content = self._load_submission_content(submission_path)
 
             # Map content to questions
             extracted_answers = self._map_content_to_questions(
-                text_content=text_content,
-                images=images,
-                questions=assignment_config.questions,
+                content, assignment_config.questions
             )
 
             logger.info(
@@ -106,231 +238,535 @@ class AnswerExtractionAgent:
         except Exception as e:
             logger.error(f"Error extracting answers: {str(e)}", exc_info=True)
             # Return empty answers for all questions
-            return {
-                q.id: {
-                    "text": "",
-                    "images": [],
-                    "extracted_from_image": False,
-                    "extraction_notes": f"Error during extraction: {str(e)}",
-                }
-                for q in assignment_config.questions
-            }
+            return self._empty_answers(
+                assignment_config.questions, f"Error during extraction: {str(e)}"
+            )
 
-    def _extract_images_hybrid(self, pdf_path: str) -> Tuple[List[Image.Image], bool]:
+    async def aextract_answers(
+        self,
+        submission_path: str,
+        assignment_config: AssignmentConfig,
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Hybrid image extraction: try PyMuPDF first, fallback to pdf2image
+        Async version of extract_answers
+
+        File parsing runs in a worker thread and the LLM calls are awaited,
+        so extraction for many submissions can overlap on one event loop.
 
         Args:
-            pdf_path: Path to PDF file
+            submission_path: Path to submission PDF
+            assignment_config: Assignment configuration
 
         Returns:
-            Tuple of (list of PIL Images, has_images flag)
+            Dictionary mapping question_id to answer data
         """
+        logger.info(f"Extracting answers from: {os.path.basename(submission_path)}")
+
         try:
-            # First, try to extract embedded images using PyMuPDF
-            images = self._extract_images_pymupdf(pdf_path)
+            content = await asyncio.to_thread(
+                self._load_submission_content, submission_path
+            )
 
-            if images:
-                logger.info(f"Extracted {len(images)} embedded images using PyMuPDF")
-                return images, True
+            extracted_answers = await self._amap_content_to_questions(
+                content, assignment_config.questions
+            )
 
-            # If no embedded images, check if PDF pages might be scanned/image-based
-            # Convert pages to images as fallback
-            logger.info("No embedded images found, checking if pages are image-based")
-            images = self._convert_pages_to_images(pdf_path, max_pages=10)
+            logger.info(
+                f"Successfully extracted answers for {len(extracted_answers)} questions"
+            )
+            return extracted_answers
 
-            if images:
-                logger.info(f"Converted {len(images)} PDF pages to images")
-                return images, True
+        except Exception as e:
+            logger.error(f"Error extracting answers: {str(e)}", exc_info=True)
+            return self._empty_answers(
+                assignment_config.questions, f"Error during extraction: {str(e)}"
+            )
 
-            return [], False
+    def _load_submission_content(self, submission_path: str) -> SubmissionContent:
+        """
+        Read text and (optionally) images from a submission file
 
-        except Exception as e:
-            logger.error(f"Error in hybrid image extraction: {str(e)}")
-            return [], False
+        When the text cache already holds the text read from this file's
+        images, the images are not extracted or rendered at all; otherwise
+        a PDF is opened once for both its text and its images.
 
-    def _extract_images_pymupdf(self, pdf_path: str) -> List[Image.Image]:
+        Args:
+            submission_path: Path to submission file
+
+        Returns:
+            SubmissionContent for the file
         """
-        Extract embedded images from PDF using PyMuPDF
+        # Extract images if enabled and file is PDF
+        text_content = None
+        images = []
+        image_count = 0
+        image_text = None
+        cache_key = None
+        images_failed = False
+        if self.enable_image_processing and submission_path.lower().endswith(".pdf"):
+            cache_key = self._image_text_key(submission_path)
+            cached = self._cached_image_text(cache_key)
+            if cached:
+                image_count, image_text = cached
+                logger.info(f"Reusing text read from {image_count} images")
+            else:
+                text_content, images = self._read_pdf(submission_path)
+                if images is None:
+                    # Extraction failed; leave the cache alone so the next
+                    # run tries again
+                    images = []
+                    images_failed = True
+                elif images:
+                    logger.info(f"Extracted {len(images)} images from PDF")
+                else:
+                    # A clean scan found nothing for the vision API; remember that too
+                    self._store_image_text(cache_key, 0, "")
+                    image_text = ""
+                image_count = len(images)
+
+        if text_content is None:
+            # Extract text content using existing processor (also the
+            # fallback when PyMuPDF could not open the PDF)
+            text_content = self.doc_processor.extract_text_from_file(submission_path)
+        logger.info(f"Extracted {len(text_content)} characters of text")
+
+        return SubmissionContent(
+            text_content, images, image_count, image_text, cache_key, images_failed
+        )
+
+    def _read_pdf(
+        self, pdf_path: str
+    ) -> Tuple[Optional[str], Optional[List[SubmissionImage]]]:
+        """
+        Read the text and images of a PDF, opening it only once
 
         Args:
             pdf_path: Path to PDF file
 
         Returns:
-            List of PIL Image objects
+            Tuple of (text, list of images); the text is None if the PDF
+            could not be opened, the images None if their extraction failed
         """
-        images = []
+        with PYMUPDF_LOCK:
+            try:
+                doc = fitz.open(pdf_path)
+            except Exception as e:
+                logger.error(f"Error reading PDF {pdf_path}: {str(e)}")
+                return None, None
 
+            with doc:
+                text_content = self.doc_processor.extract_text_from_file(
+                    pdf_path, pdf_document=doc
+                )
+                images = self._extract_images_hybrid(doc)
+        return text_content, images
+
+    def _image_text_key(self, pdf_path: str) -> Optional[str]:
+        """Text cache key for the text read from a PDF's images"""
+        if get_text_cache() is None:
+            return None
+        return f"images:v{IMAGE_TEXT_VERSION}:{file_digest(pdf_path)}:{self.model_name}"
+
+    @staticmethod
+    def _cached_image_text(cache_key: Optional[str]) -> Optional[Tuple[int, str]]:
+        """(image count, image text) from the text cache, or None on a miss"""
+        text_cache = get_text_cache()
+        if cache_key is None or text_cache is None:
+            return None
+        value = text_cache.get(cache_key)
+        if value is None:
+            return None
         try:
-            doc = fitz.open(pdf_path)
+            entry = json.loads(value)
+            return entry["images"], entry["text"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable image text cache entry: {str(e)}")
+            return None
+
+    @staticmethod
+    def _store_image_text(
+        cache_key: Optional[str], image_count: int, image_text: str
+    ) -> None:
+        """Persist the text read from a PDF's images"""
+        text_cache = get_text_cache()
+        if cache_key is None or text_cache is None:
+            return
+        text_cache.set(
+            cache_key, json.dumps({"images": image_count, "text": image_text})
+        )
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)
+    @staticmethod
+    def _empty_answers(
+        questions: List[QuestionConfig], notes: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Build an empty answer entry for every question (extraction failed)"""
+        return {
+            q.id: {
+                "text": "",
+                "images": [],
+                "extracted_from_image": False,
+                "extraction_notes": notes,
+                "extraction_failed": True,
+            }
+            for q in questions
+        }
+
+    def _extract_images_hybrid(
+        self, doc: fitz.Document
+    ) -> Optional[List[SubmissionImage]]:
+        """
+        Hybrid image extraction: embedded images first, else rendered pages
 
-                for img_index, img_info in enumerate(image_list):
-                    xref = img_info[0]
+        Only pages with (almost) no text layer are rendered, so text-based
+        PDFs are never rasterized.
 
-                    try:
-                        # Extract image
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
+        Args:
+            doc: Open PyMuPDF document
+
+        Returns:
+            List of images (empty when the PDF has none), or None if
+            extraction failed
+        """
+        try:
+            # First, try to extract embedded images using PyMuPDF
+            images = self._extract_images_pymupdf(doc)
 
-                        # Convert to PIL Image
-                        image = Image.open(io.BytesIO(image_bytes))
+            if images:
+                logger.info(f"Extracted {len(images)} embedded images using PyMuPDF")
+                return images
 
-                        # Only keep images that are reasonably large (likely content, not icons)
-                        if image.width > 100 and image.height > 100:
-                            images.append(image)
-                            logger.debug(
-                                f"Extracted image {img_index} from page {page_num + 1}: {image.size}"
-                            )
+            # If no embedded images, render the pages that look scanned
+            page_indices = [
+                page_num
+                for page_num, page in enumerate(doc)
+                if len(page.get_text("text").strip()) < SCANNED_PAGE_MAX_CHARS
+            ]
+            if not page_indices:
+                logger.info("No embedded images and every page has text")
+                return []
 
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not extract image {img_index} from page {page_num + 1}: {str(e)}"
-                        )
-                        continue
+            logger.info(
+                f"No embedded images found, {len(page_indices)} page(s) have no text layer"
+            )
+            images = self._convert_pages_to_images(doc, page_indices[:10])
 
-            doc.close()
+            if images:
+                logger.info(f"Converted {len(images)} PDF pages to images")
+            return images
 
         except Exception as e:
-            logger.error(f"Error extracting images with PyMuPDF: {str(e)}")
+            logger.error(f"Error in hybrid image extraction: {str(e)}")
+            return None
+
+    def _extract_images_pymupdf(self, doc: fitz.Document) -> List[EmbeddedImage]:
+        """
+        Extract embedded images from an open PyMuPDF document
+
+        Args:
+            doc: Open PyMuPDF document
+
+        Images keep their original encoding; the size filter uses the
+        dimensions PyMuPDF reports, so nothing is decoded here. An image
+        used on several pages (logos, headers) is extracted only once.
+        Images that cannot be extracted are skipped; other errors propagate.
+
+        Returns:
+            List of EmbeddedImage objects
+        """
+        images = []
+        seen_xrefs = set()
+
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            image_list = page.get_images(full=True)
+
+            for img_index, img_info in enumerate(image_list):
+                xref = img_info[0]
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
+
+                try:
+                    # Extract image
+                    base_image = doc.extract_image(xref)
+                    image = EmbeddedImage(
+                        base_image["image"],
+                        base_image["ext"],
+                        base_image["width"],
+                        base_image["height"],
+                        base_image.get("colorspace", 0),
+                    )
+
+                    # Only keep images that are reasonably large (likely content, not icons)
+                    if image.width > 100 and image.height > 100:
+                        images.append(image)
+                        logger.debug(
+                            f"Extracted image {img_index} from page {page_num + 1}: "
+                            f"{(image.width, image.height)}"
+                        )
+
+                except Exception as e:
+                    logger.warning(
+                        f"Could not extract image {img_index} from page {page_num + 1}: {str(e)}"
+                    )
+                    continue
 
         return images
 
     def _convert_pages_to_images(
-        self, pdf_path: str, max_pages: Optional[int] = None, dpi: int = 150
+        self, doc: fitz.Document, page_indices: List[int], dpi: int = 150
     ) -> List[Image.Image]:
         """
-        Convert PDF pages to images using pdf2image
+        Render pages of an open PyMuPDF document to images
 
         Args:
-            pdf_path: Path to PDF file
-            max_pages: Maximum number of pages to convert (None = all)
+            doc: Open PyMuPDF document
+            page_indices: Zero-based numbers of the pages to render
             dpi: DPI for image conversion (higher = better quality but larger)
 
         Returns:
-            List of PIL Image objects
+            List of PIL Image objects (rendering errors propagate)
         """
-        images = []
-
-        try:
-            # Get page count first
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
-
-            # Limit pages if specified
-            last_page = min(page_count, max_pages) if max_pages else page_count
-
-            # Only convert if there are few pages (to avoid excessive API costs)
-            if page_count > 20:
-                logger.warning(
-                    f"PDF has {page_count} pages, skipping page-to-image conversion"
-                )
-                return []
-
-            logger.info(f"Converting {last_page} pages to images at {dpi} DPI")
-
-            # Convert pages to images
-            images = convert_from_path(
-                pdf_path,
-                dpi=dpi,
-                first_page=1,
-                last_page=last_page,
+        # Only convert if there are few pages (to avoid excessive API costs)
+        if len(doc) > 20:
+            logger.warning(
+                f"PDF has {len(doc)} pages, skipping page-to-image conversion"
             )
+            return []
 
-        except Exception as e:
-            logger.error(f"Error converting PDF pages to images: {str(e)}")
+        logger.info(f"Converting {len(page_indices)} pages to images at {dpi} DPI")
 
-        return images
+        return [
+            DocumentProcessor.render_pdf_page(doc[page_num], dpi)
+            for page_num in page_indices
+        ]
 
     def _map_content_to_questions(
         self,
-        text_content: str,
-        images: List[Image.Image],
+        content: SubmissionContent,
         questions: List[QuestionConfig],
     ) -> Dict[str, Dict[str, Any]]:
         """
         Map extracted content (text and images) to questions
 
         Args:
-            text_content: Extracted text from PDF
-            images: List of extracted images
+            content: Text and images read from the submission
             questions: List of question configurations
 
         Returns:
             Dictionary mapping question_id to answer data
         """
-        extracted_answers = {}
-
         # If we have images, use vision API to extract text from them
-        image_text = ""
+        image_text = content.image_text or ""
         image_data = []
+        images_failed = content.images_failed
 
-        if images:
+        if content.images:
             try:
-                image_text, image_data = self._extract_text_from_images(images)
-                logger.info(
-                    f"Extracted {len(image_text)} characters from {len(images)} images"
-                )
+                text, image_data = self._extract_text_from_images(content.images)
+                image_text = self._record_image_text(content, text)
+                images_failed = text is None
             except Exception as e:
                 logger.error(f"Error extracting text from images: {str(e)}")
-
-        # Combine text and image content
-        combined_content = text_content
-        if image_text:
-            combined_content += f"\n\n--- Content from Images ---\n{image_text}"
+                images_failed = True
 
         # Use LLM to map content to questions
         try:
-            mapping = self._llm_map_to_questions(combined_content, questions)
+            mapping = self._llm_map_to_questions(
+                self._combine_content(content.text, image_text), questions
+            )
+            return self._annotate_mapping(
+                mapping, content.image_count, image_data, images_failed
+            )
 
-            # Add image metadata
-            for question_id, answer_data in mapping.items():
-                answer_data["images"] = image_data if images else []
-                answer_data["extracted_from_image"] = bool(images)
+        except Exception as e:
+            logger.error(f"Error mapping content to questions: {str(e)}")
+            return self._empty_answers(questions, f"Mapping error: {str(e)}")
 
-                # Add extraction notes
-                notes = []
-                if images:
-                    notes.append(f"Processed {len(images)} images")
-                if not answer_data.get("text", "").strip():
-                    notes.append("No text answer found")
-                answer_data["extraction_notes"] = "; ".join(notes) if notes else None
+    async def _amap_content_to_questions(
+        self,
+        content: SubmissionContent,
+        questions: List[QuestionConfig],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Async version of _map_content_to_questions"""
+        image_text = content.image_text or ""
+        image_data = []
+        images_failed = content.images_failed
 
-            extracted_answers = mapping
+        if content.images:
+            try:
+                text, image_data = await self._aextract_text_from_images(content.images)
+                image_text = await asyncio.to_thread(
+                    self._record_image_text, content, text
+                )
+                images_failed = text is None
+            except Exception as e:
+                logger.error(f"Error extracting text from images: {str(e)}")
+                images_failed = True
+
+        try:
+            mapping = await self._allm_map_to_questions(
+                self._combine_content(content.text, image_text), questions
+            )
+            return self._annotate_mapping(
+                mapping, content.image_count, image_data, images_failed
+            )
 
         except Exception as e:
             logger.error(f"Error mapping content to questions: {str(e)}")
-            # Return empty answers
-            extracted_answers = {
-                q.id: {
-                    "text": "",
-                    "images": [],
-                    "extracted_from_image": False,
-                    "extraction_notes": f"Mapping error: {str(e)}",
-                }
-                for q in questions
-            }
+            return self._empty_answers(questions, f"Mapping error: {str(e)}")
+
+    @staticmethod
+    def _combine_content(text_content: str, image_text: str) -> str:
+        """Combine document text with text read from images"""
+        if image_text:
+            return f"{text_content}\n\n--- Content from Images ---\n{image_text}"
+        return text_content
+
+    def _record_image_text(
+        self, content: SubmissionContent, image_text: Optional[str]
+    ) -> str:
+        """Log and cache the vision API's reading of a submission's images"""
+        if image_text is None:
+            # The call failed; nothing is cached, so the next run retries
+            return ""
+        logger.info(
+            f"Extracted {len(image_text)} characters from {content.image_count} images"
+        )
+        self._store_image_text(content.image_cache_key, content.image_count, image_text)
+        return image_text
+
+    @staticmethod
+    def _annotate_mapping(
+        mapping: Dict[str, Dict[str, Any]],
+        image_count: int,
+        image_data: List[str],
+        images_failed: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Add image metadata and extraction notes to mapped answers
+
+        image_data (the base64 images) is empty when the text read from the
+        images came from the text cache. Answers are marked
+        extraction_failed when the images could not be read or the mapping
+        fell back to the default.
+        """
+        for question_id, answer_data in mapping.items():
+            answer_data["images"] = image_data
+            answer_data["extracted_from_image"] = bool(image_count)
+            answer_data["extraction_failed"] = images_failed or bool(
+                answer_data.get("extraction_failed")
+            )
 
-        return extracted_answers
+            # Add extraction notes
+            notes = []
+            if image_count:
+                notes.append(f"Processed {image_count} images")
+            if images_failed:
+                notes.append("Image text extraction failed")
+            if not answer_data.get("text", "").strip():
+                notes.append("No text answer found")
+            answer_data["extraction_notes"] = "; ".join(notes) if notes else None
+
+        return mapping
 
     def _extract_text_from_images(
-        self, images: List[Image.Image]
-    ) -> Tuple[str, List[str]]:
+        self, images: List[SubmissionImage]
+    ) -> Tuple[Optional[str], List[str]]:
         """
         Extract text from images using OpenAI Vision API
 
         Args:
-            images: List of PIL Image objects
+            images: List of embedded images or PIL Images
+
+        Returns:
+            Tuple of (extracted text or None if the API call failed, list of
+            base64 encoded images)
+        """
+        messages, image_data = self._build_vision_messages(images)
+        if not messages:
+            return "", image_data
+
+        try:
+            # Call vision API
+            response = self.llm.invoke(messages)
+            return response.content, image_data
+
+        except Exception as e:
+            logger.error(f"Error calling vision API: {str(e)}")
+            return None, image_data
+
+    async def _aextract_text_from_images(
+        self, images: List[SubmissionImage]
+    ) -> Tuple[Optional[str], List[str]]:
+        """Async version of _extract_text_from_images"""
+        messages, image_data = await asyncio.to_thread(
+            self._build_vision_messages, images
+        )
+        if not messages:
+            return "", image_data
+
+        try:
+            response = await self.llm.ainvoke(messages)
+            return response.content, image_data
+
+        except Exception as e:
+            logger.error(f"Error calling vision API: {str(e)}")
+            return None, image_data
+
+    @staticmethod
+    def _encode_image(image: SubmissionImage) -> Tuple[bytes, str]:
+        """
+        Encode an image for the vision API
+
+        Args:
+            image: Embedded image or PIL Image
+
+        Returns:
+            Tuple of (encoded bytes, MIME subtype)
+        """
+        small_enough = (
+            image.width <= MAX_VISION_IMAGE_SIZE
+            and image.height <= MAX_VISION_IMAGE_SIZE
+        )
+
+        if isinstance(image, EmbeddedImage):
+            image_type = PASSTHROUGH_IMAGE_FORMATS.get(image.ext)
+            # CMYK JPEGs are not accepted, so only gray and RGB pass through
+            if small_enough and image_type and image.colorspace in (1, 3):
+                return image.data, image_type
+            image = image.to_pil()
+
+        # Resize large images to reduce API costs
+        if not small_enough:
+            image.thumbnail(
+                (MAX_VISION_IMAGE_SIZE, MAX_VISION_IMAGE_SIZE), Image.Resampling.LANCZOS
+            )
+
+        # JPEG is several times smaller than PNG for page scans and photos
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        return buffered.getvalue(), "jpeg"
+
+    def _build_vision_messages(
+        self, images: List[SubmissionImage]
+    ) -> Tuple[Optional[list], List[str]]:
+        """
+        Encode images and build the vision API messages
+
+        Embedded PNG and JPEG images that need no downscaling are sent in
+        their original encoding; everything else is re-encoded as JPEG.
+
+        Args:
+            images: List of embedded images or PIL Images
 
         Returns:
-            Tuple of (extracted text, list of base64 encoded images)
+            Tuple of (messages or None if nothing to send, base64 encoded images)
         """
         if not images:
-            return "", []
+            return None, []
 
         # Limit number of images to process (cost consideration)
         max_images = min(len(images), 10)
@@ -338,30 +774,18 @@ class AnswerExtractionAgent:
 
         # Convert images to base64
         image_data = []
+        image_types = []
         for img in images_to_process:
             try:
-                # Resize large images to reduce API costs
-                if img.width > 2000 or img.height > 2000:
-                    img.thumbnail((2000, 2000), Image.Resampling.LANCZOS)
-
-                # Convert to base64
-                buffered = io.BytesIO()
-                img.save(buffered, format="PNG")
-                img_str = base64.b64encode(buffered.getvalue()).decode()
-                image_data.append(img_str)
+                image_bytes, image_type = self._encode_image(img)
+                image_data.append(base64.b64encode(image_bytes).decode())
+                image_types.append(image_type)
             except Exception as e:
                 logger.warning(f"Could not process image: {str(e)}")
                 continue
 
         if not image_data:
-            return "", []
-
-        # Create prompt for vision API
-        system_prompt = """You are an expert at extracting text from images of student homework submissions.
-Extract ALL visible text, including handwritten answers, diagrams with labels, and any annotations.
-Preserve the structure and organization of the content.
-If you see question numbers or labels, include them.
-Output the extracted text clearly and completely."""
+            return None, []
 
         # Build message with images
         content = [
@@ -372,32 +796,22 @@ Output the extracted text clearly and completely."""
         ]
 
         # Add images to content
-        for img_b64 in image_data:
+        for img_b64, image_type in zip(image_data, image_types):
             content.append(
                 {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{img_b64}",
+                        "url": f"data:image/{image_type};base64,{img_b64}",
                         "detail": "high",  # Use high detail for better text extraction
                     },
                 }
             )
 
-        try:
-            # Call vision API
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=content),
-            ]
-
-            response = self.llm.invoke(messages)
-            extracted_text = response.content
-
-            return extracted_text, image_data
-
-        except Exception as e:
-            logger.error(f"Error calling vision API: {str(e)}")
-            return "", image_data
+        messages = [
+            SystemMessage(content=VISION_SYSTEM_PROMPT),
+            HumanMessage(content=content),
+        ]
+        return messages, image_data
 
     def _llm_map_to_questions(
         self,
@@ -414,6 +828,44 @@ Output the extracted text clearly and completely."""
         Returns:
             Dictionary mapping question_id to answer data
         """
+        response = None
+        try:
+            messages = self._build_mapping_messages(content, questions)
+            response = self.json_llm.invoke(messages)
+            return self._parse_mapping_response(response.content, questions)
+
+        except Exception as e:
+            logger.error(f"Error in LLM mapping: {str(e)}")
+            return self._rejected_mapping(response, content, questions)
+
+    async def _allm_map_to_questions(
+        self,
+        content: str,
+        questions: List[QuestionConfig],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Async version of _llm_map_to_questions"""
+        response = None
+        try:
+            messages = self._build_mapping_messages(content, questions)
+            response = await self.json_llm.ainvoke(messages)
+            return self._parse_mapping_response(response.content, questions)
+
+        except Exception as e:
+            logger.error(f"Error in LLM mapping: {str(e)}")
+            return self._rejected_mapping(response, content, questions)
+
+    def _rejected_mapping(
+        self, response, content: str, questions: List[QuestionConfig]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fallback mapping; an unparseable reply is evicted from the LLM cache"""
+        if response is not None:
+            forget_llm_reply(response.content)
+        return self._fallback_mapping(content, questions)
+
+    def _build_mapping_messages(
+        self, content: str, questions: List[QuestionConfig]
+    ) -> list:
+        """Build the messages asking the LLM to map content to questions"""
         # Build question list for prompt
         question_list = []
         for q in questions:
@@ -422,72 +874,77 @@ Output the extracted text clearly and completely."""
             )  # Truncate long questions
 
         questions_str = "\n".join(question_list)
-
-        system_prompt = """You are an expert at analyzing student submissions and mapping answers to questions.
-Given a submission's content and a list of questions, identify which parts of the content answer which questions.
-
-Return a JSON object mapping question IDs to their answers in this format:
-{
-  "question_1": {
-    "text": "The student's answer for question 1...",
-    "confidence": "high/medium/low"
-  },
-  "question_2": {
-    "text": "The student's answer for question 2...",
-    "confidence": "high/medium/low"
-  }
-}
-
-If you cannot find an answer for a question, include an empty text field with low confidence.
-Extract the complete answer including all reasoning, calculations, and explanations."""
+        content = truncate_to_tokens(
+            content, MAPPING_CONTENT_MAX_TOKENS, self.model_name
+        )
 
         user_prompt = f"""Questions in this assignment:
 {questions_str}
 
 Student submission content:
-{content[:10000]}
+{content}
 
 Map the submission content to the questions above. Return JSON only."""
 
-        try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt),
-            ]
-
-            response = self.llm.invoke(messages)
-            response_text = response.content
+        return [
+            SystemMessage(content=MAPPING_SYSTEM_PROMPT),
+            HumanMessage(content=user_prompt),
+        ]
 
-            # Parse JSON response
-            import json
-            import re
+    def _parse_mapping_response(
+        self, response_text: str, questions: List[QuestionConfig]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Parse the mapping JSON, ensuring every question has an entry"""
+        mapping_data = self._load_json_object(response_text)
 
-            # Try to extract JSON from response
-            json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-            if json_match:
-                mapping_data = json.loads(json_match.group(0))
+        # Ensure all questions have entries
+        result = {}
+        for q in questions:
+            if q.id in mapping_data:
+                result[q.id] = mapping_data[q.id]
             else:
-                mapping_data = json.loads(response_text)
+                result[q.id] = {"text": "", "confidence": "low"}
 
-            # Ensure all questions have entries
-            result = {}
-            for q in questions:
-                if q.id in mapping_data:
-                    result[q.id] = mapping_data[q.id]
-                else:
-                    result[q.id] = {"text": "", "confidence": "low"}
+        return result
+
+    @staticmethod
+    def _load_json_object(response_text: str) -> Dict[str, Any]:
+        """
+        Parse a JSON object reply
 
-            return result
+        JSON mode replies are parsed directly; otherwise the first complete
+        object in the text (e.g. inside a markdown fence) is decoded.
 
-        except Exception as e:
-            logger.error(f"Error in LLM mapping: {str(e)}")
-            # Return empty answers for all questions
-            return {
-                q.id: {
-                    "text": (
-                        content if len(questions) == 1 else ""
-                    ),  # If single question, use all content
-                    "confidence": "low",
-                }
-                for q in questions
+        Raises:
+            ValueError: If the reply contains no JSON object
+        """
+        try:
+            data = fast_json.loads(response_text)
+        except ValueError:
+            start = response_text.find("{")
+            if start < 0:
+                raise ValueError("No JSON object in response")
+            # raw_decode stops at the end of the object, so trailing text
+            # and braces inside strings do not matter
+            data, _ = _JSON_DECODER.raw_decode(response_text, start)
+
+        if not isinstance(data, dict):
+            raise ValueError("Response is not a JSON object")
+        return data
+
+    @staticmethod
+    def _fallback_mapping(
+        content: str, questions: List[QuestionConfig]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Mapping used when the LLM call fails"""
+        # Return empty answers for all questions
+        return {
+            q.id: {
+                "text": (
+                    content if len(questions) == 1 else ""
+                ),  # If single question, use all content
+                "confidence": "low",
+                "extraction_failed": True,
             }
+            for q in questions
+        }
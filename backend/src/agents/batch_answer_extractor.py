@@ -0,0 +1,258 @@
+"""
+Batch Answer Extractor - Runs answer extraction for many submissions through
+the OpenAI Batch API
+
+Unattended grading runs have no latency requirement, so the vision and
+question-mapping calls of every submission are collected into one batch job
+per round instead of being sent one by one. Batch requests cost half as much
+as synchronous ones and do not count against the per-minute rate limits;
+results arrive within the 24 hour completion window.
+"""
+
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, convert_to_openai_messages
+from openai import OpenAI
+
+from ..models.assignment_config import AssignmentConfig
+from ..utils import fast_json
+from .answer_extraction_agent import AnswerExtractionAgent
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Batch states after which the batch will not change any more
+TERMINAL_BATCH_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class BatchAnswerExtractor:
+    """Extract answers for many submissions with two Batch API jobs"""
+
+    def __init__(
+        self,
+        extractor: AnswerExtractionAgent,
+        api_key: str,
+        poll_interval: float = 30.0,
+        max_poll_interval: float = 300.0,
+        workers: int = 8,
+    ):
+        """
+        Initialize the batch extractor
+
+        Args:
+            extractor: Agent whose prompts, model and parsing are reused
+            api_key: OpenAI API key
+            poll_interval: Seconds before the first status check
+            max_poll_interval: Upper bound for the doubling poll interval
+            workers: Threads used to parse submission files
+        """
+        self.extractor = extractor
+        self.client = OpenAI(api_key=api_key)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.workers = max(1, workers)
+
+    def extract_answers(
+        self,
+        submission_paths: List[str],
+        assignment_config: AssignmentConfig,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Extract answers from every submission
+
+        Round one reads text from images (submissions without images skip
+        it), round two maps each submission's content to the questions.
+        Submissions whose batch requests failed are left out of the result,
+        so the caller can extract them with direct calls instead.
+
+        Args:
+            submission_paths: Paths to submission files
+            assignment_config: Assignment configuration
+
+        Returns:
+            Dictionary mapping each submission path to the same structure
+            AnswerExtractionAgent.extract_answers returns
+        """
+        if not submission_paths:
+            return {}
+
+        questions = assignment_config.questions
+        logger.info(
+            f"Extracting answers from {len(submission_paths)} submissions via the Batch API"
+        )
+
+        # Parse files (and encode their images) in parallel
+        with ThreadPoolExecutor(
+            max_workers=min(self.workers, len(submission_paths))
+        ) as executor:
+            contents = list(executor.map(self._load_submission, submission_paths))
+
+        results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        loaded = {}
+        for path, content in zip(submission_paths, contents):
+            if isinstance(content, Exception):
+                results[path] = self.extractor._empty_answers(
+                    questions, f"Error during extraction: {str(content)}"
+                )
+            else:
+                loaded[path] = content
+
+        # Round 1: text from images (not needed when the text cache had it)
+        ids = {path: str(index) for index, path in enumerate(loaded)}
+        vision_replies = self._run_batch(
+            {
+                ids[path]: messages
+                for path, (_, messages, _) in loaded.items()
+                if messages
+            }
+        )
+
+        # Round 2: map content to questions
+        mapping_requests = {}
+        for path, (content, vision_messages, _) in loaded.items():
+            image_text = content.image_text or ""
+            if vision_messages:
+                image_text = vision_replies.get(ids[path])
+                if image_text is None:
+                    continue
+                self.extractor._record_image_text(content, image_text)
+            combined = self.extractor._combine_content(content.text, image_text)
+            mapping_requests[ids[path]] = (
+                self.extractor._build_mapping_messages(combined, questions),
+                combined,
+            )
+        mapping_replies = self._run_batch(
+            {
+                request_id: messages
+                for request_id, (messages, _) in mapping_requests.items()
+            },
+            json_mode=True,
+        )
+
+        for path, (content, _, image_data) in loaded.items():
+            reply = mapping_replies.get(ids[path])
+            if reply is None:
+                continue
+            _, combined = mapping_requests[ids[path]]
+            try:
+                mapping = self.extractor._parse_mapping_response(reply, questions)
+            except Exception as e:
+                logger.error(f"Error in LLM mapping for {path}: {str(e)}")
+                mapping = self.extractor._fallback_mapping(combined, questions)
+            results[path] = self.extractor._annotate_mapping(
+                mapping, content.image_count, image_data, content.images_failed
+            )
+
+        return results
+
+    def _load_submission(self, submission_path: str):
+        """Read a submission and build its vision request (errors are returned)"""
+        try:
+            content = self.extractor._load_submission_content(submission_path)
+            messages, image_data = self.extractor._build_vision_messages(content.images)
+            return content, messages, image_data
+        except Exception as e:
+            logger.error(f"Error extracting answers: {str(e)}", exc_info=True)
+            return e
+
+    def _run_batch(
+        self, requests: Dict[str, List[BaseMessage]], json_mode: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """
+        Run chat requests as one batch job and wait for it
+
+        Args:
+            requests: Messages keyed by request ID
+            json_mode: Request JSON object replies
+
+        Returns:
+            Reply text keyed by request ID (None for requests that failed);
+            IDs are missing if the whole batch failed
+        """
+        if not requests:
+            return {}
+
+        try:
+            batch = self._submit_batch(requests, json_mode)
+            batch = self._wait_for_batch(batch)
+        except Exception as e:
+            logger.error(f"Batch API request failed: {str(e)}")
+            return {}
+
+        if batch.status != "completed":
+            logger.error(f"Batch {batch.id} ended as {batch.status}")
+        if batch.error_file_id:
+            logger.warning(
+                f"Batch {batch.id}: some requests failed (error file {batch.error_file_id})"
+            )
+        if not batch.output_file_id:
+            return {}
+
+        replies: Dict[str, Optional[str]] = {}
+        output = self.client.files.content(batch.output_file_id).content
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = fast_json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                body = response["body"]
+                replies[item["custom_id"]] = body["choices"][0]["message"]["content"]
+            else:
+                replies[item["custom_id"]] = None
+        return replies
+
+    def _submit_batch(self, requests: Dict[str, List[BaseMessage]], json_mode: bool):
+        """Upload the requests as JSONL and create the batch job"""
+        body_params = {
+            "model": self.extractor.model_name,
+            "temperature": self.extractor.llm.temperature,
+        }
+        if json_mode:
+            body_params["response_format"] = {"type": "json_object"}
+        lines = [
+            fast_json.dumps(
+                {
+                    "custom_id": request_id,
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_ENDPOINT,
+                    "body": {
+                        **body_params,
+                        "messages": convert_to_openai_messages(messages),
+                    },
+                }
+            )
+            for request_id, messages in requests.items()
+        ]
+
+        batch_file = self.client.files.create(
+            file=("answer_extraction.jsonl", io.BytesIO(b"\n".join(lines))),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+        return batch
+
+    def _wait_for_batch(self, batch):
+        """Poll a batch with exponential backoff until it finishes"""
+        delay = self.poll_interval
+        while batch.status not in TERMINAL_BATCH_STATES:
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            if counts:
+                logger.info(
+                    f"Batch {batch.id}: {batch.status} "
+                    f"({counts.completed}/{counts.total} done)"
+                )
+        return batch
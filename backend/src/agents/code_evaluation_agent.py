@@ -13,9 +13,12 @@ import signal
 from typing import List, Dict, Any, Optional
 import json
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from ..utils.http import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +31,7 @@ class CodeEvaluationAgent:
         model: str = "gpt-4o-mini",
         temperature: float = 0.2,
         enable_execution: bool = False,
+        http_client: Optional[httpx.Client] = None,
     ):
         """
         Initialize the code evaluation agent
@@ -37,11 +41,13 @@ class CodeEvaluationAgent:
             model: Model name
             temperature: Temperature for generation
             enable_execution: Whether to allow code execution (default: False for safety)
+            http_client: Shared HTTP client (default: process-wide pool)
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=temperature,
+            http_client=http_client or get_http_client(),
         )
         self.model_name = model
         self.enable_execution = enable_execution
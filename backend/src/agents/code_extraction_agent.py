@@ -8,9 +8,12 @@ import logging
 from typing import List, Dict, Any, Optional
 import re
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from ..utils.http import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +25,7 @@ class CodeExtractionAgent:
         api_key: str,
         model: str = "gpt-4o-mini",
         temperature: float = 0.1,
+        http_client: Optional[httpx.Client] = None,
     ):
         """
         Initialize the code extraction agent
@@ -30,11 +34,13 @@ class CodeExtractionAgent:
             api_key: OpenAI API key
             model: Model name
             temperature: Temperature for generation
+            http_client: Shared HTTP client (default: process-wide pool)
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=temperature,
+            http_client=http_client or get_http_client(),
         )
         self.model_name = model
 
@@ -2,6 +2,8 @@
 Configuration Generator Agent - Automatically creates assignment configs from PDFs
 """
 
+import httpx
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from typing import Optional, Dict, Any
@@ -9,7 +11,10 @@ import json
 import logging
 import re
 
-from ..processors.document_processor import DocumentProcessor
+from ..processors.document_processor import DEFAULT_PDF_BACKEND, DocumentProcessor
+from ..utils.http import get_http_client
+from ..utils.llm_cache import forget_llm_reply
+from ..utils import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -17,20 +22,30 @@ logger = logging.getLogger(__name__)
 class ConfigGeneratorAgent:
     """Agent that generates assignment configurations from question and answer PDFs"""
 
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o",
+        http_client: Optional[httpx.Client] = None,
+        pdf_backend: str = DEFAULT_PDF_BACKEND,
+    ):
         """
         Initialize the config generator agent
         
         Args:
             api_key: OpenAI API key
             model: Model to use (gpt-4o recommended for better extraction)
+            http_client: Shared HTTP client (default: process-wide pool)
+            pdf_backend: PDF text extraction backend ("pymupdf" or "pypdf2")
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=0.1,
+            http_client=http_client or get_http_client(),
         )
         self.doc_processor = DocumentProcessor()
+        self.pdf_backend = pdf_backend
 
     def generate_config(
         self,
@@ -40,6 +55,7 @@ class ConfigGeneratorAgent:
         answer_key_pdf_path: Optional[str] = None,
         course_code: Optional[str] = None,
         term: Optional[str] = None,
+        use_processes: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate assignment configuration from PDF files
@@ -51,23 +67,46 @@ class ConfigGeneratorAgent:
             answer_key_pdf_path: Optional path to answer key PDF
             course_code: Course code (e.g., "CS361")
             term: Academic term (e.g., "Fall 2025")
+            use_processes: Parse the two PDFs in separate processes. PDF
+                parsing holds the GIL, so threads barely overlap; only enable
+                this from single-threaded callers such as the CLI (forking a
+                threaded server is unsafe)
             
         Returns:
             Dictionary with assignment configuration
         """
         logger.info(f"Generating config for: {assignment_name}")
 
-        # Extract text from questions PDF
-        questions_text = self.doc_processor.extract_text_from_file(questions_pdf_path)
+        # Extract text from questions PDF and answer key (if provided) in parallel
+        executor_class = (
+            ProcessPoolExecutor
+            if use_processes and answer_key_pdf_path
+            else ThreadPoolExecutor
+        )
+        with executor_class(max_workers=2) as executor:
+            questions_future = executor.submit(
+                DocumentProcessor.extract_text_from_file,
+                questions_pdf_path,
+                self.pdf_backend,
+            )
+            answer_key_future = (
+                executor.submit(
+                    DocumentProcessor.extract_text_from_file,
+                    answer_key_pdf_path,
+                    self.pdf_backend,
+                )
+                if answer_key_pdf_path
+                else None
+            )
+            questions_text = questions_future.result()
+            answer_key_text = answer_key_future.result() if answer_key_future else None
+
         if not questions_text:
             raise ValueError(f"Could not extract text from: {questions_pdf_path}")
 
         logger.info(f"Extracted {len(questions_text)} characters from questions PDF")
 
-        # Extract text from answer key if provided
-        answer_key_text = None
-        if answer_key_pdf_path:
-            answer_key_text = self.doc_processor.extract_text_from_file(answer_key_pdf_path)
+        if answer_key_text is not None:
             logger.info(f"Extracted {len(answer_key_text)} characters from answer key PDF")
 
         # Generate config using LLM
@@ -171,13 +210,17 @@ Be thorough and extract ALL questions. Preserve the original question text exact
             HumanMessage(content=user_prompt),
         ]
 
-        response = self.llm.invoke(messages)
+        # JSON mode: all questions come back in one well-formed object
+        response = self.llm.bind(response_format={"type": "json_object"}).invoke(
+            messages
+        )
         response_text = response.content
 
         # Parse JSON from response
         extracted_config = self._parse_json_from_response(response_text)
 
         if not extracted_config:
+            forget_llm_reply(response_text)
             raise ValueError("Failed to generate valid configuration from LLM")
 
         # Build complete config
@@ -286,10 +329,7 @@ Be thorough and extract ALL questions. Preserve the original question text exact
             output_path: Path to save JSON file
             pretty: Whether to format JSON nicely
         """
-        indent = 2 if pretty else None
-
-        with open(output_path, "w") as f:
-            json.dump(config, f, indent=indent)
+        fast_json.dump_to_file(config, output_path, indent=pretty)
 
         logger.info(f"Saved configuration to: {output_path}")
 
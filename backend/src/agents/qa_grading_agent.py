@@ -2,9 +2,13 @@
 Flexible Q&A Grading Agent using LangChain and OpenAI
 """
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 import re
@@ -12,6 +16,8 @@ import re
 from ..models.assignment_config import AssignmentConfig
 from ..models.grading_result import AssignmentGrade, QuestionGrade
 from ..utils.prompt_builder import PromptBuilder
+from ..utils.http import get_http_client
+from ..utils.llm_cache import forget_llm_reply
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,10 @@ class QAGradingAgent:
         model: str = "gpt-4o-mini",
         temperature: float = 0.1,
         grading_mode: str = "full",
+        batch_size: int = 5,
+        max_concurrent_calls: int = 10,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize the grading agent
@@ -34,14 +44,27 @@ class QAGradingAgent:
             model: Model name (default: gpt-4o-mini)
             temperature: Temperature for generation (lower = more consistent)
             grading_mode: Grading mode - "basic", "standard", or "full" (default)
+            batch_size: Questions graded per LLM call (1 = one call per question)
+            max_concurrent_calls: Grading calls in flight at once for one submission
+            http_client: Shared HTTP client for sync calls (default: process-wide pool)
+            http_async_client: Shared HTTP client for async calls
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=temperature,
+            http_client=http_client or get_http_client(),
+            http_async_client=http_async_client,
         )
         self.model_name = model
         self.grading_mode = grading_mode
+        self.batch_size = max(1, batch_size)
+        self.max_concurrent_calls = max(1, max_concurrent_calls)
+
+    @property
+    def json_llm(self):
+        """LLM bound to JSON mode, for batched grading where the reply must be one object"""
+        return self.llm.bind(response_format={"type": "json_object"})
 
     def grade_submission(
         self,
@@ -90,6 +113,7 @@ class QAGradingAgent:
 
             if not grading_data:
                 logger.error(f"Failed to parse LLM response for {student_name}")
+                forget_llm_reply(response_text)
                 return self._create_error_grade(
                     assignment_config, student_name, student_id, submission_file
                 )
@@ -196,6 +220,7 @@ class QAGradingAgent:
                 logger.error(
                     f"Failed to parse response for question {question_config.id}"
                 )
+                forget_llm_reply(response_text)
                 return self._create_error_question_grade(
                     question_config, extracted_from_image, extraction_notes
                 )
@@ -324,6 +349,7 @@ class QAGradingAgent:
             feedback="Please contact instructor for manual review",
             extracted_from_image=extracted_from_image,
             image_processing_notes=extraction_notes if extraction_notes else None,
+            grading_error=True,
         )
 
     def _parse_llm_response(self, response_text: str) -> Optional[Dict[str, Any]]:
@@ -525,71 +551,127 @@ class QAGradingAgent:
         Returns:
             QuestionGrade object or None if grading fails
         """
+        response = None
         try:
-            # Extract answer text
-            answer_text = answer_data.get("text", "")
-            extracted_from_image = answer_data.get("extracted_from_image", False)
-            extraction_notes = answer_data.get("extraction_notes")
+            messages = self._build_question_messages(
+                question, answer_data, assignment_config, context
+            )
+            response = self.llm.invoke(messages)
+            grade = self._to_question_grade(response.content, question, answer_data)
 
-            if not answer_text or answer_text.strip() == "":
-                logger.warning(f"No answer text for question {question.id}")
-                answer_text = "No answer provided"
+        except Exception as e:
+            logger.error(f"Error grading question {question.id}: {str(e)}")
+            grade = self._error_grade_for(question, answer_data)
 
-            # Build prompts using PromptBuilder
-            prompt_builder = PromptBuilder(
-                assignment_config, grading_mode=self.grading_mode
-            )
-            system_prompt, user_prompt = prompt_builder.build_single_question_prompt(
-                question=question,
-                student_answer=answer_text,
-                context=context,
-            )
+        return self._forget_rejected_reply(response, grade)
 
-            logger.debug(f"Grading question {question.id}")
+    async def agrade_single_question(
+        self,
+        question: "QuestionConfig",
+        answer_data: Dict[str, Any],
+        assignment_config: "AssignmentConfig",
+        context: Optional[str] = None,
+    ) -> Optional[QuestionGrade]:
+        """Async version of grade_single_question"""
+        response = None
+        try:
+            messages = self._build_question_messages(
+                question, answer_data, assignment_config, context
+            )
+            response = await self.llm.ainvoke(messages)
+            grade = self._to_question_grade(response.content, question, answer_data)
 
-            # Call LLM
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt),
-            ]
+        except Exception as e:
+            logger.error(f"Error grading question {question.id}: {str(e)}")
+            grade = self._error_grade_for(question, answer_data)
 
-            response = self.llm.invoke(messages)
-            response_text = response.content
+        return self._forget_rejected_reply(response, grade)
 
-            # Parse JSON response
-            grading_data = self._parse_llm_response(response_text)
+    @staticmethod
+    def _forget_rejected_reply(response, grade: QuestionGrade) -> QuestionGrade:
+        """Evict a reply that produced an error grade from the LLM cache"""
+        if response is not None and grade.grading_error:
+            # A cached bad reply would come back unchanged on every rerun
+            forget_llm_reply(response.content)
+        return grade
+
+    def _build_question_messages(
+        self,
+        question: "QuestionConfig",
+        answer_data: Dict[str, Any],
+        assignment_config: "AssignmentConfig",
+        context: Optional[str] = None,
+    ) -> list:
+        """Build the LLM messages for grading a single question"""
+        logger.debug(f"Grading question {question.id}")
+
+        answer_text = answer_data.get("text", "")
+        if not answer_text or answer_text.strip() == "":
+            logger.warning(f"No answer text for question {question.id}")
+            answer_text = "No answer provided"
+
+        # Build prompts using PromptBuilder
+        prompt_builder = PromptBuilder(
+            assignment_config, grading_mode=self.grading_mode
+        )
+        system_prompt, user_prompt = prompt_builder.build_single_question_prompt(
+            question=question,
+            student_answer=answer_text,
+            context=context,
+        )
 
-            if not grading_data:
-                logger.error(f"Failed to parse LLM response for question {question.id}")
-                return self._create_error_question_grade(
-                    question, extracted_from_image, extraction_notes
-                )
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
 
-            # Convert to QuestionGrade object
-            question_grade = QuestionGrade(
-                question_id=grading_data.get("question_id", question.id),
-                score=float(grading_data.get("score", 0)),
-                max_score=float(grading_data.get("max_score", question.points)),
-                reasoning=grading_data.get("reasoning", "No reasoning provided"),
-                feedback=grading_data.get("feedback"),
-                criteria_met=grading_data.get("criteria_met"),
-                criteria_missed=grading_data.get("criteria_missed"),
-                deductions=grading_data.get("deductions"),
-                extracted_from_image=extracted_from_image,
-                image_processing_notes=extraction_notes,
-            )
+    def _to_question_grade(
+        self,
+        response_text: str,
+        question: "QuestionConfig",
+        answer_data: Dict[str, Any],
+    ) -> QuestionGrade:
+        """Convert a single-question LLM response to a QuestionGrade"""
+        # Parse JSON response
+        grading_data = self._parse_llm_response(response_text)
+
+        if not grading_data:
+            logger.error(f"Failed to parse LLM response for question {question.id}")
+            return self._error_grade_for(question, answer_data)
+
+        return self._question_grade_from_data(
+            grading_data,
+            question,
+            answer_data.get("extracted_from_image", False),
+            answer_data.get("extraction_notes"),
+        )
 
-            logger.info(
-                f"Question {question.id}: {question_grade.score}/{question_grade.max_score}"
-            )
+    def _question_grade_from_data(
+        self,
+        grading_data: Dict[str, Any],
+        question: "QuestionConfig",
+        extracted_from_image: bool = False,
+        extraction_notes: Optional[str] = None,
+    ) -> QuestionGrade:
+        """Build a QuestionGrade from one parsed grading entry"""
+        question_grade = QuestionGrade(
+            question_id=grading_data.get("question_id", question.id),
+            score=float(grading_data.get("score", 0)),
+            max_score=float(grading_data.get("max_score", question.points)),
+            reasoning=grading_data.get("reasoning", "No reasoning provided"),
+            feedback=grading_data.get("feedback"),
+            criteria_met=grading_data.get("criteria_met"),
+            criteria_missed=grading_data.get("criteria_missed"),
+            deductions=grading_data.get("deductions"),
+            extracted_from_image=extracted_from_image,
+            image_processing_notes=extraction_notes,
+        )
 
-            return question_grade
+        logger.info(
+            f"Question {question.id}: {question_grade.score}/{question_grade.max_score}"
+        )
 
-        except Exception as e:
-            logger.error(f"Error grading question {question.id}: {str(e)}")
-            return self._create_error_question_grade(
-                question, extracted_from_image, extraction_notes
-            )
+        return question_grade
 
     def _create_error_question_grade(
         self,
@@ -616,6 +698,7 @@ class QAGradingAgent:
             feedback="Please contact instructor for manual review",
             extracted_from_image=extracted_from_image,
             image_processing_notes=extraction_notes,
+            grading_error=True,
         )
 
     def grade_submission_with_extraction(
@@ -625,6 +708,7 @@ class QAGradingAgent:
         extracted_answers: Dict[str, Dict[str, Any]],
         student_id: Optional[str] = None,
         submission_file: Optional[str] = None,
+        include_overall_comment: bool = False,
     ) -> Optional[AssignmentGrade]:
         """
         Grade a submission using pre-extracted answers (new multi-stage pipeline)
@@ -635,6 +719,9 @@ class QAGradingAgent:
             extracted_answers: Dictionary mapping question_id to answer data
             student_id: Optional student ID
             submission_file: Optional submission filename
+            include_overall_comment: When every question fits in one batch,
+                ask for the overall comment in the same call and set it on the
+                grade (left as None otherwise, for the report generator)
 
         Returns:
             AssignmentGrade object or None if grading fails
@@ -644,73 +731,73 @@ class QAGradingAgent:
                 f"Grading submission for {student_name} with extracted answers"
             )
 
-            # Grade each question individually
-            question_grades = []
-
-            for question in assignment_config.questions:
-                answer_data = extracted_answers.get(
-                    question.id,
-                    {
-                        "text": "",
-                        "extracted_from_image": False,
-                        "extraction_notes": "Question not found in extraction",
-                    },
+            batches = self._question_batches(assignment_config, extracted_answers)
+            if include_overall_comment and len(batches) == 1:
+                # Grades and overall comment in a single round-trip
+                question_grades, overall_comment = self._grade_batch(
+                    batches[0], assignment_config, with_comment=True
                 )
-
-                # Get context from other answers (optional)
-                context = None
-                if len(assignment_config.questions) > 1:
-                    other_answers = [
-                        f"{q_id}: {data.get('text', '')[:100]}..."
-                        for q_id, data in extracted_answers.items()
-                        if q_id != question.id
-                    ]
-                    context = "\n".join(other_answers[:3])  # Limit context
-
-                # Grade the question
-                question_grade = self.grade_single_question(
-                    question=question,
-                    answer_data=answer_data,
-                    assignment_config=assignment_config,
-                    context=context,
+            else:
+                # Grade questions in batches of self.batch_size per LLM call
+                question_grades = self.grade_questions_batch(
+                    assignment_config, extracted_answers
                 )
+                overall_comment = None
 
-                if question_grade:
-                    question_grades.append(question_grade)
-                else:
-                    # Create error grade if grading failed
-                    question_grades.append(
-                        self._create_error_question_grade(
-                            question,
-                            answer_data.get("extracted_from_image", False),
-                            answer_data.get("extraction_notes"),
-                        )
-                    )
-
-            # Calculate total score
-            total_score = sum(q.score for q in question_grades)
-            max_score = sum(q.max_score for q in question_grades)
+            return self._assemble_assignment_grade(
+                question_grades,
+                assignment_config,
+                student_name,
+                student_id,
+                submission_file,
+                overall_comment,
+            )
 
-            # Create AssignmentGrade (report generation will be done separately)
-            assignment_grade = AssignmentGrade(
-                student_name=student_name,
-                student_id=student_id,
-                submission_file=submission_file,
-                assignment_id=assignment_config.assignment_id,
-                assignment_name=assignment_config.assignment_name,
-                total_score=total_score,
-                max_score=max_score,
-                questions=question_grades,
-                overall_comment=None,  # Will be set by report generator
-                llm_model=self.model_name,
+        except Exception as e:
+            logger.error(f"Error grading submission for {student_name}: {str(e)}")
+            return self._create_error_grade(
+                assignment_config, student_name, student_id, submission_file
             )
 
-            logger.info(
-                f"Successfully graded {student_name}: "
-                f"{assignment_grade.total_score}/{assignment_grade.max_score}"
+    async def agrade_submission_with_extraction(
+        self,
+        assignment_config: "AssignmentConfig",
+        student_name: str,
+        extracted_answers: Dict[str, Dict[str, Any]],
+        student_id: Optional[str] = None,
+        submission_file: Optional[str] = None,
+        include_overall_comment: bool = False,
+    ) -> Optional[AssignmentGrade]:
+        """
+        Async version of grade_submission_with_extraction
+
+        Question batches are independent of each other, so all of them are
+        graded concurrently.
+        """
+        try:
+            logger.debug(
+                f"Grading submission for {student_name} with extracted answers"
             )
 
-            return assignment_grade
+            batches = self._question_batches(assignment_config, extracted_answers)
+            if include_overall_comment and len(batches) == 1:
+                question_grades, overall_comment = await self._agrade_batch(
+                    batches[0], assignment_config, with_comment=True
+                )
+            else:
+                question_grades = await self.agrade_questions_batch(
+                    assignment_config, extracted_answers
+                )
+                overall_comment = None
+
+            return self._assemble_assignment_grade(
+                question_grades,
+                assignment_config,
+                student_name,
+                student_id,
+                submission_file,
+                overall_comment,
+            )
 
         except Exception as e:
             logger.error(f"Error grading submission for {student_name}: {str(e)}")
@@ -718,7 +805,372 @@ class QAGradingAgent:
                 assignment_config, student_name, student_id, submission_file
             )
 
+    def grade_questions_batch(
+        self,
+        assignment_config: "AssignmentConfig",
+        extracted_answers: Dict[str, Dict[str, Any]],
+        batch_size: Optional[int] = None,
+    ) -> List[QuestionGrade]:
+        """
+        Grade all questions, several per LLM call
+
+        The assignment header and rubrics are sent once per batch instead of
+        once per question, and batches are graded in parallel (at most
+        max_concurrent_calls at a time). Entries missing from or malformed in
+        a batch reply are re-graded with individual calls.
+
+        Args:
+            assignment_config: Assignment configuration
+            extracted_answers: Dictionary mapping question_id to answer data
+            batch_size: Questions per call (default: self.batch_size)
+
+        Returns:
+            List of QuestionGrade objects in question order
+        """
+        batches = self._question_batches(
+            assignment_config, extracted_answers, batch_size
+        )
+        if len(batches) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(len(batches), self.max_concurrent_calls)
+            ) as executor:
+                results = list(
+                    executor.map(
+                        lambda batch: self._grade_batch(batch, assignment_config),
+                        batches,
+                    )
+                )
+        else:
+            results = [self._grade_batch(batch, assignment_config) for batch in batches]
+
+        return [
+            question_grade
+            for batch_grades, _ in results
+            for question_grade in batch_grades
+        ]
+
+    async def agrade_questions_batch(
+        self,
+        assignment_config: "AssignmentConfig",
+        extracted_answers: Dict[str, Dict[str, Any]],
+        batch_size: Optional[int] = None,
+    ) -> List[QuestionGrade]:
+        """Async version of grade_questions_batch (batches run concurrently)"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+
+        async def grade_bounded(batch: list):
+            async with semaphore:
+                return await self._agrade_batch(batch, assignment_config)
+
+        results = await asyncio.gather(
+            *(
+                grade_bounded(batch)
+                for batch in self._question_batches(
+                    assignment_config, extracted_answers, batch_size
+                )
+            )
+        )
+        return [
+            question_grade
+            for batch_grades, _ in results
+            for question_grade in batch_grades
+        ]
+
+    def _question_batches(
+        self,
+        assignment_config: "AssignmentConfig",
+        extracted_answers: Dict[str, Dict[str, Any]],
+        batch_size: Optional[int] = None,
+    ) -> List[list]:
+        """Split the (question, answer_data, context) inputs into batches"""
+        batch_size = max(1, batch_size or self.batch_size)
+        inputs = list(self._iter_question_inputs(assignment_config, extracted_answers))
+        return [inputs[i : i + batch_size] for i in range(0, len(inputs), batch_size)]
+
+    def _grade_batch(
+        self,
+        batch: list,
+        assignment_config: "AssignmentConfig",
+        with_comment: bool = False,
+    ) -> Tuple[List[QuestionGrade], Optional[str]]:
+        """
+        Grade one batch of questions with a single LLM call
+
+        With ``with_comment`` the reply also carries the overall comment for
+        the whole submission.
+
+        Returns:
+            Tuple of (question grades in batch order, overall comment or None)
+        """
+        graded, overall_comment, response = {}, None, None
+        batch_call = self._needs_batch_call(batch, with_comment)
+        if batch_call:
+            try:
+                messages = self._build_batch_messages(
+                    batch, assignment_config, with_comment
+                )
+                response = self.json_llm.invoke(messages)
+                graded, overall_comment = self._read_batch_response(response, batch)
+            except Exception as e:
+                logger.error(f"Error grading question batch: {str(e)}")
+            self._forget_incomplete_batch(response, batch, graded)
+
+        regraded = {
+            question.id: self.grade_single_question(
+                question, answer_data, assignment_config, context
+            )
+            for question, answer_data, context in self._ungraded_entries(
+                batch, graded, batch_call
+            )
+        }
+        return self._merge_batch_grades(batch, graded, regraded), overall_comment
+
+    async def _agrade_batch(
+        self,
+        batch: list,
+        assignment_config: "AssignmentConfig",
+        with_comment: bool = False,
+    ) -> Tuple[List[QuestionGrade], Optional[str]]:
+        """Async version of _grade_batch"""
+        graded, overall_comment, response = {}, None, None
+        batch_call = self._needs_batch_call(batch, with_comment)
+        if batch_call:
+            try:
+                messages = self._build_batch_messages(
+                    batch, assignment_config, with_comment
+                )
+                response = await self.json_llm.ainvoke(messages)
+                graded, overall_comment = self._read_batch_response(response, batch)
+            except Exception as e:
+                logger.error(f"Error grading question batch: {str(e)}")
+            self._forget_incomplete_batch(response, batch, graded)
+
+        regraded = {
+            question.id: await self.agrade_single_question(
+                question, answer_data, assignment_config, context
+            )
+            for question, answer_data, context in self._ungraded_entries(
+                batch, graded, batch_call
+            )
+        }
+        return self._merge_batch_grades(batch, graded, regraded), overall_comment
+
+    @staticmethod
+    def _forget_incomplete_batch(
+        response, batch: list, graded: Dict[str, QuestionGrade]
+    ) -> None:
+        """Evict a batch reply with dropped entries from the LLM cache"""
+        if response is not None and len(graded) < len(batch):
+            forget_llm_reply(response.content)
+
+    @staticmethod
+    def _needs_batch_call(batch: list, with_comment: bool) -> bool:
+        """Whether a batch is sent as one call (a lone question is graded alone)"""
+        return len(batch) > 1 or with_comment
+
+    def _read_batch_response(
+        self, response, batch: list
+    ) -> Tuple[Dict[str, QuestionGrade], Optional[str]]:
+        """Log prompt cache use and parse a batch reply"""
+        self._log_prompt_cache(response)
+        return self._parse_batch_response(response.content, batch)
+
+    @staticmethod
+    def _ungraded_entries(
+        batch: list, graded: Dict[str, QuestionGrade], batch_call: bool
+    ) -> list:
+        """Batch entries without a valid batch result, to grade individually"""
+        missing = [entry for entry in batch if entry[0].id not in graded]
+        if batch_call:
+            for question, _, _ in missing:
+                logger.warning(
+                    f"No valid batch result for question {question.id}, "
+                    f"grading individually"
+                )
+        return missing
+
+    def _merge_batch_grades(
+        self,
+        batch: list,
+        graded: Dict[str, QuestionGrade],
+        regraded: Dict[str, Optional[QuestionGrade]],
+    ) -> List[QuestionGrade]:
+        """Question grades in batch order, with error grades for the failures"""
+        return [
+            graded.get(question.id)
+            or regraded.get(question.id)
+            or self._error_grade_for(question, answer_data)
+            for question, answer_data, _ in batch
+        ]
+
+    @staticmethod
+    def _log_prompt_cache(response) -> None:
+        """Log how much of the prompt the provider served from its prefix cache"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if cached:
+            logger.debug(
+                f"Prompt cache hit: {cached} of {usage.get('input_tokens')} input tokens"
+            )
+
+    def _build_batch_messages(
+        self,
+        batch: list,
+        assignment_config: "AssignmentConfig",
+        with_comment: bool = False,
+    ) -> list:
+        """Build the LLM messages for grading a batch of questions"""
+        logger.debug(f"Grading {len(batch)} questions in one call")
+
+        questions_and_answers = []
+        for question, answer_data, _ in batch:
+            answer_text = answer_data.get("text", "")
+            if not answer_text or answer_text.strip() == "":
+                logger.warning(f"No answer text for question {question.id}")
+                answer_text = "No answer provided"
+            questions_and_answers.append((question, answer_text))
+
+        prompt_builder = PromptBuilder(
+            assignment_config, grading_mode=self.grading_mode
+        )
+        system_prompt, user_prompt = prompt_builder.build_batch_question_prompt(
+            questions_and_answers, include_overall_comment=with_comment
+        )
+
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
+
+    def _parse_batch_response(
+        self, response_text: str, batch: list
+    ) -> Tuple[Dict[str, QuestionGrade], Optional[str]]:
+        """
+        Parse a batch reply into QuestionGrades keyed by question_id
+
+        Entries with an unknown question_id, a missing or out-of-range score,
+        or that fail validation are dropped so the caller can re-grade them.
+
+        Returns:
+            Tuple of (grades by question_id, overall comment or None)
+        """
+        grading_data = self._parse_llm_response(response_text)
+        entries = grading_data.get("grades") if isinstance(grading_data, dict) else None
+        if not isinstance(entries, list):
+            logger.error("Batch grading response has no 'grades' list")
+            return {}, None
+
+        overall_comment = grading_data.get("overall_comment")
+        if isinstance(overall_comment, str) and overall_comment.strip():
+            overall_comment = overall_comment.strip()
+        else:
+            overall_comment = None
+
+        inputs = {
+            question.id: (question, answer_data) for question, answer_data, _ in batch
+        }
+        graded = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or entry.get("question_id") not in inputs:
+                continue
+
+            question, answer_data = inputs[entry["question_id"]]
+            try:
+                score = float(entry["score"])
+                if not 0 <= score <= question.points:
+                    raise ValueError(f"score {score} outside 0-{question.points}")
+                entry["max_score"] = question.points
+                graded[question.id] = self._question_grade_from_data(
+                    entry,
+                    question,
+                    answer_data.get("extracted_from_image", False),
+                    answer_data.get("extraction_notes"),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Malformed batch entry for {question.id}: {str(e)}")
+
+        return graded, overall_comment
+
+    def _error_grade_for(
+        self, question: "QuestionConfig", answer_data: Dict[str, Any]
+    ) -> QuestionGrade:
+        """Error grade carrying the answer's extraction metadata"""
+        return self._create_error_question_grade(
+            question,
+            answer_data.get("extracted_from_image", False),
+            answer_data.get("extraction_notes"),
+        )
+
+    def _iter_question_inputs(
+        self,
+        assignment_config: "AssignmentConfig",
+        extracted_answers: Dict[str, Dict[str, Any]],
+    ):
+        """Yield (question, answer_data, context) for each question to grade"""
+        for question in assignment_config.questions:
+            answer_data = extracted_answers.get(
+                question.id,
+                {
+                    "text": "",
+                    "extracted_from_image": False,
+                    "extraction_notes": "Question not found in extraction",
+                },
+            )
+
+            # Get context from other answers (optional)
+            context = None
+            if len(assignment_config.questions) > 1:
+                other_answers = [
+                    f"{q_id}: {data.get('text', '')[:100]}..."
+                    for q_id, data in extracted_answers.items()
+                    if q_id != question.id
+                ]
+                context = "\n".join(other_answers[:3])  # Limit context
+
+            yield question, answer_data, context
+
+    def _assemble_assignment_grade(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: "AssignmentConfig",
+        student_name: str,
+        student_id: Optional[str],
+        submission_file: Optional[str],
+        overall_comment: Optional[str] = None,
+    ) -> AssignmentGrade:
+        """
+        Sum question grades into an AssignmentGrade
+
+        The overall comment is left as None for the report generator unless
+        it came with the grades.
+        """
+        # Calculate total score
+        total_score = sum(q.score for q in question_grades)
+        max_score = sum(q.max_score for q in question_grades)
+
+        # Create AssignmentGrade (report generation will be done separately)
+        assignment_grade = AssignmentGrade(
+            student_name=student_name,
+            student_id=student_id,
+            submission_file=submission_file,
+            assignment_id=assignment_config.assignment_id,
+            assignment_name=assignment_config.assignment_name,
+            total_score=total_score,
+            max_score=max_score,
+            questions=question_grades,
+            overall_comment=overall_comment,
+            llm_model=self.model_name,
+        )
+
+        logger.info(
+            f"Successfully graded {student_name}: "
+            f"{assignment_grade.total_score}/{assignment_grade.max_score}"
+        )
+
+        return assignment_grade
+
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def extract_student_name(filename: str) -> str:
         """
         Extract student name from filename
@@ -754,6 +1206,7 @@ class QAGradingAgent:
         return name.strip()
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def extract_student_id(filename: str) -> str:
         """
         Extract student ID from filename
@@ -6,11 +6,13 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from statistics import mean, median
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from ..models.grading_result import QuestionGrade
+from ..models.grading_result import QuestionGrade, ReportData
 from ..models.assignment_config import AssignmentConfig
+from ..utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,8 @@ class ReportGenerator:
         api_key: str,
         model: str = "gpt-4o-mini",
         temperature: float = 0.3,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize the report generator
@@ -31,11 +35,15 @@ class ReportGenerator:
             api_key: OpenAI API key
             model: Model name
             temperature: Temperature for generation (slightly higher for creative feedback)
+            http_client: Shared HTTP client for sync calls (default: process-wide pool)
+            http_async_client: Shared HTTP client for async calls
         """
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             temperature=temperature,
+            http_client=http_client or get_http_client(),
+            http_async_client=http_async_client,
         )
         self.model_name = model
 
@@ -44,7 +52,8 @@ class ReportGenerator:
         question_grades: List[QuestionGrade],
         assignment_config: AssignmentConfig,
         student_name: str,
-    ) -> Dict[str, Any]:
+        overall_comment: Optional[str] = None,
+    ) -> ReportData:
         """
         Generate comprehensive report from individual question grades
 
@@ -52,71 +61,167 @@ class ReportGenerator:
             question_grades: List of graded questions
             assignment_config: Assignment configuration
             student_name: Name of the student
+            overall_comment: Comment already written during grading; when
+                given, no LLM call is made
 
         Returns:
-            Dictionary with report data including:
-            - total_score, max_score
-            - overall_comment
-            - strengths, areas_for_improvement
-            - requires_human_review, review_reason
+            ReportData with scores, overall comment, strengths, areas for
+            improvement and the human review flag
         """
         logger.info(f"Generating report for {student_name}")
 
         try:
-            # Calculate statistics
-            stats = self._calculate_statistics(question_grades)
-
-            # Identify strengths and weaknesses
-            strengths, weaknesses = self._identify_strengths_and_weaknesses(
+            stats, strengths, weaknesses = self._analyze_grades(
                 question_grades, assignment_config
             )
 
             # Generate overall comment using LLM
-            overall_comment = self._generate_overall_comment(
-                question_grades=question_grades,
-                assignment_config=assignment_config,
-                stats=stats,
-                strengths=strengths,
-                weaknesses=weaknesses,
-            )
+            if overall_comment is None:
+                overall_comment = self._generate_overall_comment(
+                    question_grades=question_grades,
+                    assignment_config=assignment_config,
+                    stats=stats,
+                    strengths=strengths,
+                    weaknesses=weaknesses,
+                )
+            else:
+                overall_comment = self._clean_comment(overall_comment)
 
-            # Determine if human review is needed
-            requires_review, review_reason = self._check_human_review_needed(
-                question_grades, stats
+            return self._build_report_data(
+                question_grades, stats, strengths, weaknesses, overall_comment
             )
 
-            report_data = {
-                "total_score": stats["total_score"],
-                "max_score": stats["max_score"],
-                "overall_comment": overall_comment,
-                "strengths": strengths,
-                "areas_for_improvement": weaknesses,
-                "requires_human_review": requires_review,
-                "review_reason": review_reason,
-            }
+        except Exception as e:
+            logger.error(f"Error generating report: {str(e)}", exc_info=True)
+            return self._error_report_data(question_grades, e)
+
+    async def agenerate_report(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: AssignmentConfig,
+        student_name: str,
+        overall_comment: Optional[str] = None,
+    ) -> ReportData:
+        """Async version of generate_report"""
+        logger.info(f"Generating report for {student_name}")
 
-            logger.info(
-                f"Report generated: {stats['total_score']}/{stats['max_score']} ({stats['percentage']:.1f}%)"
+        try:
+            stats, strengths, weaknesses = self._analyze_grades(
+                question_grades, assignment_config
             )
 
-            return report_data
+            if overall_comment is None:
+                overall_comment = await self._agenerate_overall_comment(
+                    question_grades=question_grades,
+                    assignment_config=assignment_config,
+                    stats=stats,
+                    strengths=strengths,
+                    weaknesses=weaknesses,
+                )
+            else:
+                overall_comment = self._clean_comment(overall_comment)
+
+            return self._build_report_data(
+                question_grades, stats, strengths, weaknesses, overall_comment
+            )
 
         except Exception as e:
             logger.error(f"Error generating report: {str(e)}", exc_info=True)
+            return self._error_report_data(question_grades, e)
 
-            # Return basic report on error
-            total_score = sum(q.score for q in question_grades)
-            max_score = sum(q.max_score for q in question_grades)
+    def quick_report(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: AssignmentConfig,
+    ) -> ReportData:
+        """
+        Build a report without an LLM call
 
-            return {
-                "total_score": total_score,
-                "max_score": max_score,
-                "overall_comment": "Report generation encountered an error. Please review individual question feedback.",
-                "strengths": None,
-                "areas_for_improvement": None,
-                "requires_human_review": True,
-                "review_reason": f"Report generation error: {str(e)}",
-            }
+        Strengths, areas for improvement and the review flag are computed as
+        in generate_report; the overall comment is the template for the
+        score band.
+
+        Args:
+            question_grades: List of graded questions
+            assignment_config: Assignment configuration
+
+        Returns:
+            ReportData, as from generate_report
+        """
+        stats, strengths, weaknesses = self._analyze_grades(
+            question_grades, assignment_config
+        )
+        return self._build_report_data(
+            question_grades,
+            stats,
+            strengths,
+            weaknesses,
+            self._template_comment(stats),
+        )
+
+    def _analyze_grades(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: AssignmentConfig,
+    ) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """Compute statistics, strengths and weaknesses (no LLM involved)"""
+        # Calculate statistics
+        stats = self._calculate_statistics(question_grades)
+
+        # Identify strengths and weaknesses
+        strengths, weaknesses = self._identify_strengths_and_weaknesses(
+            question_grades, assignment_config
+        )
+
+        return stats, strengths, weaknesses
+
+    def _build_report_data(
+        self,
+        question_grades: List[QuestionGrade],
+        stats: Dict[str, Any],
+        strengths: List[str],
+        weaknesses: List[str],
+        overall_comment: str,
+    ) -> ReportData:
+        """Assemble the report"""
+        # Determine if human review is needed
+        requires_review, review_reason = self._check_human_review_needed(
+            question_grades, stats
+        )
+
+        report_data = ReportData(
+            total_score=stats["total_score"],
+            max_score=stats["max_score"],
+            overall_comment=overall_comment,
+            strengths=strengths,
+            areas_for_improvement=weaknesses,
+            requires_human_review=requires_review,
+            review_reason=review_reason,
+        )
+
+        logger.info(
+            f"Report generated: {stats['total_score']}/{stats['max_score']} ({stats['percentage']:.1f}%)"
+        )
+
+        return report_data
+
+    @staticmethod
+    def _error_report_data(
+        question_grades: List[QuestionGrade], error: Exception
+    ) -> ReportData:
+        """Basic report returned when report generation fails"""
+        total_score = sum(q.score for q in question_grades)
+        max_score = sum(q.max_score for q in question_grades)
+
+        return ReportData(
+            total_score=total_score,
+            max_score=max_score,
+            overall_comment="Report generation encountered an error. Please review individual question feedback.",
+            strengths=None,
+            areas_for_improvement=None,
+            requires_human_review=True,
+            review_reason=f"Report generation error: {str(error)}",
+        )
 
     def _calculate_statistics(
         self, question_grades: List[QuestionGrade]
@@ -264,17 +369,58 @@ class ReportGenerator:
             Overall comment string
         """
         try:
-            # Build summary of question performance
-            question_summary = []
-            for q_grade in question_grades:
-                question_summary.append(
-                    f"- {q_grade.question_id}: {q_grade.score}/{q_grade.max_score} "
-                    f"({q_grade.get_percentage():.0f}%) - {q_grade.reasoning[:100]}..."
-                )
+            messages = self._build_comment_messages(
+                question_grades, assignment_config, stats, strengths, weaknesses
+            )
+            response = self.llm.invoke(messages)
+            return self._clean_comment(response.content)
+
+        except Exception as e:
+            logger.error(f"Error generating overall comment: {str(e)}")
+
+            # Fallback to template-based comment
+            return self._template_comment(stats)
+
+    async def _agenerate_overall_comment(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: AssignmentConfig,
+        stats: Dict[str, Any],
+        strengths: List[str],
+        weaknesses: List[str],
+    ) -> str:
+        """Async version of _generate_overall_comment"""
+        try:
+            messages = self._build_comment_messages(
+                question_grades, assignment_config, stats, strengths, weaknesses
+            )
+            response = await self.llm.ainvoke(messages)
+            return self._clean_comment(response.content)
 
-            question_summary_str = "\n".join(question_summary)
+        except Exception as e:
+            logger.error(f"Error generating overall comment: {str(e)}")
+            return self._template_comment(stats)
 
-            system_prompt = """You are an experienced educator providing constructive feedback on student assignments.
+    def _build_comment_messages(
+        self,
+        question_grades: List[QuestionGrade],
+        assignment_config: AssignmentConfig,
+        stats: Dict[str, Any],
+        strengths: List[str],
+        weaknesses: List[str],
+    ) -> list:
+        """Build the LLM messages for the overall comment"""
+        # Build summary of question performance
+        question_summary = []
+        for q_grade in question_grades:
+            question_summary.append(
+                f"- {q_grade.question_id}: {q_grade.score}/{q_grade.max_score} "
+                f"({q_grade.get_percentage():.0f}%) - {q_grade.reasoning[:100]}..."
+            )
+
+        question_summary_str = "\n".join(question_summary)
+
+        system_prompt = """You are an experienced educator providing constructive feedback on student assignments.
 Generate a concise overall comment (2-4 sentences) that:
 1. Acknowledges the student's overall performance
 2. Highlights key strengths
@@ -283,7 +429,7 @@ Generate a concise overall comment (2-4 sentences) that:
 
 Be constructive, specific, and encouraging. Focus on learning outcomes."""
 
-            user_prompt = f"""Assignment: {assignment_config.assignment_name}
+        user_prompt = f"""Assignment: {assignment_config.assignment_name}
 Total Score: {stats['total_score']}/{stats['max_score']} ({stats['percentage']:.1f}%)
 
 Question Performance:
@@ -297,36 +443,37 @@ Areas for Improvement:
 
 Generate an overall comment for this student's work."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt),
-            ]
-
-            response = self.llm.invoke(messages)
-            overall_comment = response.content.strip()
-
-            # Remove quotes if LLM added them
-            if overall_comment.startswith('"') and overall_comment.endswith('"'):
-                overall_comment = overall_comment[1:-1]
-
-            return overall_comment
-
-        except Exception as e:
-            logger.error(f"Error generating overall comment: {str(e)}")
-
-            # Fallback to template-based comment
-            percentage = stats["percentage"]
-
-            if percentage >= 90:
-                return f"Excellent work! You demonstrated strong understanding across all questions. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
-            elif percentage >= 80:
-                return f"Very good work overall. You showed solid understanding with room for minor improvements. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
-            elif percentage >= 70:
-                return f"Good effort. You demonstrated understanding of key concepts, but some areas need more attention. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
-            elif percentage >= 60:
-                return f"Satisfactory work. Please review the feedback and work on strengthening your understanding. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
-            else:
-                return f"This assignment needs significant improvement. Please review the detailed feedback and seek help on challenging topics. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
+
+    @staticmethod
+    def _clean_comment(comment: str) -> str:
+        """Strip whitespace and wrapping quotes from an LLM comment"""
+        overall_comment = comment.strip()
+
+        # Remove quotes if LLM added them
+        if overall_comment.startswith('"') and overall_comment.endswith('"'):
+            overall_comment = overall_comment[1:-1]
+
+        return overall_comment
+
+    @staticmethod
+    def _template_comment(stats: Dict[str, Any]) -> str:
+        """Template-based overall comment for the score band"""
+        percentage = stats["percentage"]
+
+        if percentage >= 90:
+            return f"Excellent work! You demonstrated strong understanding across all questions. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
+        elif percentage >= 80:
+            return f"Very good work overall. You showed solid understanding with room for minor improvements. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
+        elif percentage >= 70:
+            return f"Good effort. You demonstrated understanding of key concepts, but some areas need more attention. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
+        elif percentage >= 60:
+            return f"Satisfactory work. Please review the feedback and work on strengthening your understanding. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
+        else:
+            return f"This assignment needs significant improvement. Please review the detailed feedback and seek help on challenging topics. Score: {stats['total_score']}/{stats['max_score']} ({percentage:.1f}%)"
 
     def _check_human_review_needed(
         self,
@@ -362,6 +509,11 @@ Generate an overall comment for this student's work."""
         if image_issues > 0:
             reasons.append(f"{image_issues} question(s) had image extraction issues")
 
+        # Questions the grader failed on got a placeholder zero
+        grading_errors = sum(1 for q in question_grades if q.grading_error)
+        if grading_errors > 0:
+            reasons.append(f"{grading_errors} question(s) could not be graded")
+
         # Check for low confidence or unclear grading
         unclear_grading = sum(
             1 for q in question_grades if q.score == 0 and len(q.reasoning) < 50
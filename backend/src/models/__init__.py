@@ -8,6 +8,7 @@ from .assignment_config import (
 from .grading_result import (
     QuestionGrade,
     AssignmentGrade,
+    ReportData,
 )
 
 __all__ = [
@@ -16,5 +17,6 @@ __all__ = [
     "AssignmentConfig",
     "QuestionGrade",
     "AssignmentGrade",
+    "ReportData",
 ]
 
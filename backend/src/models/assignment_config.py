@@ -4,7 +4,6 @@ Data models for assignment configuration using Pydantic
 
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any, List
-import json
 
 
 class RubricConfig(BaseModel):
@@ -152,14 +151,13 @@ class AssignmentConfig(BaseModel):
     @classmethod
     def from_json_file(cls, file_path: str) -> "AssignmentConfig":
         """Load configuration from JSON file"""
-        with open(file_path, "r") as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+        with open(file_path, "rb") as f:
+            return cls.model_validate_json(f.read())
 
     def to_json_file(self, file_path: str):
         """Save configuration to JSON file"""
-        with open(file_path, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(self.model_dump_json(indent=2))
 
     class Config:
         extra = "allow"
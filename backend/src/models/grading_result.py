@@ -5,7 +5,6 @@ Data models for grading results using Pydantic
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import json
 
 
 class QuestionGrade(BaseModel):
@@ -37,6 +36,9 @@ class QuestionGrade(BaseModel):
     image_processing_notes: Optional[str] = Field(
         default=None, description="Notes about image extraction process"
     )
+    grading_error: bool = Field(
+        default=False, description="Whether grading this question failed"
+    )
 
     @field_validator("score")
     @classmethod
@@ -215,14 +217,33 @@ class AssignmentGrade(BaseModel):
     @classmethod
     def from_json_file(cls, file_path: str) -> "AssignmentGrade":
         """Load from JSON file"""
-        with open(file_path, "r") as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+        with open(file_path, "rb") as f:
+            return cls.model_validate_json(f.read())
 
     def to_json_file(self, file_path: str):
         """Save to JSON file"""
-        with open(file_path, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(self.model_dump_json(indent=2))
 
     class Config:
         extra = "allow"
+
+
+class ReportData(BaseModel):
+    """Assessment report synthesized from a submission's question grades"""
+
+    total_score: float = Field(..., ge=0, description="Total points earned")
+    max_score: float = Field(..., ge=0, description="Maximum possible points")
+    overall_comment: str = Field(..., description="Overall comment on the submission")
+    strengths: Optional[List[str]] = Field(
+        default=None, description="Identified strengths"
+    )
+    areas_for_improvement: Optional[List[str]] = Field(
+        default=None, description="Areas needing improvement"
+    )
+    requires_human_review: bool = Field(
+        default=False, description="Flag for human review needed"
+    )
+    review_reason: Optional[str] = Field(
+        default=None, description="Reason for human review"
+    )
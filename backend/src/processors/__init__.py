@@ -1,7 +1,7 @@
 """Document and input processors"""
 
-from .document_processor import DocumentProcessor
+from .document_processor import DocumentProcessor, SubmissionFile
 from .input_processor import InputProcessor
 from .submission_grouper import SubmissionGrouper
 
-__all__ = ["DocumentProcessor", "InputProcessor", "SubmissionGrouper"]
+__all__ = ["DocumentProcessor", "SubmissionFile", "InputProcessor", "SubmissionGrouper"]
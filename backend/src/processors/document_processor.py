@@ -3,16 +3,33 @@ Document processor for extracting text from various file formats
 Enhanced version with image extraction support
 """
 
+import functools
 import os
 import io
+import threading
 import PyPDF2
 from docx import Document
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Iterator, NamedTuple
 from PIL import Image
 import logging
 
+from ..utils.hashing import file_digest
+from ..utils.text_cache import get_text_cache
+
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes so persisted text is not reused
+EXTRACTOR_VERSION = 2
+
+# Formats whose text is persisted by the text cache (the rest are cheap reads,
+# and code extraction embeds the file name in its output)
+PERSISTED_TEXT_EXTENSIONS = (".pdf", ".docx")
+
+# Extensions picked up by a submissions directory scan (lower case)
+SUBMISSION_EXTENSIONS = frozenset({".pdf", ".docx", ".txt", ".py", ".java"})
+
+CODE_EXTENSIONS = frozenset({".py", ".java", ".cpp", ".c", ".js", ".ts"})
+
 # Try to import optional image processing libraries
 try:
     import fitz  # PyMuPDF
@@ -22,21 +39,51 @@ except ImportError:
     PYMUPDF_AVAILABLE = False
     logger.warning("PyMuPDF not available. Image extraction from PDFs will be limited.")
 
-try:
-    from pdf2image import convert_from_path
+# PyMuPDF is not thread-safe, and submissions are read from several worker
+# threads at once: every open document and page access happens under this
+# lock (re-entrant, since helpers taking an open document nest)
+PYMUPDF_LOCK = threading.RLock()
+
+# PDF text extraction backends; PyMuPDF is several times faster than PyPDF2
+# and is used by default when installed
+PDF_BACKENDS = ("pymupdf", "pypdf2")
+DEFAULT_PDF_BACKEND = "pymupdf"
+
+# A page without text whose images cover more than this fraction of it is
+# treated as a scan
+IMAGE_ONLY_PAGE_COVERAGE = 0.8
 
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-    logger.warning("pdf2image not available. PDF page conversion will be disabled.")
+
+class _NoText(Exception):
+    """Raised out of the in-memory text cache so empty text is not memoized"""
+
+
+class SubmissionFile(NamedTuple):
+    """A submission file found by a directory scan"""
+
+    path: str
+    name: str
+    size: int
 
 
 class DocumentProcessor:
     """Handles extraction of text from PDF, DOCX, and TXT files"""
 
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
+    def extract_text_from_pdf(
+        file_path: str, backend: str = DEFAULT_PDF_BACKEND
+    ) -> str:
+        """
+        Extract text from PDF file
+
+        Args:
+            file_path: Path to PDF file
+            backend: One of PDF_BACKENDS; "pymupdf" falls back to PyPDF2 when
+                PyMuPDF is not installed
+        """
+        if backend == "pymupdf" and PYMUPDF_AVAILABLE:
+            return DocumentProcessor._extract_text_from_pdf_pymupdf(file_path)
+
         try:
             with open(file_path, "rb") as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -50,6 +97,57 @@ class DocumentProcessor:
             logger.error(f"Error reading PDF {file_path}: {str(e)}")
             return ""
 
+    @staticmethod
+    def _extract_text_from_pdf_pymupdf(file_path: str) -> str:
+        """Extract text from PDF file with PyMuPDF"""
+        try:
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                return DocumentProcessor.extract_text_from_pdf_document(doc, file_path)
+        except Exception as e:
+            logger.error(f"Error reading PDF {file_path}: {str(e)}")
+            return ""
+
+    @staticmethod
+    def extract_text_from_pdf_document(doc: "fitz.Document", file_path: str) -> str:
+        """
+        Extract text from a PDF already opened with PyMuPDF
+
+        Args:
+            doc: Open PyMuPDF document
+            file_path: Path the document was opened from (for logging)
+        """
+        try:
+            parts = []
+            image_only_pages = []
+            for page_num, page in enumerate(doc, 1):
+                page_text = page.get_text("text").rstrip()
+                if page_text:
+                    parts.append(f"\n--- Page {page_num} ---\n{page_text}")
+                elif DocumentProcessor._is_image_only_page(page):
+                    image_only_pages.append(page_num)
+
+            if image_only_pages:
+                logger.info(
+                    f"Skipped {len(image_only_pages)} image-only (scanned) page(s) "
+                    f"in {os.path.basename(file_path)}: {image_only_pages}"
+                )
+            return "".join(parts).strip()
+        except Exception as e:
+            logger.error(f"Error reading PDF {file_path}: {str(e)}")
+            return ""
+
+    @staticmethod
+    def _is_image_only_page(page) -> bool:
+        """Whether images cover most of a PyMuPDF page (placement only, no decoding)"""
+        page_area = page.rect.get_area()
+        if not page_area:
+            return False
+        image_area = sum(
+            (fitz.Rect(info["bbox"]) & page.rect).get_area()
+            for info in page.get_image_info()
+        )
+        return image_area > IMAGE_ONLY_PAGE_COVERAGE * page_area
+
     @staticmethod
     def extract_text_from_docx(file_path: str) -> str:
         """Extract text from DOCX file"""
@@ -74,16 +172,106 @@ class DocumentProcessor:
             return ""
 
     @staticmethod
-    def extract_text_from_file(file_path: str) -> str:
-        """Extract text from file based on extension"""
-        if not os.path.exists(file_path):
+    def extract_text_from_file(
+        file_path: str,
+        pdf_backend: str = DEFAULT_PDF_BACKEND,
+        pdf_document: Optional["fitz.Document"] = None,
+    ) -> str:
+        """
+        Extract text from file based on extension
+
+        Results are cached by (path, modification time, size), so re-reading
+        an unchanged file such as an answer key or questions PDF (e.g. when
+        an edited assignment config is reloaded) does not parse it again.
+        When a text cache is enabled, PDF and DOCX text is also persisted
+        by content digest so it survives across runs.
+
+        Args:
+            file_path: Path to the file
+            pdf_backend: One of PDF_BACKENDS
+            pdf_document: The PDF already opened with PyMuPDF by the caller;
+                read instead of opening the file again (skips the in-memory
+                cache, the persistent text cache still applies)
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
             logger.error(f"File not found: {file_path}")
             return ""
 
+        if pdf_document is not None and pdf_backend == "pymupdf":
+            return DocumentProcessor._extract_text_persisted(
+                file_path, ".pdf", pdf_backend, pdf_document
+            )
+
+        try:
+            return DocumentProcessor._extract_text_cached(
+                file_path, stat.st_mtime_ns, stat.st_size, pdf_backend
+            )
+        except _NoText:
+            return ""
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _extract_text_cached(
+        file_path: str, mtime_ns: int, size: int, pdf_backend: str
+    ) -> str:
+        """
+        Extract text from file (mtime_ns and size only key the cache)
+
+        Raises:
+            _NoText: If no text was read; empty text usually means a read
+                error, so it is not memoized and the next call retries
+        """
         file_extension = os.path.splitext(file_path)[1].lower()
+        text = DocumentProcessor._extract_text_persisted(
+            file_path, file_extension, pdf_backend
+        )
+        if not text:
+            raise _NoText()
+        return text
+
+    @staticmethod
+    def _extract_text_persisted(
+        file_path: str,
+        file_extension: str,
+        pdf_backend: str,
+        pdf_document: Optional["fitz.Document"] = None,
+    ) -> str:
+        """Extract text through the persistent text cache, when enabled"""
+        text_cache = get_text_cache()
+        if text_cache is None or file_extension not in PERSISTED_TEXT_EXTENSIONS:
+            return DocumentProcessor._extract_text_by_type(
+                file_path, file_extension, pdf_backend, pdf_document
+            )
+
+        key = f"v{EXTRACTOR_VERSION}:{file_extension}:{file_digest(file_path)}"
+        if file_extension == ".pdf":
+            key += f":{pdf_backend}"
+        text = text_cache.get(key)
+        if text is None:
+            text = DocumentProcessor._extract_text_by_type(
+                file_path, file_extension, pdf_backend, pdf_document
+            )
+            # Empty text usually means a read error; retry it next time
+            if text:
+                text_cache.set(key, text)
+        return text
 
+    @staticmethod
+    def _extract_text_by_type(
+        file_path: str,
+        file_extension: str,
+        pdf_backend: str = DEFAULT_PDF_BACKEND,
+        pdf_document: Optional["fitz.Document"] = None,
+    ) -> str:
+        """Dispatch to the extractor for a file extension"""
         if file_extension == ".pdf":
-            return DocumentProcessor.extract_text_from_pdf(file_path)
+            if pdf_document is not None:
+                return DocumentProcessor.extract_text_from_pdf_document(
+                    pdf_document, file_path
+                )
+            return DocumentProcessor.extract_text_from_pdf(file_path, pdf_backend)
         elif file_extension == ".docx":
             return DocumentProcessor.extract_text_from_docx(file_path)
         elif file_extension == ".txt":
@@ -139,39 +327,95 @@ class DocumentProcessor:
         Returns:
             True if code file (.py, .java), False otherwise
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
-        code_extensions = {".py", ".java", ".cpp", ".c", ".js", ".ts"}
-        return file_extension in code_extensions
+        return os.path.splitext(file_path)[1].lower() in CODE_EXTENSIONS
+
+    @staticmethod
+    def iter_submissions(
+        submissions_dir: str, extensions: Optional[Iterable[str]] = None
+    ) -> Iterator[SubmissionFile]:
+        """
+        Lazily scan a directory for submission files
+
+        Uses a single os.scandir pass, so each file's type and size come from
+        the directory entry instead of separate stat calls.
+
+        Args:
+            submissions_dir: Directory containing submissions
+            extensions: Allowed extensions (default: SUBMISSION_EXTENSIONS)
+
+        Yields:
+            SubmissionFile(path, name, size) in directory order
+        """
+        allowed = (
+            SUBMISSION_EXTENSIONS
+            if extensions is None
+            else frozenset(extension.lower() for extension in extensions)
+        )
+
+        try:
+            with os.scandir(submissions_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    file_extension = os.path.splitext(entry.name)[1].lower()
+                    if file_extension in allowed:
+                        yield SubmissionFile(
+                            entry.path, entry.name, entry.stat().st_size
+                        )
+        except FileNotFoundError:
+            logger.warning(f"Submissions directory not found: {submissions_dir}")
+
+    @staticmethod
+    def count_submissions(
+        submissions_dir: str, extensions: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Count submission files without building paths or stat-ing them
+
+        Args:
+            submissions_dir: Directory containing submissions
+            extensions: Allowed extensions (default: SUBMISSION_EXTENSIONS)
+
+        Returns:
+            Number of matching files (0 if there is no such directory)
+        """
+        allowed = (
+            SUBMISSION_EXTENSIONS
+            if extensions is None
+            else frozenset(extension.lower() for extension in extensions)
+        )
+
+        try:
+            with os.scandir(submissions_dir) as entries:
+                return sum(
+                    1
+                    for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in allowed
+                    and entry.is_file()
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            return 0
 
     @staticmethod
     def get_all_submissions(
-        submissions_dir: str, extensions: Optional[List[str]] = None
+        submissions_dir: str, extensions: Optional[Iterable[str]] = None
     ) -> List[str]:
         """
         Get all submission file paths from a directory
 
         Args:
             submissions_dir: Directory containing submissions
-            extensions: List of allowed extensions (default: ['.pdf', '.docx', '.txt', '.py', '.java'])
+            extensions: Allowed extensions (default: SUBMISSION_EXTENSIONS)
 
         Returns:
             List of file paths
         """
-        if extensions is None:
-            extensions = [".pdf", ".docx", ".txt", ".py", ".java"]
-
-        submissions = []
-        if os.path.exists(submissions_dir):
-            for filename in os.listdir(submissions_dir):
-                file_path = os.path.join(submissions_dir, filename)
-                if os.path.isfile(file_path):
-                    file_extension = os.path.splitext(filename)[1].lower()
-                    if file_extension in extensions:
-                        submissions.append(file_path)
-        else:
-            logger.warning(f"Submissions directory not found: {submissions_dir}")
-
-        return sorted(submissions)
+        return sorted(
+            submission.path
+            for submission in DocumentProcessor.iter_submissions(
+                submissions_dir, extensions
+            )
+        )
 
     @staticmethod
     def get_file_info(file_path: str) -> dict:
@@ -211,17 +455,14 @@ class DocumentProcessor:
         try:
             import fitz  # PyMuPDF
 
-            doc = fitz.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images(full=True)
 
-                if len(image_list) > 0:
-                    doc.close()
-                    return True
+                    if len(image_list) > 0:
+                        return True
 
-            doc.close()
             return False
 
         except Exception as e:
@@ -244,32 +485,32 @@ class DocumentProcessor:
         try:
             import fitz  # PyMuPDF
 
-            doc = fitz.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images(full=True)
 
-                for img_index, img_info in enumerate(image_list):
-                    xref = img_info[0]
+                    for img_index, img_info in enumerate(image_list):
+                        xref = img_info[0]
 
-                    try:
-                        # Extract image
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
+                        try:
+                            # Extract image
+                            base_image = doc.extract_image(xref)
+                            image_bytes = base_image["image"]
 
-                        # Only keep reasonably sized images
-                        if len(image_bytes) > 1000:  # At least 1KB
-                            images.append((page_num + 1, image_bytes))
-                            logger.debug(f"Extracted image from page {page_num + 1}")
+                            # Only keep reasonably sized images
+                            if len(image_bytes) > 1000:  # At least 1KB
+                                images.append((page_num + 1, image_bytes))
+                                logger.debug(
+                                    f"Extracted image from page {page_num + 1}"
+                                )
 
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not extract image {img_index} from page {page_num + 1}: {str(e)}"
-                        )
-                        continue
+                        except Exception as e:
+                            logger.warning(
+                                f"Could not extract image {img_index} from page {page_num + 1}: {str(e)}"
+                            )
+                            continue
 
-            doc.close()
             logger.info(f"Extracted {len(images)} images from {file_path}")
 
         except ImportError:
@@ -308,21 +549,19 @@ class DocumentProcessor:
             try:
                 import fitz
 
-                doc = fitz.open(file_path)
-                metadata["page_count"] = len(doc)
+                with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                    metadata["page_count"] = len(doc)
 
-                # Count images
-                image_count = 0
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    image_list = page.get_images(full=True)
-                    image_count += len(image_list)
+                    # Count images
+                    image_count = 0
+                    for page_num in range(len(doc)):
+                        page = doc[page_num]
+                        image_list = page.get_images(full=True)
+                        image_count += len(image_list)
 
                 metadata["image_count"] = image_count
                 metadata["has_images"] = image_count > 0
 
-                doc.close()
-
             except ImportError:
                 # Fallback to PyPDF2 if PyMuPDF not available
                 with open(file_path, "rb") as file:
@@ -352,14 +591,12 @@ class DocumentProcessor:
             return True  # Assume yes to trigger fallback processing
 
         try:
-            doc = fitz.open(file_path)
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images()
-                if image_list:
-                    doc.close()
-                    return True
-            doc.close()
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images()
+                    if image_list:
+                        return True
             return False
         except Exception as e:
             logger.error(f"Error checking for images in {file_path}: {str(e)}")
@@ -383,31 +620,29 @@ class DocumentProcessor:
             return images
 
         try:
-            doc = fitz.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images()
-
-                for img_index, img in enumerate(image_list):
-                    try:
-                        xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-
-                        # Convert to PIL Image
-                        pil_image = Image.open(io.BytesIO(image_bytes))
-                        images.append((page_num + 1, pil_image))
-
-                        logger.debug(
-                            f"Extracted image {img_index + 1} from page {page_num + 1}"
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to extract image {img_index} from page {page_num + 1}: {str(e)}"
-                        )
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images()
+
+                    for img_index, img in enumerate(image_list):
+                        try:
+                            xref = img[0]
+                            base_image = doc.extract_image(xref)
+                            image_bytes = base_image["image"]
+
+                            # Convert to PIL Image
+                            pil_image = Image.open(io.BytesIO(image_bytes))
+                            images.append((page_num + 1, pil_image))
+
+                            logger.debug(
+                                f"Extracted image {img_index + 1} from page {page_num + 1}"
+                            )
+                        except Exception as e:
+                            logger.warning(
+                                f"Failed to extract image {img_index} from page {page_num + 1}: {str(e)}"
+                            )
 
-            doc.close()
             logger.info(f"Extracted {len(images)} images from {file_path}")
 
         except Exception as e:
@@ -415,12 +650,28 @@ class DocumentProcessor:
 
         return images
 
+    @staticmethod
+    def render_pdf_page(page: "fitz.Page", dpi: int) -> Image.Image:
+        """
+        Render one PDF page to an RGB image with PyMuPDF
+
+        Args:
+            page: Open PyMuPDF page
+            dpi: Resolution for rendering
+
+        Returns:
+            PIL Image of the page
+        """
+        zoom = dpi / 72
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
     @staticmethod
     def convert_pdf_pages_to_images(
         file_path: str, dpi: int = 200
     ) -> List[Tuple[int, Image.Image]]:
         """
-        Convert PDF pages to images using pdf2image
+        Convert PDF pages to images using PyMuPDF
         Used as fallback when no embedded images are found
 
         Args:
@@ -432,18 +683,16 @@ class DocumentProcessor:
         """
         images = []
 
-        if not PDF2IMAGE_AVAILABLE:
-            logger.warning(
-                "pdf2image not available. Cannot convert PDF pages to images."
-            )
+        if not PYMUPDF_AVAILABLE:
+            logger.warning("PyMuPDF not available. Cannot convert PDF pages to images.")
             return images
 
         try:
-            # Convert PDF to images
-            pil_images = convert_from_path(file_path, dpi=dpi)
-
-            for page_num, pil_image in enumerate(pil_images, 1):
-                images.append((page_num, pil_image))
+            with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                for page_num, page in enumerate(doc, 1):
+                    images.append(
+                        (page_num, DocumentProcessor.render_pdf_page(page, dpi))
+                    )
 
             logger.info(f"Converted {len(images)} pages from {file_path} to images")
 
@@ -477,17 +726,16 @@ class DocumentProcessor:
 
         try:
             if PYMUPDF_AVAILABLE:
-                doc = fitz.open(file_path)
-                metadata["page_count"] = len(doc)
+                with PYMUPDF_LOCK, fitz.open(file_path) as doc:
+                    metadata["page_count"] = len(doc)
 
-                image_count = 0
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    image_count += len(page.get_images())
+                    image_count = 0
+                    for page_num in range(len(doc)):
+                        page = doc[page_num]
+                        image_count += len(page.get_images())
 
                 metadata["image_count"] = image_count
                 metadata["has_images"] = image_count > 0
-                doc.close()
             else:
                 # Fallback to PyPDF2 for basic metadata
                 with open(file_path, "rb") as file:
@@ -5,10 +5,11 @@ Input processor for parsing assignment configurations and preparing data for gra
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from .document_processor import DocumentProcessor
+from ..utils import fast_json
 from ..models.assignment_config import AssignmentConfig, QuestionConfig, RubricConfig
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,8 @@ class InputProcessor:
     def __init__(self, assignments_base_dir: str = "assignments"):
         self.assignments_base_dir = assignments_base_dir
         self.doc_processor = DocumentProcessor()
+        # assignment_id -> (directory signature, loaded config)
+        self._config_cache: Dict[str, Tuple[tuple, AssignmentConfig]] = {}
 
     def load_assignment(self, assignment_id: str) -> Optional[AssignmentConfig]:
         """
@@ -37,6 +40,40 @@ class InputProcessor:
             logger.error(f"Assignment directory not found: {assignment_dir}")
             return None
 
+        # Reuse the parsed config while no file in the assignment directory
+        # has changed (callers get a copy, since they may modify it)
+        signature = self._directory_signature(assignment_dir)
+        cached = self._config_cache.get(assignment_id)
+        if cached and cached[0] == signature:
+            logger.debug(f"Using cached configuration for: {assignment_id}")
+            return cached[1].model_copy(deep=True)
+
+        assignment_config = self._load_assignment_uncached(assignment_id, assignment_dir)
+        if assignment_config:
+            self._config_cache[assignment_id] = (signature, assignment_config)
+            return assignment_config.model_copy(deep=True)
+        return None
+
+    @staticmethod
+    def _directory_signature(assignment_dir: str) -> tuple:
+        """
+        Names, sizes and modification times of the files in a directory
+
+        Dot-files are not assignment inputs (e.g. the API's .stats.json
+        listing cache) and are left out, so rewriting them keeps the
+        parsed config cached.
+        """
+        with os.scandir(assignment_dir) as entries:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in entries
+                if entry.is_file() and not entry.name.startswith(".")
+            ))
+
+    def _load_assignment_uncached(
+        self, assignment_id: str, assignment_dir: str
+    ) -> Optional[AssignmentConfig]:
+        """Parse config.json and referenced documents into an AssignmentConfig"""
         try:
             # Load base configuration
             config_path = os.path.join(assignment_dir, "config.json")
@@ -44,8 +81,8 @@ class InputProcessor:
                 logger.error(f"Configuration file not found: {config_path}")
                 return None
 
-            with open(config_path, "r") as f:
-                config_data = json.load(f)
+            with open(config_path, "rb") as f:
+                config_data = fast_json.loads(f.read())
 
             # Process questions document if specified
             if "questions_file" in config_data:
@@ -78,8 +115,8 @@ class InputProcessor:
             if "rubric_file" in config_data:
                 rubric_file = os.path.join(assignment_dir, config_data["rubric_file"])
                 if os.path.exists(rubric_file):
-                    with open(rubric_file, "r") as f:
-                        rubric_data = json.load(f)
+                    with open(rubric_file, "rb") as f:
+                        rubric_data = fast_json.loads(f.read())
                     config_data["general_rubric"] = rubric_data
                     logger.info(f"Loaded rubric from: {rubric_file}")
 
@@ -96,6 +133,43 @@ class InputProcessor:
             logger.error(f"Error loading assignment {assignment_id}: {str(e)}")
             return None
 
+    def load_assignment_summary(self, assignment_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read only the headline fields of an assignment's config.json
+
+        Unlike load_assignment, this does not extract answer keys or question
+        documents, so listing many assignments stays cheap.
+
+        Args:
+            assignment_id: Assignment identifier
+
+        Returns:
+            Dictionary with assignment_id, assignment_name, course_code, term,
+            num_questions and total_points, or None if the config is unreadable
+        """
+        config_path = os.path.join(self.assignments_base_dir, assignment_id, "config.json")
+
+        try:
+            with open(config_path, "rb") as f:
+                config_data = fast_json.loads(f.read())
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading assignment summary {assignment_id}: {str(e)}")
+            return None
+
+        questions = config_data.get("questions", [])
+        total_points = config_data.get("total_points")
+        if total_points is None:
+            total_points = sum(q.get("points", 0) for q in questions)
+
+        return {
+            "assignment_id": config_data.get("assignment_id", assignment_id),
+            "assignment_name": config_data.get("assignment_name", assignment_id),
+            "course_code": config_data.get("course_code"),
+            "term": config_data.get("term"),
+            "num_questions": len(questions),
+            "total_points": total_points,
+        }
+
     def _enrich_questions(self, config_data: Dict[str, Any], assignment_dir: str) -> Dict[str, Any]:
         """
         Enrich question data with content from separate files if specified
@@ -250,8 +324,7 @@ class InputProcessor:
 
             # Save config
             config_path = os.path.join(assignment_dir, "config.json")
-            with open(config_path, "w") as f:
-                json.dump(config, f, indent=2)
+            fast_json.dump_to_file(config, config_path, indent=True)
 
             # Create README
             readme_path = os.path.join(assignment_dir, "README.md")
@@ -15,10 +15,30 @@ logger = logging.getLogger(__name__)
 class SubmissionGrouper:
     """Groups submission files by student based on filename patterns"""
 
+    def __init__(self):
+        # Parsed filenames, so grouping and get_student_info parse each once
+        self._parsed: Dict[str, dict] = {}
+
     def parse_filename(self, filename: str) -> dict:
         """
         Parse filename following pattern: name_LATE_studentID_submissionID_remainder
 
+        Results are memoized per filename; a copy is returned each time.
+
+        Args:
+            filename: The filename to parse
+
+        Returns:
+            Dictionary with parsed components (see _parse_filename)
+        """
+        if filename not in self._parsed:
+            self._parsed[filename] = self._parse_filename(filename)
+        return dict(self._parsed[filename])
+
+    def _parse_filename(self, filename: str) -> dict:
+        """
+        Parse filename following pattern: name_LATE_studentID_submissionID_remainder
+
         Examples:
             - lawfordjack_LATE_101445_22007124_HW8.py
             - nielsenconnor_192061_21988980_Problem_1.java
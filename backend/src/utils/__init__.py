@@ -1,7 +1,43 @@
-"""Utility modules for output management and prompt building"""
+"""
+Utility modules for output management and prompt building
 
-from .output_manager import OutputManager
-from .prompt_builder import PromptBuilder
+Exports are imported lazily (PEP 562 module ``__getattr__``), so importing
+one light submodule such as ``hashing`` or ``text_cache`` does not pull in
+pandas or LangChain through this package.
+"""
 
-__all__ = ["OutputManager", "PromptBuilder"]
+import importlib
 
+# Exported name -> submodule defining it
+_EXPORTS = {
+    "OutputManager": "output_manager",
+    "StreamingResultWriter": "output_manager",
+    "PromptBuilder": "prompt_builder",
+    "LLMCache": "llm_cache",
+    "enable_llm_cache": "llm_cache",
+    "disable_llm_cache": "llm_cache",
+    "file_digest": "hashing",
+    "TextCache": "text_cache",
+    "enable_text_cache": "text_cache",
+    "disable_text_cache": "text_cache",
+    "GradeCache": "grade_cache",
+    "get_http_client": "http",
+    "create_async_http_client": "http",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import an exported name's submodule on first access"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    # Later lookups find the module global and skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
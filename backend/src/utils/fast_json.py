@@ -0,0 +1,74 @@
+"""
+Fast JSON serialization for result and config files
+
+Uses orjson when it is installed and falls back to the standard library
+``json`` module otherwise. Both paths produce the same document structure;
+``dumps`` always returns UTF-8 bytes so callers can write files in binary mode.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> str:
+    """Fallback encoder matching orjson's handling of dates"""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON
+
+    Args:
+        obj: JSON-compatible object (datetimes are written as ISO strings)
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False, default=_default
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """
+    Parse JSON from bytes or str
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed object
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_to_file(obj: Any, file_path: str, indent: bool = True):
+    """
+    Serialize an object and write it to a file in one call
+
+    Args:
+        obj: JSON-compatible object
+        file_path: Destination path (overwritten)
+        indent: Pretty-print with two-space indentation
+    """
+    with open(file_path, "wb") as f:
+        f.write(dumps(obj, indent=indent))
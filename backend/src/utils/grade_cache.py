@@ -0,0 +1,72 @@
+"""
+Persistent on-disk cache of finished student grades
+
+A regrade run usually sees mostly unchanged submissions. Grades are stored
+under a key built from the submitted files' contents and names plus
+everything that shapes grading (model, grading mode, assignment config), so
+an unchanged submission skips extraction, grading and reporting entirely.
+"""
+
+import hashlib
+import logging
+import os
+from typing import Iterable, Optional
+
+from ..models.grading_result import AssignmentGrade
+from .kv_store import SQLiteStore
+from .hashing import file_digest
+
+logger = logging.getLogger(__name__)
+
+# Bump when the grading pipeline changes in a way that should regrade
+GRADE_CACHE_VERSION = 2
+
+
+class GradeCache(SQLiteStore):
+    """SQLite-backed store of AssignmentGrade records"""
+
+    def __init__(self, database_path: str):
+        """
+        Initialize the cache
+
+        Args:
+            database_path: Path to the SQLite database file (created if missing)
+        """
+        super().__init__(database_path, "grade_cache")
+
+    @staticmethod
+    def make_key(file_paths: Iterable[str], settings: str) -> str:
+        """
+        Build the cache key for one student's submission
+
+        Args:
+            file_paths: The student's submission files
+            settings: Serialized grading settings (model, mode, config hash...)
+
+        Returns:
+            Hex digest identifying the submission under those settings
+        """
+        hasher = hashlib.sha256(f"v{GRADE_CACHE_VERSION}\x00{settings}".encode())
+        for file_path in sorted(file_paths, key=os.path.basename):
+            # File names carry the student name/ID and the late flag
+            name = os.path.basename(file_path)
+            hasher.update(f"\x00{name}\x00{file_digest(file_path)}".encode())
+        return hasher.hexdigest()
+
+    def get_grade(self, key: str) -> Optional[AssignmentGrade]:
+        """Return the cached grade, or None on a miss or unreadable entry"""
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return AssignmentGrade.model_validate_json(value)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable grade cache entry: {str(e)}")
+            return None
+
+    def set_grade(self, key: str, grade: AssignmentGrade) -> None:
+        """Store a grade (failures are logged, never raised)"""
+        try:
+            self.set(key, grade.model_dump_json())
+        except Exception as e:
+            logger.warning(f"Could not cache grade: {str(e)}")
@@ -0,0 +1,66 @@
+"""
+Content hashing shared by the on-disk caches
+
+Digests use 128-bit xxh3 when the optional ``xxhash`` package is installed
+(much faster on large PDFs and prompts carrying base64 page images), sha256
+otherwise. Only the standard library is required.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Read size when hashing files
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# (st_dev, st_ino) -> (st_mtime_ns, st_size, digest), so unchanged files are
+# not re-read by file_digest
+_file_digests: Dict[Tuple[int, int], Tuple[int, int, str]] = {}
+_file_digests_lock = threading.Lock()
+
+
+def new_hasher():
+    """Incremental hasher: 128-bit xxh3 if available, else sha256"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.sha256()
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Content digest of a file
+
+    Digests are remembered per inode and only recomputed when the file's
+    mtime or size changes. Two files with the same bytes share a digest.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    stat = os.stat(file_path)
+    inode = (stat.st_dev, stat.st_ino)
+
+    with _file_digests_lock:
+        cached = _file_digests.get(inode)
+
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    hasher = new_hasher()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    with _file_digests_lock:
+        _file_digests[inode] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
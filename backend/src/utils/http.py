@@ -0,0 +1,66 @@
+"""
+Shared HTTP clients for OpenAI calls
+
+Every agent builds its own ChatOpenAI, which by default may open its own
+connection pool. Passing these clients in lets all agents reuse the same
+keep-alive connections (and HTTP/2 multiplexing when ``h2`` is installed).
+"""
+
+import atexit
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool sizing and request timeout for LLM calls
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+_sync_client: Optional[httpx.Client] = None
+_sync_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the process-wide shared synchronous HTTP client
+
+    Returns:
+        httpx.Client shared by all agents
+    """
+    global _sync_client
+    if _sync_client is None:
+        with _sync_client_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT
+                )
+                atexit.register(_sync_client.close)
+                logger.debug(f"Created shared HTTP client (http2={HTTP2_AVAILABLE})")
+    return _sync_client
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """
+    Create an async HTTP client with the shared pool settings
+
+    An AsyncClient's connections belong to the event loop that opened them,
+    so callers should create one per event loop (e.g. per grading run) and
+    hand it to every agent used on that loop.
+
+    Returns:
+        New httpx.AsyncClient
+    """
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT
+    )
@@ -0,0 +1,64 @@
+"""
+Small SQLite key/value store shared by the on-disk caches
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SQLiteStore:
+    """Thread-safe string key/value table in a SQLite database"""
+
+    def __init__(self, database_path: str, table: str):
+        """
+        Open (or create) the store
+
+        Args:
+            database_path: Path to the SQLite database file (created if missing)
+            table: Table holding this store's entries
+        """
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.database_path = database_path
+        self._table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value, replacing any previous one"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove one entry (a missing key is ignored)"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._conn.commit()
@@ -0,0 +1,169 @@
+"""
+Persistent on-disk cache for LLM responses
+
+Plugs into LangChain's global LLM cache so every agent's ``llm.invoke`` /
+``llm.ainvoke`` call is served from disk when the same prompt has already
+been sent to the same model with the same parameters.
+
+Keys are hashed with the shared content hasher (xxh3 when ``xxhash`` is
+installed, sha256 otherwise).
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from .hashing import new_hasher
+from .kv_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Replies remembered for forget_llm_reply (most recent first to be kept)
+_RECENT_REPLIES = 4096
+
+
+class LLMCache(BaseCache):
+    """SQLite-backed LangChain cache keyed by (model parameters, prompt)"""
+
+    def __init__(self, database_path: str):
+        """
+        Initialize the cache
+
+        Args:
+            database_path: Path to the SQLite database file (created if missing)
+        """
+        self.database_path = database_path
+        self._store = SQLiteStore(database_path, "llm_cache")
+        # Reply text -> key of the entry it was served from or stored under,
+        # so an agent that rejects a reply can evict it by its content
+        self._reply_keys: "OrderedDict[str, str]" = OrderedDict()
+        self._reply_keys_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """
+        Build the cache key
+
+        ``llm_string`` is LangChain's serialization of the model name,
+        temperature and other call parameters, and ``prompt`` contains the
+        full system and user messages (including the submission content),
+        so any change to either produces a new key.
+        """
+        hasher = new_hasher()
+        hasher.update(f"{llm_string}\x00{prompt}".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """Return cached generations or None on a miss"""
+        key = self.make_key(prompt, llm_string)
+        value = self._store.get(key)
+        if value is None:
+            return None
+
+        try:
+            generations = [self._load_generation(item) for item in json.loads(value)]
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry: {str(e)}")
+            return None
+        self._remember_replies(key, generations)
+        return generations
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        """Store generations for a prompt"""
+        key = self.make_key(prompt, llm_string)
+        value = json.dumps([self._dump_generation(g) for g in return_val], default=str)
+        self._store.set(key, value)
+        self._remember_replies(key, return_val)
+
+    def forget_reply(self, text: str) -> None:
+        """
+        Evict the entry a reply was served from or stored under
+
+        Called when an agent rejects a reply (unparseable or invalid), so
+        the next run asks the model again instead of replaying it.
+        """
+        with self._reply_keys_lock:
+            key = self._reply_keys.pop(text, None)
+        if key is not None:
+            self._store.delete(key)
+
+    def _remember_replies(self, key: str, generations: Sequence[Generation]) -> None:
+        """Record which entry each reply text belongs to"""
+        with self._reply_keys_lock:
+            for generation in generations:
+                self._reply_keys[generation.text] = key
+                self._reply_keys.move_to_end(generation.text)
+            while len(self._reply_keys) > _RECENT_REPLIES:
+                self._reply_keys.popitem(last=False)
+
+    @staticmethod
+    def _dump_generation(generation: Generation) -> dict:
+        """Serialize a generation to a JSON-compatible dict"""
+        data = {"text": generation.text, "info": generation.generation_info}
+        if isinstance(generation, ChatGeneration):
+            data["message"] = message_to_dict(generation.message)
+        return data
+
+    @staticmethod
+    def _load_generation(data: dict) -> Generation:
+        """Rebuild a generation from its dict form"""
+        if "message" in data:
+            return ChatGeneration(
+                message=messages_from_dict([data["message"]])[0],
+                generation_info=data.get("info"),
+            )
+        return Generation(text=data["text"], generation_info=data.get("info"))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all cached entries"""
+        self._store.clear()
+        with self._reply_keys_lock:
+            self._reply_keys.clear()
+
+
+def enable_llm_cache(database_path: str) -> LLMCache:
+    """
+    Install an LLMCache as LangChain's global cache
+
+    Reuses the installed cache if it already points at the same file.
+
+    Args:
+        database_path: Path to the SQLite database file
+
+    Returns:
+        The active LLMCache
+    """
+    current = get_llm_cache()
+    if isinstance(current, LLMCache) and current.database_path == database_path:
+        return current
+
+    cache = LLMCache(database_path)
+    set_llm_cache(cache)
+    logger.info(f"LLM response cache enabled: {database_path}")
+    return cache
+
+
+def disable_llm_cache() -> None:
+    """Remove LangChain's global LLM cache"""
+    set_llm_cache(None)
+
+
+def forget_llm_reply(text: str) -> None:
+    """
+    Evict a rejected reply from the active LLMCache, if one is installed
+
+    Args:
+        text: Content of the reply the caller could not use
+    """
+    cache = get_llm_cache()
+    if isinstance(cache, LLMCache):
+        cache.forget_reply(text)
@@ -2,8 +2,10 @@
 Output manager for handling grading results export to JSON and CSV
 """
 
+import csv
+import gzip
 import os
-import json
+import threading
 import pandas as pd
 import logging
 from typing import List, Dict, Any, Optional
@@ -11,9 +13,95 @@ from datetime import datetime
 from pathlib import Path
 
 from ..models.grading_result import AssignmentGrade
+from . import fast_json
 
 logger = logging.getLogger(__name__)
 
+# Files written incrementally during a run (see StreamingResultWriter)
+STREAM_JSONL_NAME = "grading_results_stream.jsonl"
+STREAM_CSV_NAME = "grading_results_stream.csv"
+
+# Detailed JSON is also saved gzip-compressed under its name plus this
+# suffix, so downloads can be served without compressing per request
+PRECOMPRESSED_SUFFIX = ".gz"
+
+# Columns that lead every results CSV
+PRIORITY_COLUMNS = [
+    "student_name",
+    "student_id",
+    "total_score",
+    "max_score",
+    "percentage",
+    "letter_grade",
+]
+
+
+def _order_columns(columns: List[str]) -> List[str]:
+    """Reorder columns: priority columns first, then the rest"""
+    ordered = [col for col in PRIORITY_COLUMNS if col in columns]
+    ordered += [col for col in columns if col not in ordered]
+    return ordered
+
+
+class StreamingResultWriter:
+    """
+    Appends each grade to JSONL and CSV files as soon as it is available
+
+    Rows are flushed one at a time, so an interrupted run still leaves every
+    finished student on disk. The CSV header comes from the first grade
+    written; the JSONL file always carries the complete record.
+    """
+
+    def __init__(self, output_dir: str):
+        """
+        Open the stream files (truncating any from a previous run)
+
+        Args:
+            output_dir: Directory for the stream files (created if missing)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.jsonl_path = os.path.join(output_dir, STREAM_JSONL_NAME)
+        self.csv_path = os.path.join(output_dir, STREAM_CSV_NAME)
+
+        self._lock = threading.Lock()
+        self._jsonl = open(self.jsonl_path, "wb")
+        self._csv = open(self.csv_path, "w", newline="", encoding="utf-8")
+        self._csv_writer: Optional[csv.DictWriter] = None
+        self.rows_written = 0
+
+    def write_row(self, grade: AssignmentGrade):
+        """Append one grade to both files and flush them"""
+        row = grade.to_flat_dict()
+        record = fast_json.dumps(grade.to_dict()) + b"\n"
+
+        with self._lock:
+            self._jsonl.write(record)
+            self._jsonl.flush()
+
+            if self._csv_writer is None:
+                self._csv_writer = csv.DictWriter(
+                    self._csv,
+                    fieldnames=_order_columns(list(row)),
+                    restval="",
+                    extrasaction="ignore",
+                )
+                self._csv_writer.writeheader()
+            self._csv_writer.writerow(row)
+            self._csv.flush()
+            self.rows_written += 1
+
+    def close(self):
+        """Flush and close both files"""
+        with self._lock:
+            self._jsonl.close()
+            self._csv.close()
+
+    def __enter__(self) -> "StreamingResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 
 class OutputManager:
     """Manages output of grading results in multiple formats"""
@@ -21,6 +109,22 @@ class OutputManager:
     def __init__(self, output_base_dir: str = "output"):
         self.output_base_dir = output_base_dir
 
+    def open_streaming_writers(self, assignment_id: str) -> StreamingResultWriter:
+        """
+        Open per-student result streams for an assignment
+
+        Args:
+            assignment_id: Assignment identifier (output subdirectory)
+
+        Returns:
+            StreamingResultWriter writing grading_results_stream.{jsonl,csv}
+        """
+        writer = StreamingResultWriter(
+            os.path.join(self.output_base_dir, assignment_id)
+        )
+        logger.info(f"Streaming results to: {writer.jsonl_path}")
+        return writer
+
     def save_results(
         self,
         assignment_id: str,
@@ -100,8 +204,11 @@ class OutputManager:
             "results": [grade.to_dict() for grade in grades],
         }
 
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        content = fast_json.dumps(data, indent=True)
+        with open(file_path, "wb") as f:
+            f.write(content)
+        with open(file_path + PRECOMPRESSED_SUFFIX, "wb") as f:
+            f.write(gzip.compress(content, compresslevel=6, mtime=0))
 
     def _save_csv(self, grades: List[AssignmentGrade], file_path: str):
         """Save CSV with flattened grading data"""
@@ -112,23 +219,7 @@ class OutputManager:
         df = pd.DataFrame(flat_data)
 
         # Reorder columns for better readability
-        priority_columns = [
-            "student_name",
-            "student_id",
-            "total_score",
-            "max_score",
-            "percentage",
-            "letter_grade",
-        ]
-
-        # Get all columns
-        all_columns = df.columns.tolist()
-
-        # Reorder: priority columns first, then the rest
-        ordered_columns = [col for col in priority_columns if col in all_columns]
-        ordered_columns += [col for col in all_columns if col not in ordered_columns]
-
-        df = df[ordered_columns]
+        df = df[_order_columns(df.columns.tolist())]
 
         # Save to CSV
         df.to_csv(file_path, index=False)
@@ -144,27 +235,23 @@ class OutputManager:
                 "total_submissions": 0,
             }
         else:
-            scores = [grade.total_score for grade in grades]
-            max_possible = grades[0].max_score if grades else 0
+            max_possible = grades[0].max_score
+            stats = self._score_statistics(self._total_scores(grades), max_possible)
 
             summary = {
                 "assignment_id": assignment_id,
-                "assignment_name": grades[0].assignment_name if grades else None,
+                "assignment_name": grades[0].assignment_name,
                 "timestamp": datetime.now().isoformat(),
                 "statistics": {
                     "total_submissions": len(grades),
                     "max_possible_score": max_possible,
-                    "average_score": sum(scores) / len(scores),
-                    "median_score": sorted(scores)[len(scores) // 2],
-                    "highest_score": max(scores),
-                    "lowest_score": min(scores),
-                    "average_percentage": (sum(scores) / len(scores) / max_possible * 100)
-                    if max_possible > 0
-                    else 0,
-                    "students_with_zero": sum(1 for s in scores if s == 0),
-                    "students_with_full_marks": sum(
-                        1 for s in scores if s >= max_possible
-                    ),
+                    "average_score": stats["average_score"],
+                    "median_score": stats["median_score"],
+                    "highest_score": stats["highest_score"],
+                    "lowest_score": stats["lowest_score"],
+                    "average_percentage": stats["average_percentage"],
+                    "students_with_zero": stats["zero_scores"],
+                    "students_with_full_marks": stats["full_scores"],
                 },
                 "grade_distribution": self._calculate_grade_distribution(grades),
                 "question_statistics": self._calculate_question_statistics(grades),
@@ -179,8 +266,7 @@ class OutputManager:
                 ],
             }
 
-        with open(file_path, "w") as f:
-            json.dump(summary, f, indent=2)
+        fast_json.dump_to_file(summary, file_path)
 
     def _calculate_grade_distribution(self, grades: List[AssignmentGrade]) -> Dict[str, int]:
         """Calculate distribution of letter grades"""
@@ -200,41 +286,56 @@ class OutputManager:
         if not grades:
             return {}
 
-        question_stats = {}
-
-        # Get all unique question IDs
-        question_ids = set()
+        # Collect each question's scores in one pass over the grades (the
+        # first entry per question in each grade counts)
+        question_scores: Dict[str, List[float]] = {}
+        question_max: Dict[str, float] = {}
         for grade in grades:
+            seen = set()
             for q in grade.questions:
-                question_ids.add(q.question_id)
+                if q.question_id in seen:
+                    continue
+                seen.add(q.question_id)
+                question_scores.setdefault(q.question_id, []).append(q.score)
+                question_max[q.question_id] = q.max_score
 
-        # Calculate stats for each question
-        for qid in question_ids:
-            scores = []
-            max_score = 0
+        return {
+            qid: {
+                "max_score": question_max[qid],
+                **self._score_statistics(scores, question_max[qid]),
+            }
+            for qid, scores in question_scores.items()
+        }
 
-            for grade in grades:
-                for q in grade.questions:
-                    if q.question_id == qid:
-                        scores.append(q.score)
-                        max_score = q.max_score
-                        break
-
-            if scores:
-                question_stats[qid] = {
-                    "max_score": max_score,
-                    "average_score": sum(scores) / len(scores),
-                    "median_score": sorted(scores)[len(scores) // 2],
-                    "highest_score": max(scores),
-                    "lowest_score": min(scores),
-                    "average_percentage": (sum(scores) / len(scores) / max_score * 100)
-                    if max_score > 0
-                    else 0,
-                    "zero_scores": sum(1 for s in scores if s == 0),
-                    "full_scores": sum(1 for s in scores if s >= max_score),
-                }
-
-        return question_stats
+    @staticmethod
+    def _total_scores(grades: List[AssignmentGrade]) -> List[float]:
+        """Total scores of all grades"""
+        return [grade.total_score for grade in grades]
+
+    @staticmethod
+    def _score_statistics(scores: List[float], max_score: float) -> Dict[str, Any]:
+        """
+        Statistics for a non-empty list of scores
+
+        Args:
+            scores: Scores out of max_score
+            max_score: Maximum possible score
+
+        Returns:
+            Dictionary with average, median (upper middle value), highest and
+            lowest score, average percentage and zero/full score counts
+        """
+        ordered = sorted(scores)
+        average = sum(ordered) / len(ordered)
+        return {
+            "average_score": average,
+            "median_score": ordered[len(ordered) // 2],
+            "highest_score": ordered[-1],
+            "lowest_score": ordered[0],
+            "average_percentage": average / max_score * 100 if max_score > 0 else 0,
+            "zero_scores": sum(1 for score in ordered if score == 0),
+            "full_scores": sum(1 for score in ordered if score >= max_score),
+        }
 
     def get_summary_stats(self, grades: List[AssignmentGrade]) -> Dict[str, Any]:
         """
@@ -256,20 +357,18 @@ class OutputManager:
                 "students_with_full_marks": 0,
             }
 
-        scores = [grade.total_score for grade in grades]
         max_possible = grades[0].max_score
+        stats = self._score_statistics(self._total_scores(grades), max_possible)
 
         return {
             "total_students": len(grades),
             "max_possible_score": max_possible,
-            "average_score": sum(scores) / len(scores),
-            "average_percentage": (sum(scores) / len(scores) / max_possible * 100)
-            if max_possible > 0
-            else 0,
-            "highest_score": max(scores),
-            "lowest_score": min(scores),
-            "students_with_zero": sum(1 for s in scores if s == 0),
-            "students_with_full_marks": sum(1 for s in scores if s >= max_possible),
+            "average_score": stats["average_score"],
+            "average_percentage": stats["average_percentage"],
+            "highest_score": stats["highest_score"],
+            "lowest_score": stats["lowest_score"],
+            "students_with_zero": stats["zero_scores"],
+            "students_with_full_marks": stats["full_scores"],
             "requires_review": sum(1 for g in grades if g.requires_human_review),
         }
 
@@ -4,7 +4,7 @@ Dynamic prompt builder for grading based on assignment configuration
 
 import json
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 from ..models.assignment_config import AssignmentConfig, QuestionConfig, RubricConfig
 
 logger = logging.getLogger(__name__)
@@ -412,22 +412,7 @@ IMPORTANT:
         if self.config.course_code:
             system_parts.append(f"Course: {self.config.course_code}")
 
-        system_parts.append("\n\n" + "=" * 80)
-        system_parts.append(f"QUESTION (ID: {question.id}) - {question.points} points")
-        system_parts.append("=" * 80)
-        system_parts.append(f"\n{question.text}")
-
-        # Add answer key (only in full mode)
-        if self.grading_mode == "full" and question.answer_key:
-            system_parts.append(
-                f"\n\n[MODEL ANSWER/ANSWER KEY]:\n{question.answer_key}"
-            )
-
-        # Add rubric
-        rubric = question.rubric or self.config.general_rubric
-        if rubric:
-            system_parts.append("\n\n[GRADING RUBRIC]:")
-            system_parts.append(self._format_rubric(rubric, question.points))
+        system_parts.extend(self._format_question_block(question))
 
         # Output format
         example_output = {
@@ -477,6 +462,139 @@ IMPORTANT:
 
         return system_prompt, user_prompt
 
+    def _format_question_block(self, question: QuestionConfig) -> List[str]:
+        """Format a question with its answer key and rubric (respects grading_mode)"""
+        parts = []
+
+        parts.append("\n\n" + "=" * 80)
+        parts.append(f"QUESTION (ID: {question.id}) - {question.points} points")
+        parts.append("=" * 80)
+        parts.append(f"\n{question.text}")
+
+        # Add answer key (only in full mode)
+        if self.grading_mode == "full" and question.answer_key:
+            parts.append(f"\n\n[MODEL ANSWER/ANSWER KEY]:\n{question.answer_key}")
+
+        # Add rubric
+        rubric = question.rubric or self.config.general_rubric
+        if rubric:
+            parts.append("\n\n[GRADING RUBRIC]:")
+            parts.append(self._format_rubric(rubric, question.points))
+
+        return parts
+
+    def build_batch_question_prompt(
+        self,
+        questions_and_answers: List[Tuple[QuestionConfig, str]],
+        include_overall_comment: bool = False,
+    ) -> tuple[str, str]:
+        """
+        Build prompts for grading several questions in one call
+
+        Args:
+            questions_and_answers: List of (question, student_answer) pairs
+            include_overall_comment: Also ask for an overall comment on the
+                whole submission (only valid when every question is in this call)
+
+        Returns:
+            Tuple of (system_prompt, user_prompt)
+        """
+        # System prompt
+        system_parts = []
+
+        system_parts.append(
+            "You are an expert grading assistant. Your task is to grade several questions "
+            "from a student assignment fairly and thoroughly. Grade each question "
+            "independently against its own rubric."
+        )
+
+        system_parts.append(f"\n\nASSIGNMENT: {self.config.assignment_name}")
+        if self.config.course_code:
+            system_parts.append(f"Course: {self.config.course_code}")
+
+        for question, _ in questions_and_answers:
+            system_parts.extend(self._format_question_block(question))
+
+        # Output format
+        example_output = {
+            "grades": [
+                {
+                    "question_id": question.id,
+                    "score": 0.0,
+                    "max_score": question.points,
+                    "reasoning": "Detailed explanation of the grade...",
+                    "feedback": "Constructive feedback for the student...",
+                    "criteria_met": ["criterion 1", "criterion 2"],
+                    "criteria_missed": ["criterion 3"],
+                }
+                for question, _ in questions_and_answers[:2]
+            ]
+        }
+        if include_overall_comment:
+            example_output["overall_comment"] = (
+                "2-4 sentence comment on the submission as a whole..."
+            )
+
+        system_parts.append(
+            f"\n\nOUTPUT FORMAT:\n{json.dumps(example_output, indent=2)}"
+        )
+
+        system_parts.append(
+            "\n\nGRADING GUIDELINES:\n"
+            "- Evaluate based on correctness, completeness, and clarity\n"
+            "- Reference specific rubric criteria in your reasoning\n"
+            "- Provide constructive feedback\n"
+            f'- Return exactly one entry in "grades" for each of the '
+            f"{len(questions_and_answers)} questions, using its question_id\n"
+            "- Return ONLY valid JSON"
+        )
+
+        if include_overall_comment:
+            system_parts.append(
+                '- In "overall_comment", acknowledge the overall performance, '
+                "highlight key strengths, point out the main areas for improvement "
+                "and encourage continued learning. Be constructive, specific, "
+                "and encouraging"
+            )
+
+        system_prompt = "\n".join(system_parts)
+
+        # User prompt
+        user_parts = []
+
+        # Code submissions answer every question with the same content, so
+        # send it once instead of once per question
+        answers = [student_answer for _, student_answer in questions_and_answers]
+        if len(answers) > 1 and all(answer == answers[0] for answer in answers):
+            question_ids = ", ".join(
+                question.id for question, _ in questions_and_answers
+            )
+            user_parts.append("=" * 80)
+            user_parts.append(f"STUDENT'S SUBMISSION (answers {question_ids}):")
+            user_parts.append("=" * 80)
+            user_parts.append(f"\n{answers[0]}\n")
+            user_parts.append("=" * 80)
+            user_parts.append(
+                "\nPlease grade each question against the submission above using "
+                "its rubric. Return ONLY the JSON response."
+            )
+        else:
+            for question, student_answer in questions_and_answers:
+                user_parts.append("=" * 80)
+                user_parts.append(f"STUDENT'S ANSWER (ID: {question.id}):")
+                user_parts.append("=" * 80)
+                user_parts.append(f"\n{student_answer}\n")
+
+            user_parts.append("=" * 80)
+            user_parts.append(
+                "\nPlease grade each answer based on its question and rubric provided. "
+                "Return ONLY the JSON response."
+            )
+
+        user_prompt = "\n".join(user_parts)
+
+        return system_prompt, user_prompt
+
     def build_image_extraction_prompt(
         self, question_context: Optional[str] = None
     ) -> str:
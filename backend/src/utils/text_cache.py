@@ -0,0 +1,63 @@
+"""
+Persistent on-disk cache for text extracted from documents
+
+Parsing a PDF or DOCX is the slowest part of loading an assignment or a
+document submission. Extracted text is stored in SQLite keyed by the file's
+content digest and the extractor version, so later runs (and identical
+copies of the same file, e.g. a shared answer key) skip the parse entirely.
+"""
+
+import logging
+from typing import Optional
+
+from .kv_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+
+class TextCache(SQLiteStore):
+    """SQLite-backed store of extracted document text"""
+
+    def __init__(self, database_path: str):
+        """
+        Initialize the cache
+
+        Args:
+            database_path: Path to the SQLite database file (created if missing)
+        """
+        super().__init__(database_path, "text_cache")
+
+
+_text_cache: Optional[TextCache] = None
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Return the active text cache, or None when disabled"""
+    return _text_cache
+
+
+def enable_text_cache(database_path: str) -> TextCache:
+    """
+    Install a TextCache for DocumentProcessor to use
+
+    Reuses the installed cache if it already points at the same file.
+
+    Args:
+        database_path: Path to the SQLite database file
+
+    Returns:
+        The active TextCache
+    """
+    global _text_cache
+    if _text_cache is not None and _text_cache.database_path == database_path:
+        return _text_cache
+
+    _text_cache = TextCache(database_path)
+    logger.info(f"Extracted text cache enabled: {database_path}")
+    return _text_cache
+
+
+def disable_text_cache() -> None:
+    """Stop persisting extracted text"""
+    global _text_cache
+    _text_cache = None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for grading several questions in one LLM call
+Tests validation of the batch reply's scores and question ids
+Run this with: python test_batch_grading.py (no API calls are made)
+"""
+
+import sys
+
+from src.agents.qa_grading_agent import QAGradingAgent
+from src.models.assignment_config import QuestionConfig
+
+QUESTIONS = [
+    QuestionConfig(id="q1", text="Define a variable", points=5),
+    QuestionConfig(id="q2", text="Explain recursion", points=10),
+]
+
+
+def test_batch_score_validation():
+    """Test that out-of-range batch scores are dropped for re-grading"""
+    print("Testing batch score validation...")
+
+    agent = QAGradingAgent(api_key="test-key")
+    batch = [(question, {"text": "answer"}, "") for question in QUESTIONS]
+    response = """{
+        "grades": [
+            {"question_id": "q1", "score": 7, "reasoning": "Over the maximum"},
+            {"question_id": "q2", "score": 9, "reasoning": "Solid answer"},
+            {"question_id": "q3", "score": 1, "reasoning": "Unknown question"}
+        ],
+        "overall_comment": "  Good work  "
+    }"""
+    graded, overall_comment = agent._parse_batch_response(response, batch)
+
+    negative, _ = agent._parse_batch_response(
+        '{"grades": [{"question_id": "q1", "score": -1, "reasoning": "Negative"}]}', batch
+    )
+    no_grades, _ = agent._parse_batch_response('{"overall_comment": "x"}', batch)
+
+    checks = [
+        ("score above the maximum is dropped", "q1" not in graded),
+        ("valid score is kept", "q2" in graded and graded["q2"].score == 9),
+        ("max score comes from the config", "q2" in graded and graded["q2"].max_score == 10),
+        ("unknown question is ignored", set(graded) == {"q2"}),
+        ("overall comment is stripped", overall_comment == "Good work"),
+        ("negative score is dropped", not negative),
+        ("reply without grades yields nothing", not no_grades),
+    ]
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Batch Grading Tests")
+    print("=" * 60)
+
+    try:
+        test_batch_score_validation()
+        passed = True
+    except Exception as e:
+        print(f"\n✗ Batch Score Validation - EXCEPTION: {e}")
+        passed = False
+
+    print(f"\n{'✓ PASS' if passed else '✗ FAIL'}: Batch Score Validation")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Test script for the grade and LLM response caches
+Tests cache keys, which grades are cached, and eviction of rejected replies
+Run this with: python test_caching.py (no API calls are made)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from cli import GradingWorkflow
+from src.agents.qa_grading_agent import QAGradingAgent
+from src.agents.report_generator import ReportGenerator
+from src.models.assignment_config import AssignmentConfig, QuestionConfig
+from src.models.grading_result import AssignmentGrade, QuestionGrade
+from src.utils.grade_cache import GradeCache
+from src.utils.llm_cache import disable_llm_cache, enable_llm_cache
+
+QUESTIONS = [
+    QuestionConfig(id="q1", text="Define a variable", points=5),
+    QuestionConfig(id="q2", text="Explain recursion", points=10),
+]
+
+
+def make_grade(**overrides) -> AssignmentGrade:
+    """A clean two-question grade"""
+    questions = overrides.pop(
+        "questions",
+        [
+            QuestionGrade(question_id="q1", score=4, max_score=5, reasoning="Mostly right"),
+            QuestionGrade(question_id="q2", score=8, max_score=10, reasoning="Good"),
+        ],
+    )
+    fields = dict(
+        student_name="Jane Doe",
+        assignment_id="test",
+        total_score=sum(q.score for q in questions),
+        max_score=15,
+        questions=questions,
+    )
+    fields.update(overrides)
+    return AssignmentGrade(**fields)
+
+
+def make_workflow(temp_dir: str) -> GradingWorkflow:
+    """A workflow with only a grade cache (nothing else is initialized)"""
+    workflow = GradingWorkflow.__new__(GradingWorkflow)
+    workflow.grade_cache = GradeCache(os.path.join(temp_dir, "grades.db"))
+    return workflow
+
+
+def test_cache_key():
+    """Test that the cache key follows file contents, names and settings"""
+    print("Testing grade cache keys...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = Path(temp_dir, "doejane_123_456_hw1.pdf")
+        second = Path(temp_dir, "doejane_123_456_hw2.pdf")
+        first.write_bytes(b"answer one")
+        second.write_bytes(b"answer two")
+        files = [str(first), str(second)]
+
+        key = GradeCache.make_key(files, "gpt-4o-mini|full")
+        checks = [
+            ("order of files does not matter", GradeCache.make_key(files[::-1], "gpt-4o-mini|full") == key),
+            ("settings change the key", GradeCache.make_key(files, "gpt-4o|full") != key),
+        ]
+
+        # Same contents under another name (the late flag is in the name)
+        late = Path(temp_dir, "doejane_LATE_123_456_hw1.pdf")
+        late.write_bytes(b"answer one")
+        checks.append(
+            (
+                "file names change the key",
+                GradeCache.make_key([str(late), str(second)], "gpt-4o-mini|full") != key,
+            )
+        )
+
+        # Rewrite with a different length so the mtime/size check sees it
+        first.write_bytes(b"answer one, edited")
+        checks.append(("contents change the key", GradeCache.make_key(files, "gpt-4o-mini|full") != key))
+
+    report(checks)
+
+
+def test_cache_skip_rules():
+    """Test that only clean grades are written to the grade cache"""
+    print("\nTesting grade cache skip rules...")
+
+    agent = QAGradingAgent(api_key="test-key")
+    error_question = agent._create_error_question_grade(QUESTIONS[1])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workflow = make_workflow(temp_dir)
+        cases = [
+            ("clean grade is cached", make_grade(), True),
+            ("flagged grade is not cached", make_grade(requires_human_review=True), False),
+            (
+                "grade with an error question is not cached",
+                make_grade(
+                    questions=[
+                        QuestionGrade(question_id="q1", score=4, max_score=5, reasoning="Mostly right"),
+                        error_question,
+                    ]
+                ),
+                False,
+            ),
+        ]
+
+        checks = []
+        for index, (name, grade, expected) in enumerate(cases):
+            key = f"key-{index}"
+            workflow._cache_grade(key, grade)
+            checks.append((name, (workflow.grade_cache.get_grade(key) is not None) == expected))
+
+        workflow._cache_grade("key-none", None)
+        checks.append(("missing grade is not cached", workflow.grade_cache.get("key-none") is None))
+
+    # A failed extraction step flags the grade, so the guard above skips it
+    grade = make_grade()
+    GradingWorkflow._flag_failed_extraction(
+        grade, {"q1": {"text": "", "extraction_failed": True}, "q2": {"text": "x"}}
+    )
+    checks.append(("failed extraction flags the grade", grade.requires_human_review))
+
+    # The report flags error questions even with long reasoning
+    stats = {"num_zero": 1, "percentage": 26.7, "num_perfect": 0}
+    needs_review, reason = ReportGenerator(api_key="test-key")._check_human_review_needed(
+        [QuestionGrade(question_id="q1", score=4, max_score=5, reasoning="Mostly right"), error_question],
+        stats,
+    )
+    checks.append(("report flags error questions", needs_review and "could not be graded" in reason))
+
+    report(checks)
+
+
+def test_llm_cache_eviction():
+    """Test that a reply the grader rejects is not served again from the cache"""
+    print("\nTesting LLM cache eviction of rejected replies...")
+
+    config = AssignmentConfig(
+        assignment_id="test", assignment_name="Test", questions=QUESTIONS[:1]
+    )
+    agent = QAGradingAgent(api_key="test-key")
+    # Replies are handed out in order, once each, on every cache miss
+    agent.llm = FakeListChatModel(
+        responses=[
+            "not json",
+            '{"score": 4, "reasoning": "Mostly right"}',
+            '{"score": 1, "reasoning": "Should never be sent"}',
+        ]
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        enable_llm_cache(os.path.join(temp_dir, "llm.db"))
+        try:
+            grades = [
+                agent.grade_single_question(QUESTIONS[0], {"text": "x = 1"}, config)
+                for _ in range(3)
+            ]
+        finally:
+            disable_llm_cache()
+
+    checks = [
+        ("unparseable reply gives an error grade", grades[0].grading_error),
+        ("rejected reply is asked again", grades[1].score == 4),
+        ("accepted reply is served from the cache", grades[2].score == 4),
+    ]
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Grade and LLM Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        ("Cache Key", test_cache_key),
+        ("Cache Skip Rules", test_cache_skip_rules),
+        ("LLM Cache Eviction", test_llm_cache_eviction),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n✗ {test_name} - EXCEPTION: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        print(f"{'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\nPassed: {passed}/{len(results)}")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
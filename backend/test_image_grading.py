@@ -130,12 +130,12 @@ def test_text_only_pdf(test_pdf_path: str):
             logger.info(
                 f"Total Score: {grade.total_score}/{grade.max_score} ({grade.get_percentage():.1f}%)"
             )
-            logger.info(f"Overall Comment: {report_data['overall_comment']}")
-            if report_data["strengths"]:
-                logger.info(f"Strengths: {', '.join(report_data['strengths'])}")
-            if report_data["areas_for_improvement"]:
+            logger.info(f"Overall Comment: {report_data.overall_comment}")
+            if report_data.strengths:
+                logger.info(f"Strengths: {', '.join(report_data.strengths)}")
+            if report_data.areas_for_improvement:
                 logger.info(
-                    f"Areas for Improvement: {', '.join(report_data['areas_for_improvement'])}"
+                    f"Areas for Improvement: {', '.join(report_data.areas_for_improvement)}"
                 )
             logger.info("-" * 80)
 
@@ -224,7 +224,7 @@ def test_image_based_pdf(test_pdf_path: str):
                 if q.image_processing_notes:
                     logger.info(f"  Notes: {q.image_processing_notes}")
 
-            logger.info(f"\nOverall Comment: {report_data['overall_comment']}")
+            logger.info(f"\nOverall Comment: {report_data.overall_comment}")
             logger.info("-" * 80)
 
             logger.info("✓ TEST PASSED: Image-based PDF grading successful")
@@ -289,7 +289,7 @@ def test_mixed_content_pdf(test_pdf_path: str):
             logger.info("\n" + "-" * 80)
             logger.info("RESULTS:")
             logger.info(f"Total Score: {grade.total_score}/{grade.max_score}")
-            logger.info(f"Overall: {report_data['overall_comment']}")
+            logger.info(f"Overall: {report_data.overall_comment}")
             logger.info("-" * 80)
 
             logger.info("✓ TEST PASSED: Mixed content PDF grading successful")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for batched question prompts
+Tests that content shared by every question is sent only once
+Run this with: python test_prompt_builder.py (no API calls are made)
+"""
+
+import sys
+
+from src.models.assignment_config import AssignmentConfig, QuestionConfig
+from src.utils.prompt_builder import PromptBuilder
+
+QUESTIONS = [
+    QuestionConfig(id="q1", text="Implement factorial", points=5),
+    QuestionConfig(id="q2", text="Add a docstring", points=3),
+    QuestionConfig(id="q3", text="Handle negative input", points=2),
+]
+
+CONFIG = AssignmentConfig(
+    assignment_id="test", assignment_name="Test", questions=QUESTIONS
+)
+
+
+def test_identical_answers_shared():
+    """Test that identical answers are sent as one block naming every question"""
+    print("Testing identical answers in a batch prompt...")
+
+    code = "def factorial(n):\n    return 1 if n <= 1 else n * factorial(n - 1)"
+    _, user_prompt = PromptBuilder(CONFIG).build_batch_question_prompt(
+        [(question, code) for question in QUESTIONS]
+    )
+
+    checks = [
+        ("submission is sent once", user_prompt.count(code) == 1),
+        (
+            "one shared block lists every question id",
+            user_prompt.count("STUDENT'S SUBMISSION") == 1
+            and "STUDENT'S SUBMISSION (answers q1, q2, q3):" in user_prompt,
+        ),
+        ("no per-question answer blocks", "STUDENT'S ANSWER" not in user_prompt),
+    ]
+    report(checks)
+
+
+def test_different_answers_separate():
+    """Test that different answers keep one block per question"""
+    print("\nTesting different answers in a batch prompt...")
+
+    answers = ["def factorial(n): ...", '"""Compute n!"""', "if n < 0: raise ValueError"]
+    _, user_prompt = PromptBuilder(CONFIG).build_batch_question_prompt(
+        list(zip(QUESTIONS, answers))
+    )
+
+    checks = [
+        ("no shared block", "STUDENT'S SUBMISSION" not in user_prompt),
+        *(
+            (
+                f"block for {question.id} holds its answer",
+                f"STUDENT'S ANSWER (ID: {question.id}):" in user_prompt
+                and user_prompt.count(answer) == 1,
+            )
+            for question, answer in zip(QUESTIONS, answers)
+        ),
+    ]
+
+    # A lone question is not "shared" content
+    _, single_prompt = PromptBuilder(CONFIG).build_batch_question_prompt(
+        [(QUESTIONS[0], answers[0])]
+    )
+    checks.append(
+        ("single question keeps its own block", "STUDENT'S ANSWER (ID: q1):" in single_prompt)
+    )
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Batch Prompt Tests")
+    print("=" * 60)
+
+    tests = [
+        ("Identical Answers Shared", test_identical_answers_shared),
+        ("Different Answers Separate", test_different_answers_separate),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n✗ {test_name} - EXCEPTION: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        print(f"{'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\nPassed: {passed}/{len(results)}")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the web API's results endpoint
+Tests ETag/304 handling of /results
+Run this with: python test_results.py (no API calls are made)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def test_results_etag():
+    """Test that a matching If-None-Match gets a 304 without a body"""
+    print("Testing results ETag handling...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        main.OUTPUT_BASE_DIR = temp_dir
+        output_dir = Path(temp_dir, "test")
+        output_dir.mkdir()
+        results_path = output_dir / "grading_results_detailed_20250101_120000.json"
+        results_path.write_text('[{"student_name": "Jane Doe"}]')
+        (output_dir / "grading_summary_20250101_120000.json").write_text('{"total": 1}')
+
+        url = "/api/assignments/test/results"
+        first = client.get(url)
+        etag = first.headers.get("etag")
+        cached = client.get(url, headers={"If-None-Match": etag})
+        stale = client.get(url, headers={"If-None-Match": '"stale"'})
+
+        # New results change the ETag
+        results_path.write_text('[{"student_name": "Jane Doe"}, {"student_name": "John Roe"}]')
+        updated = client.get(url, headers={"If-None-Match": etag})
+
+        checks = [
+            ("first request returns results", first.status_code == 200 and bool(etag)),
+            (
+                "results and summary are spliced together",
+                first.status_code == 200
+                and first.json() == {"results": [{"student_name": "Jane Doe"}], "summary": {"total": 1}},
+            ),
+            ("matching ETag gets 304", cached.status_code == 304 and not cached.content),
+            ("304 repeats the ETag", cached.headers.get("etag") == etag),
+            ("other ETag gets the results", stale.status_code == 200),
+            ("changed results are sent again", updated.status_code == 200 and updated.headers.get("etag") != etag),
+        ]
+
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main_tests():
+    """Run all tests"""
+    print("=" * 60)
+    print("Results API Tests")
+    print("=" * 60)
+
+    tests = [
+        ("Results ETag", test_results_etag),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n✗ {test_name} - EXCEPTION: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        print(f"{'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\nPassed: {passed}/{len(results)}")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_tests())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for token-aware truncation of question-mapping content
+Tests the token budget and that multi-byte characters are never split
+Run this with: python test_token_truncation.py (no API calls are made)
+"""
+
+import sys
+
+import tiktoken
+
+from src.agents import answer_extraction_agent
+
+# One token per byte: the worst case for multi-byte characters, and needs no
+# BPE download (so the test also runs offline)
+BYTE_ENCODING = tiktoken.Encoding(
+    name="bytes",
+    pat_str=r"[\s\S]",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={},
+)
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """truncate_to_tokens with the byte-level tokenizer"""
+    original = answer_extraction_agent._token_encoding
+    answer_extraction_agent._token_encoding = lambda model_name: BYTE_ENCODING
+    try:
+        return answer_extraction_agent.truncate_to_tokens(text, max_tokens, "test-model")
+    finally:
+        answer_extraction_agent._token_encoding = original
+
+
+def test_multibyte_truncation():
+    """Test that truncation respects the budget and never splits a character"""
+    print("Testing multi-byte truncation...")
+
+    # Emoji (4 bytes), accented letter (2 bytes), math symbol (3 bytes)
+    text = "😀é∮" * 50
+    checks = []
+    for max_tokens in (8, 9, 10, 11, 100):
+        result = truncate(text, max_tokens)
+        checks.append(
+            (
+                f"{max_tokens} tokens: within budget, whole characters only",
+                len(BYTE_ENCODING.encode(result)) <= max_tokens
+                and text.startswith(result)
+                and "�" not in result,
+            )
+        )
+
+    # Few characters can still be many tokens
+    emoji = "😀" * 5
+    checks.append(("short emoji text is still truncated", truncate(emoji, 8) == "😀😀"))
+    checks.append(("text within budget is unchanged", truncate("plain answer", 100) == "plain answer"))
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Token Truncation Tests")
+    print("=" * 60)
+
+    try:
+        test_multibyte_truncation()
+        passed = True
+    except Exception as e:
+        print(f"\n✗ Multi-byte Truncation - EXCEPTION: {e}")
+        passed = False
+
+    print(f"\n{'✓ PASS' if passed else '✗ FAIL'}: Multi-byte Truncation")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the web API's upload file name validation
+Tests that names which could escape the upload directory are rejected
+Run this with: python test_uploads.py (no API calls are made)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def test_upload_path_traversal():
+    """Test that upload names which could escape their directory are rejected"""
+    print("Testing upload file name validation...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        main.SUBMISSIONS_BASE_DIR = os.path.join(temp_dir, "submissions")
+
+        checks = []
+        for name in ["../escape.pdf", "..\\escape.pdf", "nested/escape.pdf", ".hidden.pdf", ".."]:
+            response = client.post(
+                "/api/assignments/test/submissions",
+                files=[("files", (name, b"%PDF-1.4", "application/pdf"))],
+            )
+            checks.append((f"{name!r} rejected", response.status_code == 400))
+
+        checks.append(
+            (
+                "nothing written outside the submissions directory",
+                not Path(temp_dir, "escape.pdf").exists()
+                and not Path(main.SUBMISSIONS_BASE_DIR, "escape.pdf").exists(),
+            )
+        )
+
+        response = client.post(
+            "/api/assignments/test/submissions",
+            files=[("files", ("doejane_123_456_hw1.pdf", b"%PDF-1.4", "application/pdf"))],
+        )
+        checks.append(
+            (
+                "plain file name accepted",
+                response.status_code == 200
+                and Path(main.SUBMISSIONS_BASE_DIR, "test", "doejane_123_456_hw1.pdf").exists(),
+            )
+        )
+
+    report(checks)
+
+
+def report(checks):
+    """Print each named check; fail (also under pytest) if any did not pass"""
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks if not passed]
+    assert not failed, f"Failed: {', '.join(failed)}"
+
+
+def main_tests():
+    """Run all tests"""
+    print("=" * 60)
+    print("Upload Validation Tests")
+    print("=" * 60)
+
+    tests = [
+        ("Upload Path Traversal", test_upload_path_traversal),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results.append((test_name, True))
+        except Exception as e:
+            print(f"\n✗ {test_name} - EXCEPTION: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for test_name, result in results:
+        print(f"{'✓ PASS' if result else '✗ FAIL'}: {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\nPassed: {passed}/{len(results)}")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_tests())